@@ -19,6 +19,8 @@ BLANK_POINT = Point(t=0, x=0, y=0, d=0)
 
 class IVT(dm.PipeTask):
 
+    checkpoint_attrs = ("state", "buf", "cache")
+
     def __init__(
         self,
         screen_wh: tuple[float, float],
@@ -11,6 +11,7 @@ class WhiteNoiseSimulator(dm.PipeTask):
 
     """
     last_item = None
+    checkpoint_attrs = ("last_item",)
 
     def __init__(self, freq: float = 60.0, xy_scale: float = 0.1, d_scale: float = 0.001, transform=None) -> None:
         super().__init__(transform)
@@ -57,6 +58,7 @@ class PinkNoiseSimulator(dm.PipeTask):
 
     """
     last_item = None
+    checkpoint_attrs = ("last_item",)
 
     def generate_pink_noise(self, n_samples: int):
         white_noise = np.random.randn(n_samples)
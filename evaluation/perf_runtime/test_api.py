@@ -11,7 +11,8 @@ from tqdm import tqdm
 
 
 def connect():
-    api = dm.API()
+    # each run replays the same recording, so decode it once, and share it across the replay processes
+    api = dm.API(cache=dm.RecordingCache())
     return api
 
 
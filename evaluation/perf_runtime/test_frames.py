@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+import logging
+import timeit
+from statistics import mean, stdev
+
+import multiprocess
+import numpy as np
+import pandas as pd
+import streaminghub_datamux as dm
+
+# 1080p RGB frames at 30 fps
+FRAME_SHAPE = (1080, 1920, 3)
+FPS = 30
+
+
+def produce(sink: dm.Queue, num_frames: int, fps: float | None):
+    frame = np.random.randint(0, 256, FRAME_SHAPE, dtype=np.uint8)
+    t0 = timeit.default_timer()
+    for i in range(num_frames):
+        if fps is not None:
+            dm.sleep(max(0.0, t0 + i / fps - timeit.default_timer()))
+        sink.put(dict(frame=frame, t=timeit.default_timer()))
+    sink.put(dm.END_OF_STREAM)
+
+
+def timeit_frames(
+    zero_copy: bool,
+    num_frames: int,
+    fps: float | None,
+):
+    sink = dm.Queue(zero_copy=zero_copy)
+    proc = multiprocess.Process(target=produce, args=(sink, num_frames, fps), daemon=True)
+    proc.start()
+    latency = []
+    start_time = timeit.default_timer()
+    while True:
+        item = sink.get()
+        if item == dm.END_OF_STREAM:
+            break
+        assert item is not None
+        assert item["frame"].shape == FRAME_SHAPE
+        latency.append(timeit.default_timer() - item["t"])
+    duration = timeit.default_timer() - start_time
+    proc.join()
+    return duration, latency
+
+
+def main():
+    rows = []
+    for fps in [FPS, None]:
+        for zero_copy in [False, True]:
+            duration, latency = timeit_frames(zero_copy, num_frames=300, fps=fps)
+            runtime = "zero_copy" if zero_copy else "pickle"
+            rows.append([runtime, fps or "max", len(latency) / duration, mean(latency), stdev(latency)])
+            logger.info(f"{runtime}, fps={fps}: {rows[-1][2]:.1f} frames/s, latency={rows[-1][3] * 1e3:.2f} ms")
+    df = pd.DataFrame(rows, columns=["runtime", "fps", "throughput", "latency", "jitter"])
+    df.index.rename("run", inplace=True)
+    df.to_csv("stats/run_frames.csv")
+
+
+if __name__ == "__main__":
+    logger = logging.getLogger(__name__)
+    logging.basicConfig(level=logging.INFO)
+    try:
+        main()
+    except KeyboardInterrupt:
+        logger.warning("Interrupt received, shutting down.")
@@ -1,5 +1,13 @@
 from .typing import *
 from .util import *
 from .transforms import *
+from .graph import Graph
+from .checkpoint import Checkpoints
+from .executor import Executor
+from .profiler import Profiler
+from .scheduler import ReplayScheduler
+from .cache import RecordingCache
+from .windows import SessionWindow, SlidingWindow, TumblingWindow
+from .resample import Resample
 from .api import API
 from .remote.api import RemoteAPI
\ No newline at end of file
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import collections
+import math
+from typing import Literal
+
+import numpy as np
+
+import streaminghub_datamux as dm
+
+Join = Literal["asof", "interp", "resample"]
+
+
+def time_of(record: dict, time_key: str = "t") -> float:
+    index = record.get("index")
+    if isinstance(index, dict) and time_key in index:
+        return float(index[time_key])
+    return float(record[time_key])
+
+
+def lerp(a, b, w: float):
+    """
+    Linearly interpolate between two records (numeric fields only). Other fields are taken from a.
+
+    """
+    if isinstance(a, dict) and isinstance(b, dict):
+        return {k: lerp(v, b.get(k), w) for k, v in a.items()}
+    numeric = (int, float, np.integer, np.floating)
+    if isinstance(a, numeric) and isinstance(b, numeric) and not isinstance(a, (bool, np.bool_)):
+        return a + (b - a) * w
+    return a
+
+
+def with_time(record: dict, t: float, time_key: str = "t") -> dict:
+    record = dict(record)
+    index = record.get("index")
+    if isinstance(index, dict) and time_key in index:
+        record["index"] = {**index, time_key: t}
+    else:
+        record[time_key] = t
+    return record
+
+
+class Aligner:
+    """
+    Align the records of multiple inputs by event time.
+
+    * **asof**: for each record of the driver input, take the nearest record (in time) of each other input
+    * **interp**: for each record of the driver input, linearly interpolate each other input onto its time
+    * **resample**: at a fixed rate, linearly interpolate every input onto each tick
+
+    A tick is only emitted once every input has progressed past it, i.e., has a later record,
+    a later watermark, or has ended. Records are held in bounded per-input buffers.
+
+    """
+
+    def __init__(
+        self,
+        n: int,
+        join: Join,
+        driver: int = 0,
+        rate: float | None = None,
+        time_key: str = "t",
+        tolerance: float | None = None,
+        buffer_size: int = 1024,
+    ) -> None:
+        assert join in ("asof", "interp", "resample"), join
+        assert join != "resample" or (rate is not None and rate > 0), "resample needs a rate"
+        self.n = n
+        self.join = join
+        self.driver = driver
+        self.rate = rate
+        self.time_key = time_key
+        self.tolerance = tolerance
+        self.buffers: list[collections.deque[tuple[float, dict]]] = [
+            collections.deque(maxlen=buffer_size) for _ in range(n)
+        ]
+        # event time up to which each input is complete
+        self.progress = [-math.inf] * n
+        self.last = [-math.inf] * n
+        self.ended = [False] * n
+        self.tick: float | None = None
+        self.ticks = 0
+
+    def push(self, i: int, item) -> None:
+        if dm.is_eos(item):
+            self.ended[i] = True
+            self.progress[i] = math.inf
+        elif type(item) is dm.Chunk:
+            for record in item.records():
+                self.push(i, record)
+        else:
+            t = time_of(item, self.time_key)
+            self.buffers[i].append((t, item))
+            self.last[i] = max(self.last[i], t)
+            self.progress[i] = max(self.progress[i], t)
+
+    def advance(self, i: int, watermark: float) -> None:
+        self.progress[i] = max(self.progress[i], watermark)
+
+    def pop(self) -> list[list[dict | None]]:
+        """
+        Get the aligned rows (one record per input, or None) of all ticks that are complete.
+
+        """
+        if self.join == "resample":
+            return self._pop_resampled()
+        rows = []
+        buffer = self.buffers[self.driver]
+        others = [j for j in range(self.n) if j != self.driver]
+        while len(buffer) > 0:
+            t, record = buffer[0]
+            if any(self.progress[j] < t for j in others):
+                break
+            buffer.popleft()
+            row: list[dict | None] = [None] * self.n
+            row[self.driver] = record
+            for j in others:
+                row[j] = self._lookup(j, t)
+            rows.append(row)
+        return rows
+
+    def _pop_resampled(self) -> list[list[dict | None]]:
+        assert self.rate is not None
+        if self.tick is None:
+            # start once every input has data
+            if any(len(b) == 0 for b in self.buffers):
+                return []
+            self.tick = max(b[0][0] for b in self.buffers)
+            self.ticks = 0
+        rows = []
+        while True:
+            t = self.tick + self.ticks / self.rate
+            if any(p < t for p in self.progress):
+                break
+            if any(e and t > last for e, last in zip(self.ended, self.last)):
+                break  # past the end of an input
+            rows.append([self._lookup(j, t) for j in range(self.n)])
+            self.ticks += 1
+        return rows
+
+    def _lookup(self, j: int, t: float) -> dict | None:
+        buffer = self.buffers[j]
+        # keep at most one record at/before t, as ticks only move forward
+        while len(buffer) >= 2 and buffer[1][0] <= t:
+            buffer.popleft()
+        if len(buffer) == 0:
+            return None
+        if buffer[0][0] <= t:
+            before, after = buffer[0], (buffer[1] if len(buffer) > 1 else None)
+        else:
+            before, after = None, buffer[0]
+        if self.join == "asof":
+            candidates = [x for x in (before, after) if x is not None]
+            tn, record = min(candidates, key=lambda x: abs(x[0] - t))
+            if self.tolerance is not None and abs(tn - t) > self.tolerance:
+                return None
+            return record
+        # interp / resample
+        if before is None:
+            return None  # do not extrapolate backwards
+        t0, r0 = before
+        if after is None or after[0] == t0:
+            if self.tolerance is not None and t - t0 > self.tolerance:
+                return None
+            return with_time(r0, t, self.time_key)
+        t1, r1 = after
+        return with_time(lerp(r0, r1, (t - t0) / (t1 - t0)), t, self.time_key)
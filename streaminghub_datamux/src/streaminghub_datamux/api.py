@@ -18,16 +18,20 @@ class API(dm.IAPI):
 
     """
 
-    def __init__(self):
+    def __init__(self, scheduler: dm.ReplayScheduler | None = None, cache: dm.RecordingCache | None = None):
         """
         Create API instance.
 
+        Args:
+            scheduler (dm.ReplayScheduler | None): optional scheduler to run replays on (instead of a process each)
+            cache (dm.RecordingCache | None): optional cache of decoded recordings, to share across replays
         """
         super().__init__()
         dm.init_logging()
         self.config = dfds.load_config()
-        self.reader_c = CollectionManager(self.config)
+        self.reader_c = CollectionManager(self.config, cache=cache)
         self.proxy_n = ProxyManager()
+        self.scheduler = scheduler
         self.context: dict[str, dm.Flag] = {}
 
         # setup CollectionManager
@@ -56,11 +60,40 @@ class API(dm.IAPI):
         rate_limit: bool = True,
         strict_time: bool = True,
         use_relative_ts: bool = True,
+        chunk_size: int = 1,
+        max_latency: float | None = None,
+        checkpoint: dict | None = None,
+        bulk: bool = False,
+        speed: float = 1.0,
+        start_time: float | None = None,
+        end_time: float | None = None,
     ) -> dm.StreamAck:
         randseq = dm.prefix + dm.gen_randseq()
         if isinstance(transform, dm.Enveloper):
             transform.prefix = randseq.encode()
         self.context[randseq] = dm.create_flag()
+        if self.scheduler is not None:
+            attachment = dm.Attachment(
+                self.reader_c,
+                source_id=collection_id,
+                stream_id=stream_id,
+                attrs=attrs,
+                q=sink,
+                transform=transform,
+                flag=self.context[randseq],
+                rate_limit=rate_limit,
+                strict_time=strict_time,
+                use_relative_ts=use_relative_ts,
+                chunk_size=chunk_size,
+                max_latency=max_latency,
+                checkpoint=checkpoint,
+                bulk=bulk,
+                speed=speed,
+                start_time=start_time,
+                end_time=end_time,
+            )
+            self.scheduler.submit(attachment)
+            return dm.StreamAck(status=True, randseq=randseq)
         self.reader_c.attach(
             source_id=collection_id,
             stream_id=stream_id,
@@ -71,6 +104,13 @@ class API(dm.IAPI):
             rate_limit=rate_limit,
             strict_time=strict_time,
             use_relative_ts=use_relative_ts,
+            chunk_size=chunk_size,
+            max_latency=max_latency,
+            checkpoint=checkpoint,
+            bulk=bulk,
+            speed=speed,
+            start_time=start_time,
+            end_time=end_time,
         )
         return dm.StreamAck(status=True, randseq=randseq)
 
@@ -107,6 +147,9 @@ class API(dm.IAPI):
         rate_limit: bool = True,
         strict_time: bool = True,
         use_relative_ts: bool = True,
+        chunk_size: int = 1,
+        max_latency: float | None = None,
+        checkpoint: dict | None = None,
     ) -> dm.StreamAck:
         randseq = dm.gen_randseq()
         self.context[randseq] = dm.create_flag()
@@ -123,6 +166,9 @@ class API(dm.IAPI):
             rate_limit=rate_limit,
             strict_time=strict_time,
             use_relative_ts=use_relative_ts,
+            chunk_size=chunk_size,
+            max_latency=max_latency,
+            checkpoint=checkpoint,
         )
         return dm.StreamAck(status=True, randseq=randseq)
 
@@ -142,6 +188,12 @@ class API(dm.IAPI):
         rate_limit: bool = True,
         strict_time: bool = True,
         use_relative_ts: bool = True,
+        chunk_size: int = 1,
+        max_latency: float | None = None,
+        bulk: bool = False,
+        speed: float = 1.0,
+        start_time: float | None = None,
+        end_time: float | None = None,
     ) -> dm.SourceTask:
         mode = stream.attrs.get("mode")
         assert mode in ["proxy", "replay"]
@@ -160,4 +212,10 @@ class API(dm.IAPI):
             rate_limit=rate_limit,
             strict_time=strict_time,
             use_relative_ts=use_relative_ts,
+            chunk_size=chunk_size,
+            max_latency=max_latency,
+            bulk=bulk,
+            speed=speed,
+            start_time=start_time,
+            end_time=end_time,
         )
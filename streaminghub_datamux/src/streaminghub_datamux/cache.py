@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+
+def _default_path() -> Path:
+    # shared memory (when available), so that cached recordings never touch the disk
+    root = Path("/dev/shm") if Path("/dev/shm").is_dir() else Path(tempfile.gettempdir())
+    return root / "streaminghub-datamux-cache"
+
+
+class RecordingCache:
+    """
+    Memory-bounded LRU cache of decoded recordings, shared across replay processes.
+
+    Each recording is kept as a directory of .npy files (one per column), and replays map them read-only,
+    so repeated replays (in any process) skip reading and decoding the file, and share the same pages.
+    Recordings are keyed by anything that changes their content (e.g., collection, stream, attrs, file mtime).
+    Once the cached recordings exceed the capacity, the least recently used ones are evicted.
+    Replays that still map an evicted recording keep reading it, until they close it.
+
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, capacity: int = 2**30, path: str | Path | None = None) -> None:
+        """
+        Create a cache (or open the one at path, which may be shared with other processes).
+
+        Args:
+            capacity (int): max. number of bytes to cache
+            path (str | Path | None): directory to keep recordings in (defaults to one in /dev/shm)
+        """
+        self.capacity = capacity
+        self.path = Path(path) if path is not None else _default_path()
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(*parts) -> str:
+        """
+        Compute the key of a recording.
+
+        Args:
+            *parts: json-serializable parts of the key
+
+        Returns:
+            str: key of the recording
+        """
+        data = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha1(data.encode()).hexdigest()
+
+    @contextlib.contextmanager
+    def _locked(self):
+        # serializes lookups, inserts, and evictions across processes
+        with open(self.path / ".lock", "w") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _count(self, **deltas: int) -> None:
+        fp = self.path / "stats.json"
+        stats = json.loads(fp.read_text()) if fp.exists() else {}
+        for k, v in deltas.items():
+            stats[k] = stats.get(k, 0) + v
+        fp.write_text(json.dumps(stats))
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        # (last use, bytes, path) of each cached recording
+        entries = []
+        for d in self.path.iterdir():
+            fp = d / "manifest.json"
+            if d.name.startswith(".") or not fp.exists():
+                continue
+            entries.append((fp.stat().st_mtime, json.loads(fp.read_text())["nbytes"], d))
+        return entries
+
+    def get(self, key: str) -> dict[str, np.ndarray] | None:
+        """
+        Get a recording, and mark it as recently used.
+
+        Args:
+            key (str): key of the recording
+
+        Returns:
+            dict[str, np.ndarray] | None: read-only columns of the recording, or None if it is not cached
+        """
+        d = self.path / key
+        with self._locked():
+            fp = d / "manifest.json"
+            if not fp.exists():
+                self._count(misses=1)
+                return None
+            os.utime(fp)
+            self._count(hits=1)
+            return self._map(d)
+
+    def _map(self, d: Path) -> dict[str, np.ndarray]:
+        names = json.loads((d / "manifest.json").read_text())["columns"]
+        # a plain view of the mapped file, so that slices are sent (pickled) as arrays
+        return {name: np.load(d / f"{i}.npy", mmap_mode="r").view(np.ndarray) for i, name in enumerate(names)}
+
+    def allocate(self, n: int, dtypes: dict[str, np.dtype]) -> tuple[Path, dict[str, np.ndarray]] | None:
+        """
+        Allocate the columns of a recording to fill in (e.g., a block at a time), before commit().
+
+        Args:
+            n (int): number of records
+            dtypes (dict[str, np.dtype]): dtype of each column
+
+        Returns:
+            tuple[Path, dict[str, np.ndarray]] | None: staging directory and writable columns,
+            or None if the recording cannot be cached (i.e., larger than the capacity, or of object columns)
+        """
+        nbytes = sum(n * np.dtype(dtype).itemsize for dtype in dtypes.values())
+        if nbytes > self.capacity or any(np.dtype(dtype).hasobject for dtype in dtypes.values()):
+            return None
+        tmp = Path(tempfile.mkdtemp(prefix=".staging-", dir=self.path))
+        columns = {}
+        for i, (name, dtype) in enumerate(dtypes.items()):
+            columns[name] = np.lib.format.open_memmap(tmp / f"{i}.npy", mode="w+", dtype=dtype, shape=(n,))
+        (tmp / "manifest.json").write_text(json.dumps(dict(columns=list(dtypes), nbytes=nbytes)))
+        return tmp, columns
+
+    def commit(self, key: str, tmp: Path) -> dict[str, np.ndarray]:
+        """
+        Add an allocated (and filled-in) recording to the cache, evicting the least recently used ones to fit it.
+
+        Args:
+            key (str): key of the recording
+            tmp (Path): staging directory (see allocate)
+
+        Returns:
+            dict[str, np.ndarray]: read-only columns of the recording
+        """
+        nbytes = json.loads((tmp / "manifest.json").read_text())["nbytes"]
+        with self._locked():
+            if (self.path / key).exists():
+                # cached by another process in the meantime
+                self._remove(tmp)
+                return self._map(self.path / key)
+            entries = sorted(self._entries())
+            total = sum(entry[1] for entry in entries)
+            evicted = 0
+            for _, size, d in entries:
+                if total + nbytes <= self.capacity:
+                    break
+                self._remove(d)
+                total -= size
+                evicted += 1
+                self._count(evictions=1, evicted_bytes=size)
+            if evicted > 0:
+                self.logger.debug(f"evicted {evicted} recordings, to fit {nbytes} bytes")
+            os.rename(tmp, self.path / key)
+            self._count(inserts=1)
+            return self._map(self.path / key)
+
+    def discard(self, tmp: Path) -> None:
+        """
+        Discard an allocated recording (e.g., when it could not be filled in).
+
+        Args:
+            tmp (Path): staging directory (see allocate)
+        """
+        self._remove(tmp)
+
+    def _remove(self, d: Path) -> None:
+        # rename first, so that the recording disappears at once. mapped files stay readable until closed
+        trash = Path(tempfile.mkdtemp(prefix=".trash-", dir=self.path))
+        os.rename(d, trash / d.name)
+        shutil.rmtree(trash, ignore_errors=True)
+
+    def clear(self) -> None:
+        with self._locked():
+            for _, _, d in self._entries():
+                self._remove(d)
+
+    def stats(self) -> dict:
+        """
+        Get the hits, misses, inserts, and evictions of the cache (across all processes), and its current size.
+
+        Returns:
+            dict: cache stats
+        """
+        with self._locked():
+            fp = self.path / "stats.json"
+            stats = dict(hits=0, misses=0, inserts=0, evictions=0, evicted_bytes=0)
+            stats.update(json.loads(fp.read_text()) if fp.exists() else {})
+            entries = self._entries()
+        stats.update(recordings=len(entries), nbytes=sum(entry[1] for entry in entries), capacity=self.capacity)
+        return stats
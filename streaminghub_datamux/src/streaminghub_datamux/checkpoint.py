@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import logging
+import os
+import pickle
+import shutil
+import threading
+from pathlib import Path
+from typing import Callable
+
+
+class Checkpoints:
+    """
+    Periodic checkpoints of a pipeline, kept in a directory (one file per task, per checkpoint id).
+
+    A checkpoint is taken by sending Signal.checkpoint(id) down from the sources, so that each task saves
+    its state once it has processed every message before it. Replayed streams save their offset the same way.
+    A checkpoint is complete once every task (see keys) has saved into it, and a restarted pipeline
+    resumes from the latest complete one. Messages after it are processed again (i.e., at-least-once).
+
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, path: str | Path, interval: float = 10.0, keep: int = 3) -> None:
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.interval = interval
+        self.keep = keep
+        # keys of the tasks (and streams) that take part in each checkpoint
+        self.keys: list[str] = []
+        # id of the checkpoint that was restored (0 if none)
+        self.restored = 0
+        self.stopped = threading.Event()
+        self.thread: threading.Thread | None = None
+
+    def _dir(self, id: int) -> Path:
+        return self.path / f"{id:08d}"
+
+    def save(self, id: int, key: str, state: dict) -> None:
+        d = self._dir(id)
+        d.mkdir(exist_ok=True)
+        # write-then-rename, so that a checkpoint never holds a partial file
+        tmp = d / f".{key}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(state, f)
+        os.replace(tmp, d / f"{key}.pkl")
+
+    def load(self, id: int, key: str) -> dict | None:
+        fp = self._dir(id) / f"{key}.pkl"
+        if not fp.exists():
+            return None
+        with open(fp, "rb") as f:
+            return pickle.load(f)
+
+    def ids(self) -> list[int]:
+        return sorted(int(d.name) for d in self.path.iterdir() if d.is_dir() and d.name.isdigit())
+
+    def is_complete(self, id: int) -> bool:
+        d = self._dir(id)
+        return all((d / f"{key}.pkl").exists() for key in self.keys)
+
+    def latest(self) -> int | None:
+        """
+        Find the latest checkpoint that every task has saved into.
+
+        Returns:
+            int | None: checkpoint id, or None if there is none
+        """
+        for id in reversed(self.ids()):
+            if self.is_complete(id):
+                return id
+
+    def prune(self) -> None:
+        # keep the latest complete checkpoints (and any newer ones in progress)
+        complete = [id for id in self.ids() if self.is_complete(id)]
+        for id in complete[: -self.keep]:
+            shutil.rmtree(self._dir(id), ignore_errors=True)
+
+    def restore(self, tasks: dict[str, object]) -> int | None:
+        """
+        Restore tasks from the latest complete checkpoint, and discard any later (incomplete) ones.
+
+        Args:
+            tasks (dict[str, ITask]): tasks to restore, by key
+
+        Returns:
+            int | None: id of the restored checkpoint, or None if there is none
+        """
+        id = self.latest()
+        for other in self.ids():
+            if id is None or other > id:
+                shutil.rmtree(self._dir(other), ignore_errors=True)
+        if id is None:
+            return None
+        for key, task in tasks.items():
+            state = self.load(id, key)
+            if state is not None:
+                task.restore(state)  # type: ignore
+        self.restored = id
+        self.logger.info(f"restored checkpoint {id} of {len(tasks)} tasks")
+        return id
+
+    def start(self, trigger: Callable[[int], None]) -> None:
+        """
+        Call trigger(id) every interval seconds, with increasing ids (i.e., to send checkpoint signals).
+
+        Args:
+            trigger (Callable[[int], None]): function that starts a checkpoint
+        """
+
+        def run():
+            id = self.restored
+            while not self.stopped.wait(self.interval):
+                id += 1
+                trigger(id)
+                self.prune()
+
+        self.stopped.clear()
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
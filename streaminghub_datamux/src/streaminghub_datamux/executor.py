@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import logging
+import os
+import signal
+import time
+
+import multiprocess
+
+import streaminghub_datamux as dm
+from streaminghub_datamux.metrics import K_STARTED_AT
+
+
+class Executor:
+    """
+    Run many lightweight tasks on a fixed pool of worker processes.
+
+    Each worker steps its tasks cooperatively, i.e., it blocks until any of their inputs (or control lanes)
+    has data, and then steps the tasks that are ready. Tasks without inputs (e.g., sources) are stepped on every round,
+    so they should return promptly. Pinned tasks (see ITask.with_pin) are started on a dedicated process instead.
+
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, workers: int | None = None) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.pooled: list[dm.ITask] = []
+        self.pinned: list[dm.ITask] = []
+        self.procs: list[multiprocess.Process] = []
+        # profiler to sample the stack of each worker with (see Pipeline.run)
+        self.profiler: dm.Profiler | None = None
+
+    def submit(self, *tasks: dm.ITask):
+        """
+        Add tasks to run on the executor. Composite tasks are added along with their internal tasks.
+
+        Args:
+            tasks (dm.ITask): tasks to run
+        """
+        for task in tasks:
+            if isinstance(task, dm.CompositeTask):
+                if task.run_self:
+                    self.pooled.append(task)
+                self.submit(*task.tasks)
+            elif task.pinned:
+                self.pinned.append(task)
+            else:
+                self.pooled.append(task)
+        return self
+
+    def start(self) -> None:
+        # assign pooled tasks to workers in a round-robin manner
+        n = min(self.workers, len(self.pooled))
+        groups = [self.pooled[i::n] for i in range(n)]
+        for i, group in enumerate(groups):
+            proc = multiprocess.Process(
+                group=None,
+                target=self.__run__,
+                args=(group,),
+                name=f"worker_{i}",
+                daemon=True,
+            )
+            proc.start()
+            for task in group:
+                task.proc = proc
+            self.procs.append(proc)
+        for task in self.pinned:
+            task.start()
+        self.logger.debug(f"Started {len(self.procs)} workers, {len(self.pinned)} pinned tasks")
+
+    def stop(self) -> None:
+        for task in self.pinned:
+            task.stop()
+        for proc in self.procs:
+            proc.terminate()
+            proc.join()
+        self.procs = []
+        self.logger.debug("Stopped workers")
+
+    def __run__(self, tasks: list[dm.ITask]) -> None:
+        stopped = False
+
+        def handler(*args):
+            nonlocal stopped
+            stopped = True
+            signal.default_int_handler(*args)
+
+        signal.signal(signal.SIGINT, handler)
+        dm.init_logging()
+        for task in tasks:
+            task.metrics.set(K_STARTED_AT, time.time_ns())
+        sampler = self.profiler.attach(multiprocess.current_process().name) if self.profiler is not None else None
+        active = list(tasks)
+        while len(active) > 0 and not stopped:
+            if sampler is not None:
+                sampler.tag = None
+            # wait for any input, unless some task can step without one
+            queues: list[dm.Queue] = []
+            eager = False
+            for task in active:
+                queues.append(task.control)
+                inputs = task.inputs
+                if inputs is None:
+                    eager = eager or not task.paused
+                elif not task.paused:
+                    queues.extend(inputs)
+            ready = set(map(id, dm.Queue.wait(queues, 0 if eager else dm.IDLE_TIMEOUT)))
+            for task in list(active):
+                pending = task._has_signals() or id(task.control) in ready
+                if task.paused and not pending:
+                    continue
+                inputs = task.inputs
+                if not pending and inputs is not None and not any(id(q) in ready for q in inputs):
+                    continue
+                if sampler is not None:
+                    sampler.tag = task.name
+                try:
+                    retval = task._tick()
+                except BaseException as e:
+                    self.logger.warning(f"[{task.name}] has crashed: {e}")
+                    continue
+                if retval is not None:
+                    self.logger.debug(f"[{task.name}] task exited with code: {retval}")
+                    active.remove(task)
+        if sampler is not None:
+            sampler.stop()
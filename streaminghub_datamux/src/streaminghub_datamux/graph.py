@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import collections
+import time
+
+import streaminghub_datamux as dm
+from streaminghub_datamux.transforms import CompositeTask, Pipeline
+
+
+def _has_input(task: dm.ITask) -> bool:
+    return isinstance(getattr(task, "source", None), dm.Queue)
+
+
+def _has_output(task: dm.ITask) -> bool:
+    return isinstance(getattr(task, "target", None), dm.Queue)
+
+
+class _AllOf:
+    """
+    Completion flag of a graph, which is set once the flags of all its sinks are set.
+
+    """
+
+    def __init__(self, flags: list[dm.Flag]) -> None:
+        self.flags = flags
+
+    def is_set(self) -> bool:
+        return all(flag.is_set() for flag in self.flags)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        for flag in self.flags:
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            if not flag.wait(remaining):
+                return False
+        return True
+
+
+class Graph(Pipeline):
+    """
+    Pipeline of named tasks, wired by edges into a directed acyclic graph
+
+    Edges are given as paths, e.g., ("gaze", "ivt", "sink") for gaze -> ivt -> sink.
+    A task that feeds many tasks copies each message into their queues (fan-out),
+    and a task fed by many tasks reads them from one shared queue (fan-in), and ends once all of them have ended.
+    A fan-in passes on the earliest watermark of its inputs, and each checkpoint once all of its inputs have passed it.
+    A one-to-one edge reuses the queue of the producer, so no task in between is needed (e.g., Broadcast).
+
+    Tasks are started in reverse topological order (i.e., consumers first),
+    and the graph completes once every sink has seen END_OF_STREAM.
+
+    """
+
+    def __init__(
+        self,
+        nodes: dict[str, dm.ITask],
+        edges: list[tuple[str, ...]],
+        capacity: int | None = None,
+        policy: dm.Policy = "block",
+        executor: dm.Executor | None = None,
+        checkpoints: dm.Checkpoints | None = None,
+    ) -> None:
+        self.nodes = nodes
+        self.inputs_of: dict[str, list[str]] = {name: [] for name in nodes}
+        self.outputs_of: dict[str, list[str]] = {name: [] for name in nodes}
+        for path in edges:
+            if len(path) < 2:
+                raise ValueError(f"edge needs at least two nodes: {path}")
+            for a, b in zip(path[:-1], path[1:]):
+                self._add_edge(a, b)
+        order = self._toposort()
+        self._validate()
+        # the graph is composed of its nodes, but wired here (instead of as a linear pipeline)
+        CompositeTask.__init__(self, *[nodes[name] for name in reversed(order)], run_self=False)
+        self.executor = executor
+        self.checkpoints = checkpoints
+        self.source = None  # type: ignore
+        self.target = None  # type: ignore
+        for name, task in nodes.items():
+            task.with_name(name)
+        self._wire(capacity, policy)
+        if checkpoints is not None:
+            self._attach_checkpoints(checkpoints)
+        self.completed = _AllOf([nodes[name].completed for name in order if len(self.outputs_of[name]) == 0])  # type: ignore
+
+    def _add_edge(self, a: str, b: str) -> None:
+        for name in (a, b):
+            if name not in self.nodes:
+                raise ValueError(f"unknown node: {name}")
+        if b in self.outputs_of[a]:
+            raise ValueError(f"duplicate edge: {a} -> {b}")
+        if not _has_output(self.nodes[a]):
+            raise ValueError(f"node has no output: {a}")
+        if not _has_input(self.nodes[b]):
+            raise ValueError(f"node takes no input: {b}")
+        self.outputs_of[a].append(b)
+        self.inputs_of[b].append(a)
+
+    def _toposort(self) -> list[str]:
+        # Kahn's algorithm, i.e., sources first
+        degree = {name: len(inputs) for name, inputs in self.inputs_of.items()}
+        ready = collections.deque(name for name, d in degree.items() if d == 0)
+        order = []
+        while len(ready) > 0:
+            name = ready.popleft()
+            order.append(name)
+            for b in self.outputs_of[name]:
+                degree[b] -= 1
+                if degree[b] == 0:
+                    ready.append(b)
+        if len(order) < len(self.nodes):
+            cycle = sorted(name for name, d in degree.items() if d > 0)
+            raise ValueError(f"graph has a cycle through: {cycle}")
+        return order
+
+    def _validate(self) -> None:
+        for name, task in self.nodes.items():
+            if _has_input(task) and len(self.inputs_of[name]) == 0:
+                raise ValueError(f"node has no input: {name}")
+            if _has_output(task) and len(self.outputs_of[name]) == 0:
+                raise ValueError(f"output of node is not consumed: {name}")
+            if not _has_output(task) and not isinstance(getattr(task, "completed", None), dm.Flag):
+                raise ValueError(f"node has neither an output nor a completion flag: {name}")
+        if not any(len(outputs) == 0 for outputs in self.outputs_of.values()):
+            raise ValueError("graph has no sink")
+
+    def _wire(self, capacity: int | None, policy: dm.Policy) -> None:
+        def create() -> dm.Queue:
+            return dm.Queue(capacity=capacity, policy=policy)
+
+        # bound the queues of one-to-one edges (i.e., the queues of the producers)
+        for name, task in self.nodes.items():
+            if capacity is not None and _has_output(task) and task.target.capacity is None:  # type: ignore
+                task.target.set_policy(capacity, policy)  # type: ignore
+
+        # consumers of a one-to-one edge read from the queue of the producer. all others get a queue of their own
+        for name, inputs in self.inputs_of.items():
+            if len(inputs) == 0:
+                continue
+            task = self.nodes[name]
+            if len(inputs) == 1 and len(self.outputs_of[inputs[0]]) == 1:
+                task.source.assign(self.nodes[inputs[0]].target)  # type: ignore
+            else:
+                task.source.assign(create())  # type: ignore
+                task.source.with_producers(len(inputs))  # type: ignore
+
+        # producers of a fan-in write into the queue of the consumer, and producers of a fan-out into all of them.
+        # writers of a fan-in go through a handle of their own, so that the consumer can merge their signals
+        for name, outputs in self.outputs_of.items():
+            if len(outputs) == 0:
+                continue
+            target: dm.Queue = self.nodes[name].target  # type: ignore
+            consumers = [
+                self.nodes[b].source.as_input(self.inputs_of[b].index(name)) if len(self.inputs_of[b]) > 1 else self.nodes[b].source  # type: ignore
+                for b in outputs
+            ]
+            if len(outputs) > 1:
+                target.tee(*consumers)
+            elif len(self.inputs_of[outputs[0]]) > 1:
+                target.assign(consumers[0])
+            self.logger.debug(f"task={name}, target={target}, consumers={outputs}")
+
+    def signal(self, sig: dm.Signal) -> None:
+        # pause/resume every task. pass other signals to the entry points (i.e., the sources)
+        if sig.kind in ("pause", "resume"):
+            return super().signal(sig)
+        for name, inputs in self.inputs_of.items():
+            if len(inputs) == 0:
+                self.nodes[name].signal(sig)
@@ -8,6 +8,11 @@ import numpy as np
 import streaminghub_datamux as dm
 import streaminghub_pydfds as dfds
 
+# max. number of records to send per pull, when records are due faster than they are sent (e.g., without rate limits)
+MAX_SLICE = 1024
+# number of records to read from a recording at a time (i.e., replay memory does not grow with the recording)
+READ_BLOCK = 65536
+
 
 class CollectionManager(dm.Reader[dfds.Collection], dm.IServe):
     """
@@ -27,9 +32,11 @@ class CollectionManager(dm.Reader[dfds.Collection], dm.IServe):
     def __init__(
         self,
         config: dfds.Config,
+        cache: dm.RecordingCache | None = None,
     ) -> None:
         super().__init__()
         self.config = config
+        self.cache = cache
         self.__parser = dfds.Parser()
         self.__collections = dict()
 
@@ -75,7 +82,11 @@ class CollectionManager(dm.Reader[dfds.Collection], dm.IServe):
         attrs: dict,
         q: dm.Queue,
         transform: Callable,
+        speed: float = 1.0,
+        start_time: float | None = None,
+        end_time: float | None = None,
     ) -> dict:
+        assert speed > 0, f"invalid replay speed: {speed}"
         collection = self.__collections[source_id]
         stream = collection.streams[stream_id].model_copy()
         stream.attrs.update(attrs, dfds_mode="replay")
@@ -86,36 +97,252 @@ class CollectionManager(dm.Reader[dfds.Collection], dm.IServe):
         index_cols = list(stream.index)
         value_cols = list(stream.fields)
 
-        attrs, data = collection.dataloader(self.config).read(stream.attrs)
-        stream.attrs.update(attrs)
+        state = {}
+        state["rows"] = None
+        state["freq"] = freq
+        state["scale"] = 1
+        state["index_cols"] = index_cols
+        state["value_cols"] = value_cols
+        state["buf_start"] = 0
+        state["buf"] = None
+        state["sorted"] = False
 
-        # preprocessing
-        logging.debug(f"index_cols={index_cols}, data.index={data.index.name}, data.columns={data.columns.values}")
-        data = data.sort_values(index_cols, ascending=True)
-        # if index not present, create one with given frequency
-        for col in index_cols:
-            if col not in data.columns:
-                data[col] = np.arange(len(data)) / freq
-        # always convert time to seconds
-        primary_index = index_cols[0]
-        dt_true = float(data.iloc[1][primary_index] - data.iloc[0][primary_index])
-        si_scales = np.array([1, 1e3, 1e6, 1e9], dtype=int)
-        scale = si_scales[np.abs(si_scales - dt_true / dt).argmin()]
-        data[primary_index] = data[primary_index] / scale
+        # look up the decoded recording in the cache (unless its index is made up at a random frequency)
+        dataloader = collection.dataloader(self.config)
+        key, cached = None, None
+        if self.cache is not None and stream.frequency > 0:
+            fp = dataloader.path(stream.attrs)
+            key = self.cache.key(source_id, stream_id, stream.attrs, index_cols, value_cols, str(fp), fp.stat().st_mtime_ns)
+            cached = self.cache.get(key)
+
+        if cached is None:
+            attrs, rows = dataloader.open(stream.attrs)
+            stream.attrs.update(attrs)
+
+            # preprocessing
+            primary_index = index_cols[0]
+            logging.debug(f"index_cols={index_cols}, columns={rows.columns}")
+            state["rows"] = rows
+            # replay reads (and searches) recordings a block at a time, which needs them in time order.
+            # recordings read into memory are checked as a whole, and others by their first block here,
+            # and by each block as it is read (see _fetch). those out of order are sorted in memory
+            if primary_index in rows.columns and len(rows) > 1:
+                if isinstance(rows, dfds.DataFrameRows):
+                    times = rows.column(primary_index)
+                else:
+                    times = rows.read(0, min(READ_BLOCK, len(rows)))[primary_index].to_numpy()
+                if not self._in_order(times):
+                    self.logger.warning(f"{source_id}/{stream_id}: recording is out of time order, sorting it in memory")
+                    self._sort(state)
+                    rows = state["rows"]
+                del times
+            # always convert time to seconds (if index not present, it is created with given frequency)
+            if primary_index in rows.columns and len(rows) > 1:
+                head = rows.read(0, 2)
+                dt_true = float(head[primary_index].iloc[1] - head[primary_index].iloc[0])
+                si_scales = np.array([1, 1e3, 1e6, 1e9], dtype=int)
+                state["scale"] = si_scales[np.abs(si_scales - dt_true / dt).argmin()]
+            if key is not None:
+                cached = self._cache_recording(state, key)
+
+        if cached is not None:
+            # replay from the cached columns, as a buffer that holds every record
+            if state["rows"] is not None:
+                state["rows"].close()
+                state["rows"] = None
+            state["buf"] = self._unflatten(state, cached)
+        # seek to the [start_time, end_time] window (in seconds from the first record) by binary search
+        state["start_time"] = start_time
+        state["end_time"] = end_time
+        state["T0"] = self._time_at(state, 0) if self._len(state) > 0 else 0.0
+        start, stop = self._window(state)
 
         # replay each record
         self.logger.info(f"replay started")
 
-        state = {}
         state["t0"] = None
-        state["T0"] = None
         state["dt"] = dt
-        state["data"] = data
-        state["idx"] = 0
-        state["index_cols"] = index_cols
-        state["value_cols"] = value_cols
+        state["speed"] = speed
+        state["t_next"] = None
+        # number of records sent, and the time of the last one (records found to be earlier, after sorting, are skipped)
+        state["sent"] = 0
+        state["t_last"] = None
+        state["idx"] = min(start, stop)
+        state["stop"] = stop
         return state
 
+    @staticmethod
+    def _in_order(times: np.ndarray, before: float | None = None) -> bool:
+        # whether times are in order (and not earlier than the time before them, if given)
+        if before is not None and len(times) > 0 and times[0] < before:
+            return False
+        return bool(np.all(times[1:] >= times[:-1]))
+
+    def _sort(self, state: dict) -> None:
+        # read the whole recording into memory, in time order
+        rows = state["rows"]
+        sort_cols = [col for col in state["index_cols"] if col in rows.columns]
+        data = rows.read(0, len(rows)).sort_values(sort_cols, ascending=True, kind="stable")
+        rows.close()
+        state["rows"] = dfds.DataFrameRows(data.reset_index(drop=True))
+        state["sorted"] = True
+        state["buf"], state["buf_start"] = None, 0
+
+    def _window(self, state: dict) -> tuple[int, int]:
+        # records [start, stop) within [start_time, end_time] (in seconds from T0)
+        start_time, end_time, T0 = state["start_time"], state["end_time"], state["T0"]
+        start = 0 if start_time is None else self._search(state, T0 + start_time, side="left")
+        stop = self._len(state) if end_time is None else self._search(state, T0 + end_time, side="right")
+        return start, stop
+
+    def _reorder(self, state: dict) -> None:
+        # a block was found out of time order while replaying. sort the recording, and carry on after the last record sent
+        self.logger.warning("recording is out of time order, sorting it in memory")
+        self._sort(state)
+        if state["t_last"] is None:
+            state["T0"] = self._time_at(state, 0)
+            start, stop = self._window(state)
+        else:
+            first, stop = self._window(state)
+            start = self._search(state, state["t_last"], side="right")
+            skipped = start - first - state["sent"]
+            if skipped > 0:
+                self.logger.warning(f"skipping {skipped} records that are earlier than those already sent")
+        state["idx"], state["stop"] = min(start, stop), stop
+
+    def _len(self, state: dict) -> int:
+        if state["rows"] is None:
+            return len(state["buf"]["times"])
+        return len(state["rows"])
+
+    def _time_at(self, state: dict, i: int) -> float:
+        # time of a record (in seconds), read on its own
+        col = state["index_cols"][0]
+        if state["rows"] is None:
+            return float(state["buf"]["times"][i])
+        if col not in state["rows"].columns:
+            return i / state["freq"]
+        return float(state["rows"].value_at(col, i)) / state["scale"]
+
+    def _search(self, state: dict, t: float, side: str) -> int:
+        # index of the first record at (side="left") or after (side="right") a time (in seconds)
+        rows, col = state["rows"], state["index_cols"][0]
+        if rows is None:
+            return int(np.searchsorted(state["buf"]["times"], t, side=side))  # type: ignore
+        if col not in rows.columns:
+            i = t * state["freq"]
+            i = np.ceil(i - 1e-9) if side == "left" else np.floor(i + 1e-9) + 1
+            return int(min(max(i, 0), len(rows)))
+        return rows.searchsorted(col, t * state["scale"], side=side)
+
+    def _fetch(self, state: dict, start: int, end: int) -> dict:
+        """
+        Get records [start, end) as arrays, reading the recording READ_BLOCK records at a time.
+        Records before start are dropped, so memory use does not grow with the recording.
+        If a block is out of time order, the recording is sorted, and the records from the new replay position are returned.
+
+        Args:
+            state (dict): replay state
+            start (int): index of the first record
+            end (int): index after the last record
+
+        Returns:
+            dict: times (in seconds), index and value arrays of the records
+        """
+        end = min(end, state["stop"])
+        buf, lo = state["buf"], state["buf_start"]
+        hi = lo if buf is None else lo + len(buf["times"])
+        if start < lo or start > hi:
+            # seeking (e.g., on restore) starts a new buffer
+            buf, lo, hi = None, start, start
+        if end > hi:
+            block = self._read(state, hi, min(max(end, hi + READ_BLOCK), state["stop"]))
+            if not self._in_order(block["times"], None if buf is None or hi == lo else buf["times"][-1]):
+                # carry on from where the replay is moved to (start is always the replay position)
+                self._reorder(state)
+                return self._fetch(state, state["idx"], state["idx"] + (end - start))
+            if buf is None:
+                buf = block
+            else:
+                buf = dict(
+                    times=np.concatenate([buf["times"][start - lo :], block["times"]]),
+                    index={k: np.concatenate([v[start - lo :], block["index"][k]]) for k, v in buf["index"].items()},
+                    value={k: np.concatenate([v[start - lo :], block["value"][k]]) for k, v in buf["value"].items()},
+                )
+                lo = start
+            state["buf"], state["buf_start"] = buf, lo
+        rows = slice(start - lo, end - lo)
+        return dict(
+            times=buf["times"][rows],  # type: ignore
+            index={k: v[rows] for k, v in buf["index"].items()},  # type: ignore
+            value={k: v[rows] for k, v in buf["value"].items()},  # type: ignore
+        )
+
+    def _read(self, state: dict, start: int, end: int) -> dict:
+        # read a block of records, and convert its columns to contiguous arrays, so that replay only slices them
+        data = state["rows"].read(start, end)
+        index_cols, value_cols = state["index_cols"], state["value_cols"]
+        primary_index = index_cols[0]
+        for col in index_cols:
+            if col not in data.columns:
+                data = data.assign(**{col: np.arange(start, end) / state["freq"]})
+        # in time order (see on_attach), so blocks are not sorted
+        times = data[primary_index].to_numpy(dtype=np.float64) / state["scale"]
+        index = {k: np.ascontiguousarray(data[k].to_numpy()) for k in index_cols}
+        index[primary_index] = times
+        value = {k: np.ascontiguousarray(data[k].to_numpy()) for k in value_cols}
+        return dict(times=times, index=index, value=value)
+
+    def _cache_recording(self, state: dict, key: str) -> dict[str, np.ndarray] | None:
+        # decode the whole recording into the cache, a block at a time
+        assert self.cache is not None
+        n = self._len(state)
+        if n == 0:
+            return None
+        columns = self._flatten(state, self._read(state, 0, min(READ_BLOCK, n)))
+        staged = self.cache.allocate(n, {k: v.dtype for k, v in columns.items()})
+        if staged is None:
+            return None
+        tmp, out = staged
+        try:
+            start = 0
+            while True:
+                for k, v in columns.items():
+                    out[k][start : start + len(v)] = v
+                start += len(columns["times"])
+                if start >= n:
+                    break
+                columns = self._flatten(state, self._read(state, start, min(start + READ_BLOCK, n)))
+            for v in out.values():
+                v.flush()  # type: ignore
+            # other replays trust cached recordings to be in time order, so never commit one that is not
+            times = out["times"]
+            ordered = bool(np.all(times[1:] >= times[:-1]))
+        except BaseException:
+            self.cache.discard(tmp)
+            raise
+        del out, times
+        if not ordered:
+            self.cache.discard(tmp)
+            self.logger.warning("recording is out of time order, sorting it in memory")
+            self._sort(state)
+            return self._cache_recording(state, key)
+        return self.cache.commit(key, tmp)
+
+    def _flatten(self, state: dict, records: dict) -> dict[str, np.ndarray]:
+        # one column per array (the primary index is left out, since it is the same as the times)
+        primary_index = state["index_cols"][0]
+        columns = {"times": records["times"]}
+        columns.update({f"index.{k}": v for k, v in records["index"].items() if k != primary_index})
+        columns.update({f"value.{k}": v for k, v in records["value"].items()})
+        return columns
+
+    def _unflatten(self, state: dict, columns: dict[str, np.ndarray]) -> dict:
+        times = columns["times"]
+        index = {k: times if k == state["index_cols"][0] else columns[f"index.{k}"] for k in state["index_cols"]}
+        value = {k: columns[f"value.{k}"] for k in state["value_cols"]}
+        return dict(times=times, index=index, value=value)
+
     def on_pull(
         self,
         source_id: str,
@@ -127,49 +354,120 @@ class CollectionManager(dm.Reader[dfds.Collection], dm.IServe):
         rate_limit: bool = True,
         strict_time: bool = True,
         use_relative_ts: bool = True,
+        **kwargs,
     ) -> int | None:
 
-        t0 = state["t0"]
-        T0 = state["T0"]
-        dt = state["dt"]
-        data = state["data"]
-        idx = state["idx"]
-        index_cols = state["index_cols"]
-        value_cols = state["value_cols"]
-
         # termination condition
-        if idx == len(data.index):
+        if state["idx"] >= state["stop"]:
             return 0
 
-        # create record
-        record = data.iloc[idx]
-        index = {k: record[k] for k in index_cols}
-        value = {k: record[k] for k in value_cols}
+        # read ahead what this pull may send, since reading may move the replay (see _fetch)
+        batch = q.chunk_size if isinstance(q, dm.ChunkedQueue) else 1
+        self._fetch(state, state["idx"], state["idx"] + max(batch, MAX_SLICE))
+        T0 = state["T0"]
+        speed = state["speed"]
+        idx = state["idx"]
+        n = state["stop"]
+        if idx >= n:
+            return 0
 
         # wait until time requirements are met
+        deadline = self.on_deadline(q, state, rate_limit, strict_time)
+        if deadline is not None:
+            wait = deadline - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+
+        # find the records that are due
         if strict_time:
-            if t0 is None or T0 is None:
-                t0, T0 = time.perf_counter(), index[index_cols[0]]
-                state["t0"] = t0
-                state["T0"] = T0
+            if state["t0"] is None:
+                # when resuming from a checkpoint, T0 is kept, so that the replay carries on from the current record
+                state["t0"] = time.perf_counter() - (self._fetch(state, idx, idx + 1)["times"][0] - T0) / speed
+            if rate_limit:
+                times = self._fetch(state, idx, idx + MAX_SLICE)["times"]
+                end = idx + int(np.searchsorted(times, T0 + (time.perf_counter() - state["t0"]) * speed, side="right"))
+                end = min(max(end, idx + 1), idx + MAX_SLICE, n)
             else:
-                ti, Ti = time.perf_counter(), index[index_cols[0]]
-                dt = (Ti - T0) - (ti - t0)
-                if rate_limit and (dt > 0):
-                    time.sleep(dt)
-        elif rate_limit:
-            time.sleep(dt)
+                # a whole number of batches, so that no partial chunk is sent mid-stream
+                end = min(idx + max(batch, MAX_SLICE - MAX_SLICE % batch), n)
+        else:
+            end = min(idx + batch, n)
+            if rate_limit:
+                # pace by the nominal frequency, from the time the replay started
+                state["t_next"] = (deadline or time.perf_counter()) + state["dt"] * (end - idx) / speed
 
-        # postprocessing
-        if use_relative_ts:
-            index[index_cols[0]] -= T0
-
-        # send record
-        msg = dict(index=index, value=value)
-        q.put(transform(msg))
+        records = self._fetch(state, idx, end)
+        self.emit(q, transform, state, records, use_relative_ts)
 
         # increment pointer
-        state["idx"] = idx + 1
+        state["idx"] = end
+        state["sent"] += end - idx
+        state["t_last"] = float(records["times"][-1])
+
+    def on_deadline(self, q: dm.Queue, state: dict, rate_limit: bool, strict_time: bool = True) -> float | None:
+        idx, speed = state["idx"], state["speed"]
+        if not rate_limit or idx >= state["stop"]:
+            return None
+        if not strict_time:
+            return state["t_next"]
+        if state["t0"] is None:
+            return None
+        # wake up once a batch (i.e., a chunk, if the queue batches records) is due,
+        # or once the first record of it has waited for max_latency. recording time runs speed times as fast
+        batch, max_latency = (q.chunk_size, q.max_latency) if isinstance(q, dm.ChunkedQueue) else (1, None)
+        times = self._fetch(state, idx, idx + batch)["times"]
+        due = (times[-1] - state["T0"]) / speed
+        if max_latency is not None:
+            due = min(due, (times[0] - state["T0"]) / speed + max_latency)
+        return state["t0"] + due
+
+    def emit(
+        self,
+        q: dm.Queue,
+        transform: Callable,
+        state: dict,
+        records: dict,
+        use_relative_ts: bool,
+    ) -> None:
+        index = dict(records["index"])
+        value = records["value"]
+        if use_relative_ts:
+            primary_index = state["index_cols"][0]
+            index[primary_index] = records["times"] - state["T0"]
+
+        # send records as chunks (when the queue batches them, and there is no per-record transform)
+        if isinstance(q, dm.ChunkedQueue) and transform is dm.identity:
+            for i in range(0, len(records["times"]), q.chunk_size):
+                rows = slice(i, i + q.chunk_size)
+                columns = dict(
+                    index={k: v[rows] for k, v in index.items()},
+                    value={k: v[rows] for k, v in value.items()},
+                )
+                q.put(dm.Chunk(columns))
+            return
+
+        # send each record
+        index_rows = {k: v.tolist() for k, v in index.items()}
+        value_rows = {k: v.tolist() for k, v in value.items()}
+        for i in range(len(records["times"])):
+            msg = dict(
+                index={k: v[i] for k, v in index_rows.items()},
+                value={k: v[i] for k, v in value_rows.items()},
+            )
+            q.put(transform(msg))
+
+    def on_checkpoint(self, state: dict) -> dict | None:
+        # the replay offset, the time origin of relative timestamps, and whether the offset is into the sorted recording
+        return dict(idx=state["idx"], T0=state["T0"], sent=state["sent"], t_last=state["t_last"], sorted=state["sorted"])
+
+    def on_restore(self, state: dict, saved: dict) -> None:
+        state["T0"] = saved["T0"]
+        state["sent"] = saved.get("sent", 0)
+        state["t_last"] = saved.get("t_last")
+        if saved.get("sorted") and not state["sorted"] and state["rows"] is not None:
+            self._sort(state)
+        _, state["stop"] = self._window(state)
+        state["idx"] = saved["idx"]
 
     def on_detach(
         self,
@@ -179,7 +477,10 @@ class CollectionManager(dm.Reader[dfds.Collection], dm.IServe):
         q: dm.Queue,
         transform: Callable,
         state: dict,
+        **kwargs,
     ) -> None:
+        if state["rows"] is not None:
+            state["rows"].close()
         # termination indicator
         eof = dm.END_OF_STREAM
         q.put(transform(eof))
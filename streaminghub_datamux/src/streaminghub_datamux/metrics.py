@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable
+
+import multiprocess
+
+# time 1 in every SAMPLE_EVERY operations, to keep the overhead low on kHz streams
+SAMPLE_EVERY = 16
+
+# log2 histogram buckets over microseconds, i.e., [<1us, <2us, <4us, ..., >=2^(NUM_BUCKETS-2)us]
+NUM_BUCKETS = 24
+
+
+class Metrics:
+    """
+    Counters and sampled timing histograms, kept in shared memory.
+
+    Every process that holds a handle updates the same slots without locks,
+    so each slot should only be written by one process (e.g., the producer or the consumer of a queue).
+    Sampling ticks are kept per process.
+
+    """
+
+    counters: tuple[str, ...] = ()
+    timers: tuple[str, ...] = ()
+
+    def __init__(self) -> None:
+        self.width = 2 + NUM_BUCKETS  # count, total_ns, buckets
+        self.array = multiprocess.RawArray("q", len(self.counters) + len(self.timers) * self.width)
+        self.ticks = [0] * len(self.timers)
+        self.every = SAMPLE_EVERY
+        self.profiling = False
+
+    def profile(self) -> None:
+        # time every operation (and take costlier measurements, e.g., serialization). call before starting
+        self.every = 1
+        self.profiling = True
+
+    def incr(self, i: int, value: int = 1) -> None:
+        self.array[i] += value
+
+    def get(self, i: int) -> int:
+        return self.array[i]
+
+    def set(self, i: int, value: int) -> None:
+        self.array[i] = value
+
+    def sample(self, j: int) -> bool:
+        self.ticks[j] += 1
+        return self.ticks[j] % self.every == 0
+
+    def observe(self, j: int, ns: int) -> None:
+        base = len(self.counters) + j * self.width
+        bucket = min(NUM_BUCKETS - 1, (ns // 1000).bit_length())
+        self.array[base] += 1
+        self.array[base + 1] += ns
+        self.array[base + 2 + bucket] += 1
+
+    def snapshot(self) -> dict:
+        """
+        Aggregate the counters and timers into a dict.
+
+        Returns:
+            dict: counter values, and (sampled count, mean seconds, histogram) of each timer
+        """
+        data = list(self.array)
+        stats: dict = {k: data[i] for i, k in enumerate(self.counters)}
+        for j, k in enumerate(self.timers):
+            base = len(self.counters) + j * self.width
+            count, total = data[base], data[base + 1]
+            stats[k] = dict(
+                samples=count,
+                mean=(total / count / 1e9) if count > 0 else None,
+                hist=data[base + 2 : base + self.width],
+            )
+        return stats
+
+
+class QueueMetrics(Metrics):
+    counters = ("put", "got", "dropped", "hwm_events", "above_hwm")
+    timers = ("put_wait", "get_wait", "serialize")
+
+
+Q_PUT, Q_GOT, Q_DROPPED, Q_HWM_EVENTS, Q_ABOVE_HWM = range(len(QueueMetrics.counters))
+T_PUT_WAIT, T_GET_WAIT, T_SERIALIZE = range(len(QueueMetrics.timers))
+
+
+class TaskMetrics(Metrics):
+    counters = ("steps", "records", "started_at_ns", "eos_at_ns")
+    timers = ("step",)
+
+
+K_STEPS, K_RECORDS, K_STARTED_AT, K_EOS_AT = range(len(TaskMetrics.counters))
+T_STEP = 0
+
+
+def hist_quantile(hist: list[int], q: float) -> float | None:
+    """
+    Estimate a quantile (in seconds) from a log2 histogram, using the upper edge of its bucket.
+
+    """
+    total = sum(hist)
+    if total == 0:
+        return None
+    acc = 0
+    for i, n in enumerate(hist):
+        acc += n
+        if acc >= q * total:
+            return (1 << i) * 1e-6
+    return (1 << (len(hist) - 1)) * 1e-6
+
+
+class StatsReporter(threading.Thread):
+    """
+    Periodically report a stats snapshot (e.g., of a Pipeline).
+
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(
+        self,
+        snapshot: Callable[[], dict],
+        interval: float = 5.0,
+        report: Callable[[dict], None] | None = None,
+    ) -> None:
+        super().__init__(daemon=True)
+        self.snapshot = snapshot
+        self.interval = interval
+        self.report = report or self.log
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            self.report(self.snapshot())
+
+    def stop(self) -> None:
+        self.stopped.set()
+
+    def log(self, stats: dict, prefix: str = "") -> None:
+        for name, entry in stats.items():
+            if entry.get("steps", 0) > 0:
+                step = entry["step"]
+                mean = step["mean"] * 1e3 if step["mean"] is not None else float("nan")
+                self.logger.info(f"[{prefix}{name}] steps={entry['steps']}, records={entry['records']}, step={mean:.3f}ms")
+            if "target" in entry:
+                q = entry["target"]
+                self.logger.info(
+                    f"[{prefix}{name}] -> depth={q['depth']}, in={q['put']}, out={q['got']}, dropped={q['dropped']}"
+                )
+            if "tasks" in entry:
+                self.log(entry["tasks"], prefix=f"{prefix}{name}/")
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import mmap
+import os
+import pickle
+import shutil
+import tempfile
+import weakref
+from queue import Full
+
+import multiprocess
+
+# directory to place out-of-band buffers in (memory-backed, if available)
+SHM_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+# buffers smaller than this are kept in-band
+MIN_OOB_BYTES = 64 * 1024
+
+# alignment of each buffer within the shared-memory file
+ALIGN = 64
+
+
+class Frame:
+    """
+    Serialized message, whose large buffers (e.g., numpy arrays) are held out-of-band in shared memory.
+
+    """
+
+    __slots__ = ("data", "path", "spans", "obj")
+
+    def __init__(
+        self,
+        data: bytes | None,
+        path: str | None = None,
+        spans: list[tuple[int, int]] | None = None,
+        obj=None,
+    ) -> None:
+        self.data = data
+        self.path = path
+        self.spans = spans or []
+        self.obj = obj
+
+    def __getstate__(self):
+        return (self.data, self.path, self.spans, self.obj)
+
+    def __setstate__(self, state):
+        self.data, self.path, self.spans, self.obj = state
+
+
+def _remove_dir(path: str, pid: int) -> None:
+    # forked processes inherit the finalizer, so only the process that created the directory removes it
+    if os.getpid() == pid:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def create_dir(owner) -> str:
+    """
+    Create a directory for the shared-memory files of an owner (e.g., a queue).
+
+    The directory (with any frames that were never loaded, e.g., when readers were terminated)
+    is removed once the owner is garbage-collected, or once the process that created it exits.
+
+    Args:
+        owner (Any): object that the directory belongs to
+
+    Returns:
+        str: path of the directory
+    """
+    path = tempfile.mkdtemp(prefix="dm_oob_", dir=SHM_DIR)
+    weakref.finalize(owner, _remove_dir, path, os.getpid())
+    return path
+
+
+def dumps(obj, dir: str = SHM_DIR) -> Frame:
+    """
+    Serialize obj with pickle protocol 5, moving large buffers into a shared-memory file.
+
+    Each buffer is copied once (into shared memory). Objects that cannot be pickled
+    are passed through as-is, and left to the queue to serialize.
+
+    Args:
+        obj (Any): object to serialize
+        dir (str): directory to place the shared-memory file in (see create_dir)
+
+    Returns:
+        Frame: the serialized object
+    """
+    buffers: list[pickle.PickleBuffer] = []
+
+    def callback(buf: pickle.PickleBuffer) -> bool:
+        if buf.raw().nbytes < MIN_OOB_BYTES:
+            return True  # keep in-band
+        buffers.append(buf)
+        return False
+
+    try:
+        data = pickle.dumps(obj, protocol=5, buffer_callback=callback)
+    except Exception:
+        return Frame(None, obj=obj)
+    if len(buffers) == 0:
+        return Frame(data)
+
+    # lay out buffers in a single file
+    spans: list[tuple[int, int]] = []
+    offset = 0
+    for buf in buffers:
+        size = buf.raw().nbytes
+        spans.append((offset, size))
+        offset += -(-size // ALIGN) * ALIGN
+    fd, path = tempfile.mkstemp(prefix="dm_oob_", dir=dir)
+    try:
+        os.ftruncate(fd, offset)
+        with mmap.mmap(fd, offset) as mm:
+            for buf, (start, size) in zip(buffers, spans):
+                mm[start : start + size] = buf.raw()
+    finally:
+        os.close(fd)
+    return Frame(data, path, spans)
+
+
+def fanout(obj, n: int, dir: str = SHM_DIR) -> list[Frame]:
+    """
+    Serialize obj once, for n readers.
+
+    Each reader gets its own link to the shared-memory file, so that the memory
+    is released once the last reader has loaded the frame (and dropped the object).
+
+    Args:
+        obj (Any): object to serialize
+        n (int): number of readers
+        dir (str): directory to place the shared-memory files in (see create_dir)
+
+    Returns:
+        list[Frame]: one frame per reader
+    """
+    frame = dumps(obj, dir)
+    if frame.path is None:
+        return [frame] * n
+    frames = []
+    for i in range(n):
+        path = f"{frame.path}.{i}"
+        os.link(frame.path, path)
+        frames.append(Frame(frame.data, path, frame.spans))
+    os.unlink(frame.path)
+    return frames
+
+
+def loads(frame: Frame):
+    """
+    Deserialize a Frame. Out-of-band buffers are mapped from shared memory without copying.
+
+    The mapping is copy-on-write, so writes are private to the reader.
+    The shared-memory file is unlinked right away, and its memory is released
+    once all objects that reference it are garbage-collected.
+
+    Args:
+        frame (Frame): the serialized object
+
+    Returns:
+        Any: the deserialized object
+    """
+    if frame.data is None:
+        return frame.obj
+    if frame.path is None:
+        return pickle.loads(frame.data)
+    fd = os.open(frame.path, os.O_RDWR)
+    try:
+        mm = mmap.mmap(fd, 0, access=mmap.ACCESS_COPY)
+    finally:
+        os.close(fd)
+        os.unlink(frame.path)
+    view = memoryview(mm)
+    buffers = [view[start : start + size] for start, size in frame.spans]
+    return pickle.loads(frame.data, buffers=buffers)
+
+
+def discard(frame: Frame) -> None:
+    """
+    Release the shared memory of a Frame that will not be deserialized.
+
+    """
+    if frame.path is not None and os.path.exists(frame.path):
+        os.unlink(frame.path)
+
+
+class ZeroCopyQueue:
+    """
+    Pickle queue that moves large buffers (e.g., video frames) out-of-band through shared memory.
+
+    Implements the subset of multiprocess.Queue used by dm.Queue.
+    Frames that are still queued when the queue is closed (or garbage-collected) are released.
+
+    """
+
+    def __init__(self, maxsize: int = 0) -> None:
+        self.q = multiprocess.Queue(maxsize)
+        self.dir = create_dir(self)
+
+    @property
+    def _reader(self):
+        return self.q._reader
+
+    def put(self, obj, block: bool = True, timeout: float | None = None) -> None:
+        frame = obj if type(obj) is Frame else dumps(obj, self.dir)
+        try:
+            self.q.put(frame, block, timeout)
+        except Full:
+            discard(frame)
+            raise
+
+    def put_nowait(self, obj) -> None:
+        return self.put(obj, block=False)
+
+    def get(self, block: bool = True, timeout: float | None = None):
+        return loads(self.q.get(block, timeout))
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def qsize(self) -> int:
+        return self.q.qsize()
+
+    def empty(self) -> bool:
+        return self.q.empty()
+
+    def close(self) -> None:
+        # release the frames that were never loaded
+        shutil.rmtree(self.dir, ignore_errors=True)
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import collections
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+
+def _label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class Sampler(threading.Thread):
+    """
+    Sample the stack of one thread at a fixed interval, and count the samples of each (collapsed) stack.
+
+    Counts are flushed to a file periodically, since worker processes may be terminated without a chance to flush.
+
+    """
+
+    def __init__(self, fp: Path, root: str, ident: int, skip: int, interval: float, flush_interval: float) -> None:
+        super().__init__(daemon=True)
+        self.fp = fp
+        self.root = root
+        self.thread_ident = ident
+        # number of outermost frames to leave out (e.g., those inherited from the parent process on fork)
+        self.skip = skip
+        self.interval = interval
+        self.flush_interval = flush_interval
+        # label of what the thread is currently doing (e.g., the task being stepped by a worker)
+        self.tag: str | None = None
+        self.counts: collections.Counter[str] = collections.Counter()
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        every = max(1, round(self.flush_interval / self.interval))
+        n = 0
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_ident)
+            if frame is None:
+                # the thread has exited
+                break
+            stack = []
+            while frame is not None:
+                stack.append(_label(frame))
+                frame = frame.f_back
+            del stack[len(stack) - self.skip :]
+            tag = self.tag
+            stack.append(self.root if tag is None else f"{self.root};{tag}")
+            self.counts[";".join(reversed(stack))] += 1
+            n += 1
+            if n % every == 0:
+                self.flush()
+        self.flush()
+
+    def flush(self) -> None:
+        # write-then-rename, so that a terminated process leaves a complete file behind
+        tmp = self.fp.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            for stack, count in list(self.counts.items()):
+                f.write(f"{stack} {count}\n")
+        os.replace(tmp, self.fp)
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.join()
+
+
+class Profiler:
+    """
+    Profile a pipeline, inside the processes (and threads) that run its tasks.
+
+    * every queue/task operation is timed (instead of 1 in SAMPLE_EVERY), along with a serialization cost per message
+    * each task (or worker of an Executor) samples its own stack, into a collapsed-stack file (see collect)
+
+    The collapsed stacks (one "root;frame;...;frame count" line per stack) can be rendered by
+    flamegraph.pl or speedscope. Stacks are sampled on wall-clock time, so time blocked on queues shows up as well.
+
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, path: str | Path | None = None, interval: float = 0.005, flush_interval: float = 1.0) -> None:
+        self.path = Path(path) if path is not None else Path(tempfile.mkdtemp(prefix="datamux-profile-"))
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.interval = interval
+        self.flush_interval = flush_interval
+
+    def enable(self, task) -> None:
+        """
+        Profile a task (and its queues). Call before the task is started.
+
+        Args:
+            task (ITask): the task to profile
+        """
+        task.profiler = self
+        task.metrics.profile()
+        for attr in ("source", "target"):
+            queue = getattr(task, attr, None)
+            if queue is not None and hasattr(queue, "metrics"):
+                queue.metrics.profile()
+
+    def attach(self, name: str) -> Sampler:
+        """
+        Start sampling the stack of the calling thread, from the caller down.
+
+        Args:
+            name (str): name to root the stacks at (e.g., the task name)
+
+        Returns:
+            Sampler: the sampler (call stop() to flush it)
+        """
+        ident = threading.get_ident()
+        skip = 0
+        frame = sys._getframe(2)
+        while frame is not None:
+            skip += 1
+            frame = frame.f_back
+        fp = self.path / f"{name}.{os.getpid()}.{ident}.folded"
+        sampler = Sampler(fp, name, ident, skip, self.interval, self.flush_interval)
+        sampler.start()
+        return sampler
+
+    def collect(self, stats: dict | None = None) -> Path:
+        """
+        Merge the stacks sampled by all tasks into profile.folded, and write a per-stage breakdown (if given stats).
+
+        Args:
+            stats (dict | None): stats of the pipeline (see Pipeline.stats), to break down by stage
+
+        Returns:
+            Path: path of the collapsed-stack file
+        """
+        counts: collections.Counter[str] = collections.Counter()
+        for fp in self.path.glob("*.*.*.folded"):
+            for line in fp.read_text().splitlines():
+                stack, _, count = line.rpartition(" ")
+                counts[stack] += int(count)
+        out = self.path / "profile.folded"
+        with open(out, "w") as f:
+            for stack, count in counts.most_common():
+                f.write(f"{stack} {count}\n")
+        if stats is not None:
+            stages = breakdown(stats)
+            with open(self.path / "stages.json", "w") as f:
+                json.dump(stages, f, indent=2)
+            for name, entry in stages.items():
+                costs = ", ".join(f"{k}={v * 1e3:.1f}ms" for k, v in entry.items() if k != "steps")
+                self.logger.info(f"[{name}] steps={entry['steps']}, {costs}")
+        self.logger.info(f"profile written to {out}")
+        return out
+
+
+def _total(timer: dict | None) -> float:
+    # total seconds of a timer (exact when every operation was timed, see Metrics.profile)
+    if timer is None or timer["mean"] is None:
+        return 0.0
+    return timer["samples"] * timer["mean"]
+
+
+def breakdown(stats: dict, prefix: str = "") -> dict[str, dict]:
+    """
+    Break down the time of each stage into step(), blocked on get/put, and serialization.
+
+    Args:
+        stats (dict): stats of a task, or of a pipeline (see ITask.stats)
+        prefix (str): prefix of stage names (for nested tasks)
+
+    Returns:
+        dict[str, dict]: per stage, the number of steps and the seconds spent on each
+    """
+    stages = {}
+    for name, entry in stats.items():
+        if "tasks" in entry:
+            stages.update(breakdown(entry["tasks"], prefix=f"{prefix}{name}/"))
+        if "steps" not in entry:
+            continue
+        source, target = entry.get("source", {}), entry.get("target", {})
+        stages[f"{prefix}{name}"] = dict(
+            steps=entry["steps"],
+            step=_total(entry["step"]),
+            get_wait=_total(source.get("get_wait")),
+            put_wait=_total(target.get("put_wait")),
+            serialize=_total(target.get("serialize")),
+        )
+    return stages
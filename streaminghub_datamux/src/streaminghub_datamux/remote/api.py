@@ -48,6 +48,14 @@ class AsyncExecutor(Thread):
         return self.handlers[topic]
 
 
+def _check_local_only(chunk_size: int, max_latency: float | None, checkpoint: dict | None) -> None:
+    # records cross the connection one envelope at a time, and replay state stays on the server
+    if chunk_size > 1 or max_latency is not None:
+        raise ValueError("remote streams are not chunked (i.e., chunk_size and max_latency are not supported)")
+    if checkpoint is not None:
+        raise ValueError("remote streams cannot be restored from a checkpoint")
+
+
 class RemoteAPI(dm.IAPI):
     """
     Remote API for dm.
@@ -139,7 +147,15 @@ class RemoteAPI(dm.IAPI):
         rate_limit: bool = True,
         strict_time: bool = True,
         use_relative_ts: bool = True,
+        chunk_size: int = 1,
+        max_latency: float | None = None,
+        checkpoint: dict | None = None,
+        bulk: bool = False,
+        speed: float = 1.0,
+        start_time: float | None = None,
+        end_time: float | None = None,
     ) -> dm.StreamAck:
+        _check_local_only(chunk_size, max_latency, checkpoint)
         topic = TOPIC_REPLAY_COLLECTION_STREAM
         content = dict(
             collection_id=collection_id,
@@ -149,6 +165,10 @@ class RemoteAPI(dm.IAPI):
             rate_limit=rate_limit,
             strict_time=strict_time,
             use_relative_ts=use_relative_ts,
+            bulk=bulk,
+            speed=speed,
+            start_time=start_time,
+            end_time=end_time,
         )
         info = self.executor.send(topic, content).get()
         assert info is not None
@@ -206,7 +226,11 @@ class RemoteAPI(dm.IAPI):
         rate_limit: bool = True,
         strict_time: bool = True,
         use_relative_ts: bool = True,
+        chunk_size: int = 1,
+        max_latency: float | None = None,
+        checkpoint: dict | None = None,
     ) -> dm.StreamAck:
+        _check_local_only(chunk_size, max_latency, checkpoint)
         topic = TOPIC_READ_LIVE_STREAM
         content = dict(
             node_id=node_id,
@@ -243,6 +267,12 @@ class RemoteAPI(dm.IAPI):
         rate_limit: bool = True,
         strict_time: bool = True,
         use_relative_ts: bool = True,
+        chunk_size: int = 1,
+        max_latency: float | None = None,
+        bulk: bool = False,
+        speed: float = 1.0,
+        start_time: float | None = None,
+        end_time: float | None = None,
     ) -> dm.SourceTask:
         mode = stream.attrs.get("mode")
         assert mode in ["proxy", "replay"]
@@ -261,4 +291,10 @@ class RemoteAPI(dm.IAPI):
             rate_limit=rate_limit,
             strict_time=strict_time,
             use_relative_ts=use_relative_ts,
+            chunk_size=chunk_size,
+            max_latency=max_latency,
+            bulk=bulk,
+            speed=speed,
+            start_time=start_time,
+            end_time=end_time,
         )
@@ -62,7 +62,16 @@ class DataMuxServer:
                 transform = content["transform"]
                 transform = pickle.loads(base64.b64decode(transform))
                 wrapped = dm.Enveloper(transform=transform, suffix=uid)
-                ack = self.api.proxy_live_stream(node_id, stream_id, attrs, self.data_q, wrapped)
+                ack = self.api.proxy_live_stream(
+                    node_id,
+                    stream_id,
+                    attrs,
+                    self.data_q,
+                    wrapped,
+                    rate_limit=content.get("rate_limit", True),
+                    strict_time=content.get("strict_time", True),
+                    use_relative_ts=content.get("use_relative_ts", True),
+                )
                 retval = ack.model_dump()
             # REPLAY MODE (File -> Queue) ==============================================================================================
             elif topic == TOPIC_LIST_COLLECTIONS:
@@ -79,7 +88,20 @@ class DataMuxServer:
                 transform = content["transform"]
                 transform = pickle.loads(base64.b64decode(transform))
                 wrapped = dm.Enveloper(transform=transform, suffix=uid)
-                ack = self.api.replay_collection_stream(collec_id, stream_id, attrs, self.data_q, wrapped)
+                # records are sent one envelope at a time, so a bulk replay is sent unpaced (instead of in chunks)
+                ack = self.api.replay_collection_stream(
+                    collec_id,
+                    stream_id,
+                    attrs,
+                    self.data_q,
+                    wrapped,
+                    rate_limit=content.get("rate_limit", True) and not content.get("bulk", False),
+                    strict_time=content.get("strict_time", True),
+                    use_relative_ts=content.get("use_relative_ts", True),
+                    speed=content.get("speed", 1.0),
+                    start_time=content.get("start_time"),
+                    end_time=content.get("end_time"),
+                )
                 retval = ack.model_dump()
             # RESTREAM MODE (File -> LSL) ==============================================================================================
             elif topic == TOPIC_PUBLISH_COLLECTION_STREAM:
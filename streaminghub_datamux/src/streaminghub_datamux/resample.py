@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+from fractions import Fraction
+from typing import Literal
+
+import numpy as np
+
+import streaminghub_datamux as dm
+from streaminghub_datamux.align import time_of
+
+Method = Literal["linear", "decimate", "polyphase"]
+
+
+def lowpass(numtaps: int, cutoff: float, gain: float = 1.0) -> np.ndarray:
+    """
+    Design a windowed-sinc (hamming) low-pass FIR filter.
+
+    Args:
+        numtaps (int): number of taps (odd, for a symmetric filter with an integer delay)
+        cutoff (float): cutoff frequency, relative to the sampling rate (0 < cutoff <= 0.5)
+        gain (float): DC gain of the filter
+
+    Returns:
+        np.ndarray: filter taps
+    """
+    n = np.arange(numtaps) - (numtaps - 1) / 2
+    h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(numtaps)
+    return h * (gain / h.sum())
+
+
+class Resample(dm.PipeTask):
+    """
+    Convert the numeric fields of a stream to a target rate.
+
+    * **linear**: interpolate onto a target_hz clock, using the actual timestamps (no anti-aliasing)
+    * **decimate**: low-pass filter, and keep every M-th sample (source_hz / target_hz must be an integer M)
+    * **polyphase**: upsample by L, low-pass filter, and downsample by M, where L / M = target_hz / source_hz
+
+    The filter methods assume uniform sampling at source_hz (e.g., the frequency of the dfds.Stream),
+    and time the output as t0 + n / target_hz. Filter state is kept across messages and chunks,
+    so the output does not depend on how the input was chunked. Chunks are resampled into chunks.
+
+    """
+
+    def __init__(
+        self,
+        target_hz: float,
+        method: Method = "linear",
+        source_hz: float | None = None,
+        fields: list[str] | None = None,
+        time_key: str = "t",
+        half_len: int | None = None,
+        transform=None,
+    ) -> None:
+        super().__init__(transform=transform)
+        assert method in ("linear", "decimate", "polyphase"), method
+        assert method == "linear" or source_hz is not None, f"{method} needs a source_hz"
+        self.target_hz = target_hz
+        self.method = method
+        self.source_hz = source_hz
+        self.fields = fields
+        self.time_key = time_key
+        self.t0: float | None = None
+        if method == "linear":
+            self.checkpoint_attrs = ("fields", "t0", "t_prev", "x_prev", "k")
+            self.t_prev: float | None = None
+            self.x_prev: np.ndarray | None = None
+            self.k = 0
+        else:
+            assert source_hz is not None
+            ratio = Fraction(target_hz / source_hz).limit_denominator(1000)
+            if method == "decimate":
+                assert ratio.numerator == 1, f"cannot decimate {source_hz}Hz to {target_hz}Hz by an integer factor"
+            self.up, self.down = ratio.numerator, ratio.denominator
+            half_len = half_len or 10 * max(self.up, self.down)
+            self.numtaps = 2 * half_len + 1
+            self.delay = half_len
+            self.h = lowpass(self.numtaps, 0.5 / max(self.up, self.down), gain=self.up)
+            # number of input samples that contribute to each output sample
+            self.span = self.numtaps // self.up + 1
+            self.checkpoint_attrs = ("fields", "t0", "buffer", "base", "count", "n")
+            self.buffer: np.ndarray | None = None
+            self.base = 0  # input index of buffer[0]
+            self.count = 0  # number of inputs received
+            self.n = 0  # index of the next output
+
+    def close(self) -> None:
+        if self.method == "linear" or self.buffer is None:
+            return
+        # pad with the last sample, to flush the outputs that are held back by the filter delay
+        pad = np.repeat(self.buffer[-1:], self.delay // self.up + self.span, axis=0)
+        self.buffer = np.concatenate([self.buffer, pad])
+        last = (self.count - 1) * self.up // self.down  # last output within the input
+        times, values = self.apply(self.base + len(self.buffer) - 1, limit=last + 1)
+        if len(times) > 0:
+            self.put(times, values, chunked=False)
+
+    def step(self, msg: dict) -> int | None:
+        if self.fields is None:
+            value = msg.get("value", msg)
+            numeric = (int, float, np.integer, np.floating)
+            self.fields = [k for k, v in value.items() if isinstance(v, numeric) and not isinstance(v, bool)]
+        value = msg.get("value", msg)
+        row = np.array([[value[f] for f in self.fields]], dtype=np.float64)
+        times, values = self.feed(np.array([time_of(msg, self.time_key)]), row)
+        if len(times) > 0:
+            self.put(times, values, chunked=False)
+
+    def step_batch(self, chunk: dm.Chunk) -> int | None:
+        cols = chunk.columns
+        value = cols.get("value", cols)
+        index = cols.get("index", cols)
+        if self.fields is None:
+            self.fields = [k for k, v in value.items() if k != self.time_key and np.issubdtype(v.dtype, np.number)]  # type: ignore
+        times = np.asarray(index[self.time_key], dtype=np.float64)  # type: ignore
+        rows = np.stack([np.asarray(value[f], dtype=np.float64) for f in self.fields], axis=1)  # type: ignore
+        times, values = self.feed(times, rows)
+        if len(times) > 0:
+            self.put(times, values, chunked=True)
+
+    def feed(self, times: np.ndarray, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        if self.t0 is None:
+            self.t0 = float(times[0])
+        if self.method == "linear":
+            return self.interpolate(times, rows)
+        if self.buffer is None:
+            # pad the start with the first sample, so that the filter has a full history
+            self.buffer = np.repeat(rows[:1], self.span, axis=0)
+            self.base = -self.span
+        self.buffer = np.concatenate([self.buffer, rows])
+        self.count += len(rows)
+        return self.apply(self.count - 1)
+
+    def interpolate(self, times: np.ndarray, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        assert self.t0 is not None
+        if self.t_prev is not None and self.x_prev is not None:
+            times = np.concatenate([[self.t_prev], times])
+            rows = np.concatenate([self.x_prev[None], rows])
+        self.t_prev, self.x_prev = float(times[-1]), rows[-1]
+        # ticks up to the latest timestamp
+        end = int(np.floor((times[-1] - self.t0) * self.target_hz + 1e-9)) + 1
+        ticks = self.t0 + np.arange(self.k, end) / self.target_hz
+        self.k = max(self.k, end)
+        values = np.empty((len(ticks), rows.shape[1]))
+        for j in range(rows.shape[1]):
+            values[:, j] = np.interp(ticks, times, rows[:, j])
+        return ticks, values
+
+    def apply(self, last: int, limit: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Compute the outputs that only depend on inputs up to the given index.
+
+        Args:
+            last (int): index of the last available input
+            limit (int | None): index after the last output to compute
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: output times, and output values (one column per field)
+        """
+        assert self.buffer is not None and self.t0 is not None
+        L, M, D = self.up, self.down, self.delay
+        # output n is at upsampled index D + n * M, which needs inputs up to (D + n * M) // L
+        end = -(-((last + 1) * L - D) // M)
+        if limit is not None:
+            end = min(end, limit)
+        n = np.arange(self.n, max(self.n, end))
+        if len(n) == 0:
+            return np.empty(0), np.empty((0, self.buffer.shape[1]))
+        m = D + n * M
+        i = (m // L)[:, None] - np.arange(self.span)
+        k = m[:, None] - i * L
+        valid = (k >= 0) & (k < self.numtaps)
+        weights = np.where(valid, self.h[np.clip(k, 0, self.numtaps - 1)], 0.0)
+        values = np.einsum("nk,nkw->nw", weights, self.buffer[i - self.base])
+        self.n = int(n[-1]) + 1
+        # drop the inputs that no later output depends on
+        drop = (D + self.n * M) // L - self.span + 1 - self.base
+        if drop > 0:
+            self.buffer = self.buffer[drop:]
+            self.base += drop
+        return self.t0 + n / self.target_hz, values
+
+    def put(self, times: np.ndarray, values: np.ndarray, chunked: bool) -> None:
+        assert self.fields is not None
+        if chunked:
+            chunk = dm.Chunk(
+                dict(
+                    index={self.time_key: times},
+                    value={f: values[:, j] for j, f in enumerate(self.fields)},
+                )
+            )
+            if self.transform is None:
+                self.target.put(chunk)
+                return
+            if getattr(self.transform, "vectorized", False):
+                self.target.put(self.transform(chunk))
+                return
+            records = chunk.records()
+        else:
+            records = [
+                dict(index={self.time_key: t}, value=dict(zip(self.fields, row)))
+                for t, row in zip(times.tolist(), values.tolist())
+            ]
+        for record in records:
+            if self.transform is not None:
+                record = self.transform(record)
+            self.target.put(record)
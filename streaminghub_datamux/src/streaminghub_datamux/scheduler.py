@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import signal
+import time
+
+import multiprocess
+
+import streaminghub_datamux as dm
+
+
+class ReplayScheduler:
+    """
+    Drive many replays from a few worker processes, instead of a process each.
+
+    Each worker keeps a heap of the next deadline of each of its streams (see ISource.on_deadline),
+    sleeps until the earliest one, and then pulls every stream that is due in that wakeup.
+    Streams are assigned to workers in a round-robin manner.
+
+    Replays submitted to a scheduler are started together (since their queues are passed on to the workers on fork),
+    either by start(), or by the pipeline that holds their streams.
+
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, workers: int = 1) -> None:
+        self.workers = workers
+        self.pending: list[dm.Attachment] = []
+        self.procs: list[multiprocess.Process] = []
+
+    def submit(self, attachment: dm.Attachment):
+        """
+        Add a stream to replay, once the scheduler is started.
+
+        Args:
+            attachment (dm.Attachment): the stream, attached onto its queue
+        """
+        self.pending.append(attachment)
+        return self
+
+    def start(self) -> None:
+        # start a batch of workers for the pending replays
+        if len(self.pending) == 0:
+            return
+        n = min(self.workers, len(self.pending))
+        groups = [self.pending[i::n] for i in range(n)]
+        self.pending = []
+        for i, group in enumerate(groups):
+            proc = multiprocess.Process(
+                group=None,
+                target=self.__run__,
+                args=(group,),
+                name=f"replay_{len(self.procs)}",
+                daemon=True,
+            )
+            proc.start()
+            self.procs.append(proc)
+        self.logger.debug(f"Started {n} workers for {sum(map(len, groups))} replays")
+
+    @staticmethod
+    def start_pending(tasks: list[dm.ITask]) -> None:
+        """
+        Start the pending replays of the schedulers that the given tasks stream from
+        (e.g., once a pipeline has started its streams).
+
+        Args:
+            tasks (list[dm.ITask]): tasks of the pipeline
+        """
+        schedulers: dict[int, ReplayScheduler] = {}
+        for task in tasks:
+            # i.e., streams of an API that replays on a scheduler
+            scheduler = getattr(getattr(task, "api", None), "scheduler", None)
+            if isinstance(scheduler, ReplayScheduler):
+                schedulers[id(scheduler)] = scheduler
+        for scheduler in schedulers.values():
+            scheduler.start()
+
+    def stop(self) -> None:
+        for proc in self.procs:
+            proc.terminate()
+            proc.join()
+        self.procs = []
+        self.logger.debug("Stopped workers")
+
+    def __run__(self, attachments: list[dm.Attachment]) -> None:
+        stopped = False
+
+        def handler(*args):
+            nonlocal stopped
+            stopped = True
+            for attachment in attachments:
+                attachment.flag.set()
+            signal.default_int_handler(*args)
+
+        signal.signal(signal.SIGINT, handler)
+        dm.init_logging()
+        # heap of (deadline, seq, attachment). seq breaks ties, so that attachments are never compared
+        seq = itertools.count()
+        heap = []
+        for attachment in attachments:
+            if not attachment.open():
+                continue
+            heapq.heappush(heap, (time.perf_counter(), next(seq), attachment))
+        while len(heap) > 0 and not stopped:
+            deadline = heap[0][0]
+            wait = deadline - time.perf_counter()
+            if wait > 0:
+                # wake up at least every IDLE_TIMEOUT, to close streams that were stopped
+                time.sleep(min(wait, dm.IDLE_TIMEOUT))
+                if wait > dm.IDLE_TIMEOUT:
+                    heap = self._close_stopped(heap)
+                    continue
+            # pull every stream that is due
+            now = time.perf_counter()
+            while len(heap) > 0 and heap[0][0] <= now:
+                _, _, attachment = heapq.heappop(heap)
+                if attachment.flag.is_set() or attachment.pull() is not None:
+                    attachment.close()
+                    continue
+                heapq.heappush(heap, (attachment.deadline() or time.perf_counter(), next(seq), attachment))
+        for _, _, attachment in heap:
+            attachment.close()
+
+    @staticmethod
+    def _close_stopped(heap: list) -> list:
+        # close the streams whose flags were set (e.g., by API.stop_task)
+        active = []
+        for entry in heap:
+            if entry[2].flag.is_set():
+                entry[2].close()
+            else:
+                active.append(entry)
+        heapq.heapify(active)
+        return active
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import os
+import queue
+import weakref
+
+import multiprocess
+import numpy as np
+from multiprocess.shared_memory import SharedMemory
+
+import streaminghub_pydfds as dfds
+
+TAG_RECORD = 0
+TAG_PICKLED = 1
+
+Layout = dict[str, "np.dtype | dict[str, np.dtype]"]
+
+
+def layout_from_stream(stream: dfds.Stream) -> Layout | None:
+    """
+    Derive the record layout of a stream, i.e., dict(index={...}, value={...})
+
+    Args:
+        stream (dfds.Stream): stream to derive the layout from
+
+    Returns:
+        Layout | None: nested mapping of field dtypes, or None if the stream is not tabular
+    """
+    layout: Layout = {}
+    for group, fields in (("index", stream.index), ("value", stream.fields)):
+        layout[group] = {}
+        for k, field in fields.items():
+            try:
+                dtype = np.dtype(field.dtype)
+            except TypeError:
+                return None
+            if dtype.kind not in "biuf":
+                return None
+            layout[group][k] = dtype
+    return layout
+
+
+class SharedRingBuffer:
+    """
+    Fixed-capacity ring of numpy structured records in shared memory.
+
+    Messages matching the layout (whose values fit its dtypes) are written into the ring as-is.
+    Any other message (e.g., END_OF_STREAM) is sent through a pickle queue,
+    while its slot in the ring is tagged, so that the order of messages is kept.
+    Readers may wait on _reader (like on a pipe-backed queue), which is readable while the ring holds messages.
+
+    Implements the subset of multiprocess.Queue used by dm.Queue.
+
+    """
+
+    def __init__(self, layout: Layout, capacity: int = 1024) -> None:
+        assert capacity > 0
+        self.layout = layout
+        self.capacity = capacity
+        # flatten layout into (group, key) paths
+        self.paths: list[tuple[str, str | None]] = []
+        descr = []
+        for group, spec in layout.items():
+            if isinstance(spec, dict):
+                for k, dtype in spec.items():
+                    self.paths.append((group, k))
+                    descr.append((f"{group}.{k}", dtype))
+            else:
+                self.paths.append((group, None))
+                descr.append((group, spec))
+        self.dtype = np.dtype(descr)
+        # fields that must hold their values exactly (i.e., are not truncated on write)
+        self.exact = [j for j, (_, dtype) in enumerate(descr) if np.dtype(dtype).kind in "biu"]
+        self.shape = {g: (len(s) if isinstance(s, dict) else None) for g, s in layout.items()}
+        # shared state
+        nbytes = 16 + capacity + capacity * self.dtype.itemsize
+        self.shm = SharedMemory(create=True, size=nbytes)
+        self.lock = multiprocess.Lock()
+        self.items = multiprocess.Semaphore(0)
+        self.slots = multiprocess.Semaphore(capacity)
+        self.fallback = multiprocess.Queue()
+        # holds one byte while the ring is not empty (written / read under the lock), to wake up readers
+        self._reader, self._writer = multiprocess.Pipe(duplex=False)
+        self.owner = os.getpid()
+        self._map()
+        weakref.finalize(self, SharedRingBuffer._release, self.shm, self.owner)
+
+    def _map(self) -> None:
+        buf = self.shm.buf
+        cap = self.capacity
+        self.ptr = np.ndarray((2,), dtype=np.int64, buffer=buf, offset=0)  # [head, tail]
+        self.tags = np.ndarray((cap,), dtype=np.uint8, buffer=buf, offset=16)
+        self.records = np.ndarray((cap,), dtype=self.dtype, buffer=buf, offset=16 + cap)
+
+    @staticmethod
+    def _release(shm: SharedMemory, owner: int) -> None:
+        # only the creating process may unlink the segment
+        if os.getpid() == owner:
+            shm.close()
+            shm.unlink()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for k in ("ptr", "tags", "records"):
+            state.pop(k, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._map()
+
+    def _encode(self, obj) -> np.ndarray | None:
+        # only accept messages that exactly match the layout, and whose values fit its dtypes
+        # (e.g., no None/NaN or out-of-range values in integer fields)
+        if type(obj) is not dict or len(obj) != len(self.shape):
+            return None
+        try:
+            for g, n in self.shape.items():
+                if n is not None and len(obj[g]) != n:
+                    return None
+            values = tuple(obj[g] if k is None else obj[g][k] for g, k in self.paths)
+            rec = np.array(values, dtype=self.dtype)
+        except (KeyError, TypeError, ValueError, OverflowError):
+            return None
+        if len(self.exact) > 0:
+            written = rec.item()
+            if any(written[j] != values[j] for j in self.exact):
+                return None
+        return rec
+
+    def _decode(self, rec: tuple) -> dict:
+        obj: dict = {}
+        for (g, k), v in zip(self.paths, rec):
+            if k is None:
+                obj[g] = v
+            else:
+                obj.setdefault(g, {})[k] = v
+        return obj
+
+    def put(self, obj, block: bool = True, timeout: float | None = None) -> None:
+        # encode before taking a slot, so that messages that do not fit go through the fallback instead
+        rec = self._encode(obj)
+        if not self.slots.acquire(block, timeout):
+            raise queue.Full
+        with self.lock:
+            i = self.ptr[0] % self.capacity
+            if rec is not None:
+                self.records[i] = rec
+                self.tags[i] = TAG_RECORD
+            else:
+                self.tags[i] = TAG_PICKLED
+                self.fallback.put(obj)
+            self.ptr[0] += 1
+            if self.ptr[0] - self.ptr[1] == 1:
+                self._writer.send_bytes(b"\0")
+        self.items.release()
+
+    def put_nowait(self, obj) -> None:
+        return self.put(obj, block=False)
+
+    def get(self, block: bool = True, timeout: float | None = None):
+        if not self.items.acquire(block, timeout):
+            raise queue.Empty
+        with self.lock:
+            i = self.ptr[1] % self.capacity
+            if self.tags[i] == TAG_RECORD:
+                obj = self._decode(self.records[i].item())
+            else:
+                obj = self.fallback.get()
+            self.ptr[1] += 1
+            if self.ptr[0] == self.ptr[1]:
+                self._reader.recv_bytes()
+        self.slots.release()
+        return obj
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def qsize(self) -> int:
+        return int(self.ptr[0] - self.ptr[1])
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
@@ -1,12 +1,21 @@
 from __future__ import annotations
 
+import ast
 import copy
+import math
 import signal
+import time
+import zlib
 from argparse import Namespace
-from typing import Literal
+from typing import Any, Callable, Hashable, Literal
 from threading import Thread
 
+import numpy as np
+
 import streaminghub_datamux as dm
+from streaminghub_datamux import oob
+from streaminghub_datamux.align import Aligner
+from streaminghub_datamux.metrics import StatsReporter
 
 
 class CompositeTask(dm.ITask):
@@ -24,10 +33,35 @@ class CompositeTask(dm.ITask):
 
     def start(self):
         signal.signal(signal.SIGINT, self.__signal__)
-        if self.run_self:
-            super().start()
+        # fork processes before starting threads, so that no process is forked while a thread holds a lock
+        # (e.g., an import lock, or the lock of a queue)
+        units = self.units()
+        for task in units:
+            if task.mode != "thread":
+                task.start()
+        # replays of a shared scheduler start once all of their streams are submitted (see ReplayScheduler)
+        dm.ReplayScheduler.start_pending(units)
+        for task in units:
+            if task.mode == "thread":
+                dm.ITask.start(task) if isinstance(task, CompositeTask) else task.start()
+
+    def units(self) -> list[dm.ITask]:
+        # tasks that run on their own, i.e., internal tasks, and composites that run themselves
+        units = []
         for task in self.tasks:
-            task.start()
+            if isinstance(task, CompositeTask):
+                units.extend(task.units())
+            else:
+                units.append(task)
+        if self.run_self:
+            units.append(self)
+        return units
+
+    def parts(self) -> list[dm.ITask]:
+        parts = [part for task in self.tasks for part in task.parts()]
+        if self.run_self:
+            parts.append(self)
+        return parts
 
     def stop(self):
         if self.run_self:
@@ -39,25 +73,66 @@ class CompositeTask(dm.ITask):
         self.stop()
         signal.default_int_handler(*args)
 
+    def signal(self, sig: dm.Signal) -> None:
+        # pause/resume every task. pass other signals to the entry point, from where they flow downstream
+        if sig.kind in ("pause", "resume"):
+            if self.run_self:
+                super().signal(sig)
+            for task in self.tasks:
+                task.signal(sig)
+        elif self.run_self:
+            super().signal(sig)
+        else:
+            self.tasks[0].signal(sig)
+
+    def stats(self) -> dict:
+        stats = super().stats() if self.run_self else {}
+        stats["tasks"] = {}
+        for i, task in enumerate(self.tasks):
+            name = task.name if task.name not in stats["tasks"] else f"{task.name}#{i}"
+            stats["tasks"][name] = task.stats()
+        return stats
+
 
 class Broadcast(CompositeTask):
+    """
+    Pass each item to all tasks
+
+    Items are treated as immutable, and serialized once for all tasks (see oob.fanout).
+
+    """
 
     source: dm.Queue
     completed: dm.Flag
 
     def __init__(self, *tasks: dm.PipeTask | dm.SinkTask) -> None:
         super().__init__(*tasks, run_self=True)
-        self.source = dm.Queue(timeout=0.001, empty=True)
+        self.source = dm.Queue(timeout=dm.IDLE_TIMEOUT, empty=True)
+        self.completed = dm.create_flag()
+        # shared-memory files of the items sent to tasks (removed with this task, along with any that were never read)
+        self.frames = oob.create_dir(self)
+        # each task reads from a queue of its own
+        for task in self.tasks:
+            assert isinstance(task, (dm.PipeTask, dm.SinkTask, Pipeline))
+            if task.source.q is None:
+                task.source.assign(dm.Queue())
 
     def __call__(self, *args, **kwargs) -> int | None:
         item = self.source.get()
         if item is None:
             return
+        if dm.is_control(item):
+            return self._on_signal(item if type(item) is dm.Signal else dm.Signal.eos())
         # broadcast source item to all task queues
+        frames = oob.fanout(item, len(self.tasks), self.frames)
+        for task, frame in zip(self.tasks, frames):
+            task.source.put(frame)  # type: ignore
+
+    def on_signal(self, sig: dm.Signal) -> int | None:
+        # signals are immutable, so they are passed as-is
         for task in self.tasks:
-            assert isinstance(task, (dm.PipeTask, dm.SinkTask, dm.Pipeline))
-            task.source.put(copy.deepcopy(item))
-        if item == dm.END_OF_STREAM:
+            task.source.put(dm.END_OF_STREAM if sig.kind == "eos" else sig)
+        if sig.kind == "eos":
             self.completed.set()
             return 0
 
@@ -66,6 +141,9 @@ class MergedSource(CompositeTask):
     """
     Merge multiple data sources together
 
+    By default (join="latest"), the latest item of each source is emitted whenever any source changes.
+    Other joins align sources by event time (see align.Aligner), and emit one aligned item per tick.
+
     """
 
     target: dm.Queue
@@ -77,43 +155,72 @@ class MergedSource(CompositeTask):
         *tn: dm.SourceTask | Pipeline,
         agg: Literal["list", "dict", "obj"] = "obj",
         transform=None,
+        join: Literal["latest", "asof", "interp", "resample"] = "latest",
+        driver: int = 0,
+        rate: float | None = None,
+        time_key: str = "t",
+        tolerance: float | None = None,
+        buffer_size: int = 1024,
     ) -> None:
         # expect at least two tasks to merge
         super().__init__(t1, t2, *tn, run_self=True)
-        self.target = dm.Queue(timeout=0.001)
+        self.target = dm.Queue(timeout=dm.IDLE_TIMEOUT)
         self.sync_state: list[None | dict] = [None] * len(self.tasks)
+        # watermarks and checkpoints of all sources, merged into one
+        self.merger = dm.SignalMerger(len(self.tasks))
         self.agg = agg
         self.transform = transform
+        self.join = join
+        self.aligner = None
+        if join != "latest":
+            self.aligner = Aligner(len(self.tasks), join, driver, rate, time_key, tolerance, buffer_size)
 
     def __call__(self, *args, **kwargs) -> int | None:
         changed = False
+        # block until any of the sources has data
+        ready = dm.Queue.wait([task.target for task in self.tasks], dm.IDLE_TIMEOUT)  # type: ignore
         for i, task in enumerate(self.tasks):
             assert isinstance(task, dm.ITaskWithOutput)
-            item = task.target.get()
+            if task.target not in ready:
+                continue
+            item = task.target.get_nowait()
             if item is None:
                 continue
+            if type(item) is dm.Signal and item.kind != "eos":
+                self._merge_signal(i, item)
+                continue
             changed = True
             self.sync_state[i] = item
+            if self.aligner is not None:
+                self.aligner.push(i, item)
+            if dm.is_eos(item):
+                self._put_signals(self.merger.end(i))
         if not changed:
             return
+        if self.aligner is not None:
+            for row in self.aligner.pop():
+                self.emit(row)
         # put combined output into target queue
-        if all([x == dm.END_OF_STREAM for x in self.sync_state]):
+        if all([dm.is_eos(x) for x in self.sync_state]):
             self.target.put(dm.END_OF_STREAM)
             return 0
+        if self.aligner is None:
+            self.emit(self.sync_state)
 
+    def emit(self, states: list[None | dict]) -> None:
         # prepare output based on given agg
         if self.agg == "list":
-            output = copy.deepcopy(self.sync_state)
+            output = copy.deepcopy(states)
         elif self.agg == "dict":
             output = {}
             for i, task in enumerate(self.tasks):
-                state = self.sync_state[i]
+                state = states[i]
                 if state is not None:
                     output[task.name] = dict(**state)
         elif self.agg == "obj":
             output = Namespace(**{task.name: None for task in self.tasks})
             for i, task in enumerate(self.tasks):
-                state = self.sync_state[i]
+                state = states[i]
                 if state is not None:
                     setattr(output, task.name, Namespace(**state))
         if self.transform is not None:
@@ -121,6 +228,27 @@ class MergedSource(CompositeTask):
 
         self.target.put(output)
 
+    @property
+    def inputs(self) -> list[dm.Queue]:
+        return [task.target for task in self.tasks]  # type: ignore
+
+    def _merge_signal(self, i: int, sig: dm.Signal) -> None:
+        if sig.kind == "watermark" and self.aligner is not None:
+            self.aligner.advance(i, sig.value)  # type: ignore
+            for row in self.aligner.pop():
+                self.emit(row)
+        self._put_signals(self.merger.push(i, sig))
+
+    def _put_signals(self, signals: list[dm.Signal]) -> None:
+        for sig in signals:
+            self.target.put(self._checkpoint(sig) if sig.kind == "checkpoint" else sig)
+
+    def on_signal(self, sig: dm.Signal) -> int | None:
+        if sig.kind == "eos":
+            self.target.put(dm.END_OF_STREAM)
+            return 0
+        self.target.put(sig)
+
 
 class Pipeline(CompositeTask):
 
@@ -133,8 +261,36 @@ class Pipeline(CompositeTask):
     # flag to check for completion
     completed: dm.Flag
 
-    def __init__(self, *tasks: dm.ITask) -> None:
+    def __init__(
+        self,
+        *tasks: dm.ITask,
+        capacity: int | None = None,
+        policy: dm.Policy = "block",
+        fuse: bool = False,
+        stage_mode: Literal["process", "thread"] | None = None,
+        executor: dm.Executor | None = None,
+        checkpoints: dm.Checkpoints | None = None,
+    ) -> None:
         super().__init__(*tasks, run_self=False)
+        # run stages on a shared pool of workers, instead of a process each
+        self.executor = executor
+        self.checkpoints = checkpoints
+
+        # collapse adjacent stateless stages into one task
+        if fuse:
+            self.tasks = self._fuse(self.tasks)
+
+        # run stages as processes (default) or threads
+        if stage_mode is not None:
+            for task in self.tasks:
+                if isinstance(task, (dm.PipeTask, dm.SinkTask)):
+                    task.mode = stage_mode
+
+        # bound internal queues that were not explicitly bounded
+        if capacity is not None:
+            for task in self.tasks[:-1]:
+                if isinstance(task, (dm.ITaskWithOutput, MergedSource, Parallel)) and task.target.capacity is None:
+                    task.target.set_policy(capacity, policy)
 
         # handle first task
         first = self.tasks[0]
@@ -142,7 +298,7 @@ class Pipeline(CompositeTask):
             self.source = None  # type: ignore
             self.target = first.target
             self.logger.debug(f"task={first.name}, source=None, target={first.target}")
-        elif isinstance(first, (dm.PipeTask, dm.Pipeline)):
+        elif isinstance(first, (dm.PipeTask, dm.Pipeline, Parallel)):
             self.source = first.source
             self.target = first.target
         else:
@@ -150,7 +306,7 @@ class Pipeline(CompositeTask):
 
         # handle intermediate tasks
         for task in self.tasks[1:-1]:
-            assert isinstance(task, (dm.PipeTask, Pipeline))
+            assert isinstance(task, (dm.PipeTask, Pipeline, Parallel))
             task.source.assign(self.target)
             self.target = task.target
             self.logger.debug(f"task={task.name}, source={task.source}, target={task.target}")
@@ -173,7 +329,92 @@ class Pipeline(CompositeTask):
         else:
             raise ValueError(last)
 
-    def run(self, duration: float | None = None, block=True) -> None:
+        if checkpoints is not None:
+            self._attach_checkpoints(checkpoints)
+
+    def _attach_checkpoints(self, checkpoints: dm.Checkpoints) -> None:
+        # each task saves its state under a key of its own (i.e., its position, and its name)
+        for i, task in enumerate(self.parts()):
+            task.checkpoints = checkpoints
+            task.checkpoint_key = f"{i:02d}.{task.name}"
+            checkpoints.keys.append(task.checkpoint_key)
+
+    def _checkpoint_sources(self, id: int) -> None:
+        # start a checkpoint at each source. streams from an API checkpoint themselves (see ISource)
+        for task in self.parts():
+            if task.inputs is None and not isinstance(task, dm.APIStreamer):
+                task.signal(dm.Signal.checkpoint(id))
+
+    @staticmethod
+    def parallel(
+        stage: dm.PipeTask | Callable[[], dm.PipeTask],
+        n: int,
+        key: str | Callable[[dict], Hashable] | None = None,
+        ordered: bool = False,
+    ) -> Parallel:
+        """
+        Run a stage on n copies, sharding items by key (see Parallel).
+
+        Args:
+            stage (dm.PipeTask | Callable[[], dm.PipeTask]): the stage (which is copied), or a function to create copies
+            n (int): number of copies
+            key (str | Callable[[dict], Hashable] | None): field name or function to shard by (round-robin if None)
+            ordered (bool): whether to emit outputs in the order of the inputs
+
+        Returns:
+            Parallel: a task to place in the pipeline
+        """
+        return Parallel(stage, n, key=key, ordered=ordered)
+
+    @staticmethod
+    def _fuse(tasks: tuple[dm.ITask, ...]) -> tuple[dm.ITask, ...]:
+        fused: list[dm.ITask] = []
+        group: list[dm.PipeTask] = []
+        for task in (*tasks, None):
+            if isinstance(task, dm.PipeTask) and task.stateless:
+                group.append(task)
+                continue
+            if len(group) > 1:
+                fused.append(Fused(*group))
+            else:
+                fused.extend(group)
+            group = []
+            if task is not None:
+                fused.append(task)
+        return tuple(fused)
+
+    def start(self):
+        if self.checkpoints is not None:
+            self.checkpoints.restore({task.checkpoint_key: task for task in self.parts()})
+        if self.executor is None:
+            super().start()
+        else:
+            signal.signal(signal.SIGINT, self.__signal__)
+            self.executor.submit(*self.tasks)
+            self.executor.start()
+            dm.ReplayScheduler.start_pending(self.parts())
+        if self.checkpoints is not None:
+            self.checkpoints.start(self._checkpoint_sources)
+
+    def stop(self):
+        if self.checkpoints is not None:
+            self.checkpoints.stop()
+        if self.executor is None:
+            return super().stop()
+        self.executor.stop()
+
+    def run(
+        self,
+        duration: float | None = None,
+        block=True,
+        report_interval: float | None = None,
+        profile: bool | dm.Profiler = False,
+    ) -> None:
+        if profile:
+            self._enable_profiler(profile if isinstance(profile, dm.Profiler) else dm.Profiler())
+        if report_interval is not None:
+            self.reporter = StatsReporter(lambda: {self.name: self.stats()}, report_interval)
+            self.reporter.start()
         self.start()
         if block:
             self.block_and_complete(duration)
@@ -188,32 +429,459 @@ class Pipeline(CompositeTask):
         except BaseException as e:
             self.logger.warning(f"pipeline raised an exception: {e}")
             raise e
+        finally:
+            if getattr(self, "reporter", None) is not None:
+                self.reporter.stop()
+        if self.profiler is not None and self.completed.is_set():
+            self._await_exit(self.profiler.flush_interval)
         self.stop()
+        if self.profiler is not None:
+            self.profiler.collect({self.name: self.stats()})
+
+    def _await_exit(self, timeout: float) -> None:
+        # give tasks that have ended a chance to exit on their own (e.g., to flush their sampled stacks) before stopping them
+        deadline = time.perf_counter() + timeout
+        for task in self.units():
+            proc = getattr(task, "proc", None)
+            if proc is not None:
+                proc.join(max(0.0, deadline - time.perf_counter()))
+
+    def _enable_profiler(self, profiler: dm.Profiler) -> None:
+        # time every operation of each task/queue, and sample the stack of each task (or worker)
+        for task in self.units():
+            profiler.enable(task)
+        if self.executor is not None:
+            self.executor.profiler = profiler
+        self.profiler = profiler
 
 
     def __call__(self, *args, **kwargs) -> None:
         raise ValueError("should never be called")
 
 
+class Fused(dm.PipeTask):
+    """
+    Run adjacent stages back-to-back within a single task, without queues in between
+
+    """
+
+    def __init__(self, *stages: dm.PipeTask) -> None:
+        super().__init__(transform=None)
+        assert len(stages) > 0
+        self.stages = stages
+        self.name = "+".join(stage.name for stage in stages)
+        for stage in self.stages:
+            stage.target = dm.LocalQueue()
+
+    def _forward(self, items: list, start: int = 0) -> int | None:
+        # pass items through stages[start:], and put the outcome into target
+        retval = None
+        for stage in self.stages[start:]:
+            for item in items:
+                if type(item) is dm.Signal:
+                    r = stage._on_signal(item)
+                else:
+                    r = stage.step_batch(item) if type(item) is dm.Chunk else stage.step(item)
+                retval = r if retval is None else retval
+            items = stage.target.drain()  # type: ignore
+        for item in items:
+            self.target.put(item)
+        return retval
+
+    def step(self, msg) -> int | None:
+        return self._forward([msg])
+
+    def step_batch(self, chunk: dm.Chunk) -> int | None:
+        return self._forward([chunk])
+
+    def on_signal(self, sig: dm.Signal) -> int | None:
+        if sig.kind == "eos":
+            return super().on_signal(sig)
+        # pass the signal through each stage, so that it stays in order with their outputs
+        self._forward([sig])
+
+    def parts(self) -> list[dm.ITask]:
+        return [part for stage in self.stages for part in stage.parts()]
+
+    def close(self) -> None:
+        # close each stage in order, passing whatever it releases to the downstream stages
+        for i, stage in enumerate(self.stages):
+            stage.close()
+            items = stage.target.drain()  # type: ignore
+            if i + 1 < len(self.stages):
+                self._forward(items, i + 1)
+            else:
+                for item in items:
+                    self.target.put(item)
+
+
+def _replicate(stage: dm.PipeTask) -> dm.PipeTask:
+    # deep-copy a stage, except for its queues, control lane, and metrics, which are created anew
+    runtime = (stage.source, stage.target, stage.control, stage.sent, stage.metrics)
+    replica = copy.deepcopy(stage, {id(x): None for x in runtime})
+    dm.PipeTask.__init__(replica, stage.mode, stage.transform)
+    replica.name = stage.name
+    return replica
+
+
+def _key_of(msg: dict, key: str | Callable[[dict], Hashable]) -> Hashable:
+    if callable(key):
+        return key(msg)
+    for part in (msg, msg.get("index"), msg.get("value")):
+        if isinstance(part, dict) and key in part:
+            return part[key]
+    raise KeyError(key)
+
+
+def _shard_of(key: Hashable, n: int) -> int:
+    # a hash that is the same on every run (unlike hash() of str keys), so that keys stay on the copy that holds their state
+    if isinstance(key, np.generic):
+        key = key.item()
+    return zlib.crc32(repr(key).encode()) % n
+
+
+class _Shard(dm.PipeTask):
+    """
+    Run a copy of a stage on (seq, item) pairs, and output (seq, [items released by the stage])
+
+    """
+
+    def __init__(self, stage: dm.PipeTask) -> None:
+        super().__init__(mode=stage.mode, transform=None)
+        self.stage = stage
+        self.name = stage.name
+        self.pinned = stage.pinned
+        stage.target = dm.LocalQueue()
+
+    def step(self, msg: tuple[int, Any]) -> int | None:
+        seq, item = msg
+        if type(item) is dm.Signal:
+            retval = self.stage._on_signal(item)
+        elif type(item) is dm.Chunk:
+            retval = self.stage.step_batch(item)
+        else:
+            retval = self.stage.step(item)
+        self.target.put((seq, self.stage.target.drain()))  # type: ignore
+        return retval
+
+    def on_signal(self, sig: dm.Signal) -> int | None:
+        if sig.kind == "eos":
+            # pass on whatever the stage releases when closed (seq=None)
+            self.stage.on_signal(sig)
+            items = [x for x in self.stage.target.drain() if not dm.is_eos(x)]  # type: ignore
+            self.target.put((None, items))
+        return super().on_signal(sig)
+
+    def parts(self) -> list[dm.ITask]:
+        return self.stage.parts()
+
+    def close(self) -> None:
+        pass
+
+
+class Parallel(CompositeTask):
+    """
+    Shard items across n copies of a stage, and merge their outputs
+
+    Items with the same key go to the same copy (or round-robin, if key=None). The key is a field name
+    (looked up in the item, its index, and its value) or a function of the item. With ordered=True,
+    outputs are emitted in the order of the items they came from. Chunks are split by key,
+    and signals are passed to every copy, and emitted once all copies have passed them on.
+
+    """
+
+    source: dm.Queue
+    target: dm.Queue
+
+    def __init__(
+        self,
+        stage: dm.PipeTask | Callable[[], dm.PipeTask],
+        n: int,
+        key: str | Callable[[dict], Hashable] | None = None,
+        ordered: bool = False,
+        transform=None,
+    ) -> None:
+        assert n > 0
+        if isinstance(stage, dm.PipeTask):
+            stages = [stage] + [_replicate(stage) for _ in range(n - 1)]
+        else:
+            stages = [stage() for _ in range(n)]
+        super().__init__(*[_Shard(s) for s in stages], run_self=True, transform=transform)
+        self.name = f"Parallel[{stages[0].name}]"
+        self.source = dm.Queue(timeout=dm.IDLE_TIMEOUT, empty=True)
+        self.target = dm.Queue(timeout=dm.IDLE_TIMEOUT)
+        for task in self.tasks:
+            task.source.assign(dm.Queue())  # type: ignore
+        self.key = key
+        self.ordered = ordered
+        self.seq = 0
+        self.rr = 0
+        # number of shards (i.e., copies) that each pending item was sent to, and the outputs received so far
+        self.nshards: dict[int, int] = {}
+        self.pending: dict[int, list[list]] = {}
+        self.signals: dict[int, dm.Signal] = {}
+        self.next = 0
+        self.closing: list = []
+        self.ended = [False] * n
+
+    @property
+    def inputs(self) -> list[dm.Queue]:
+        return [self.source] + [task.target for task in self.tasks]  # type: ignore
+
+    def parts(self) -> list[dm.ITask]:
+        # the state is held by the copies, not by the merger
+        return [part for task in self.tasks for part in task.parts()]
+
+    def __call__(self, *args, **kwargs) -> int | None:
+        ready = dm.Queue.wait(self.inputs, dm.IDLE_TIMEOUT)
+        if self.source in ready:
+            item = self.source.get_nowait()
+            if item is not None:
+                if dm.is_control(item):
+                    self.on_signal(item if type(item) is dm.Signal else dm.Signal.eos())
+                else:
+                    self.dispatch(item)
+        for i, task in enumerate(self.tasks):
+            assert isinstance(task, _Shard)
+            if task.target not in ready:
+                continue
+            item = task.target.get_nowait()
+            if item is None:
+                continue
+            if dm.is_eos(item):
+                self.ended[i] = True
+            elif type(item) is tuple:
+                self.collect(*item)
+        if all(self.ended):
+            self.emit(self.closing)
+            self.target.put(dm.END_OF_STREAM)
+            return 0
+
+    def dispatch(self, item) -> None:
+        n = len(self.tasks)
+        if type(item) is dm.Chunk and len(item) == 0:
+            return
+        seq = self.seq
+        self.seq += 1
+        if self.key is None:
+            shards = {self.rr: item}
+            self.rr = (self.rr + 1) % n
+        elif type(item) is dm.Chunk:
+            cols = item.columns
+            if callable(self.key):
+                keys = np.array([self.key(r) for r in item.records()])
+            else:
+                keys = next(c[self.key] for c in (cols, cols.get("index"), cols.get("value")) if isinstance(c, dict) and self.key in c)  # type: ignore
+            uniq, inv = np.unique(keys, return_inverse=True)
+            ids = np.array([_shard_of(k, n) for k in uniq.tolist()])[inv]
+            shards = {i: item.take(ids == i) for i in np.unique(ids).tolist()}
+            if len(shards) == 1:
+                shards = {i: item for i in shards}
+        else:
+            shards = {_shard_of(_key_of(item, self.key), n): item}
+        self.nshards[seq] = len(shards)
+        for i, part in shards.items():
+            self.tasks[i].source.put((seq, part))  # type: ignore
+
+    def collect(self, seq: int | None, items: list) -> None:
+        if seq is None:
+            self.closing.extend(items)
+            return
+        if not self.ordered:
+            # data can be emitted right away, but signals wait for every copy
+            self.emit([x for x in items if type(x) is not dm.Signal])
+            items = [x for x in items if type(x) is dm.Signal]
+        self.pending.setdefault(seq, []).append(items)
+        if not self.ordered:
+            if len(self.pending[seq]) == self.nshards[seq]:
+                self.release(seq)
+            return
+        while self.next in self.pending and len(self.pending[self.next]) == self.nshards[self.next]:
+            self.release(self.next)
+            self.next += 1
+
+    def release(self, seq: int) -> None:
+        items = [x for part in self.pending.pop(seq) for x in part]
+        del self.nshards[seq]
+        sig = self.signals.pop(seq, None)
+        if sig is None:
+            self.emit(items)
+            return
+        # emit the signal once, if any copy passed it on
+        same = [type(x) is dm.Signal and x.kind == sig.kind for x in items]
+        self.emit([x for x, s in zip(items, same) if not s])
+        if any(same):
+            self.target.put(next(x for x, s in zip(items, same) if s))
+
+    def emit(self, items: list) -> None:
+        for item in items:
+            if self.transform is not None and type(item) is not dm.Signal:
+                item = self.transform(item)
+            self.target.put(item)
+
+    def on_signal(self, sig: dm.Signal) -> int | None:
+        if sig.kind == "eos":
+            # the copies end on their own, and END_OF_STREAM is emitted once all of them have
+            for task in self.tasks:
+                task.source.put(dm.END_OF_STREAM)  # type: ignore
+            return
+        seq = self.seq
+        self.seq += 1
+        self.nshards[seq] = len(self.tasks)
+        self.signals[seq] = sig
+        for task in self.tasks:
+            task.source.put((seq, sig))  # type: ignore
+
+
+def _namespace(msg: dict) -> dict:
+    # names visible to expressions, i.e., the message fields, and the fields of its index and value
+    return {**msg, **msg.get("index", {}), **msg.get("value", {})}
+
+
+class _Vectorize(ast.NodeTransformer):
+    """
+    Rewrite python operators that do not broadcast over arrays into their elementwise numpy equivalents.
+
+    """
+
+    def _call(self, fn: str, *args: ast.expr) -> ast.Call:
+        func = ast.Attribute(value=ast.Name(id="__np__", ctx=ast.Load()), attr=fn, ctx=ast.Load())
+        return ast.Call(func=func, args=list(args), keywords=[])
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> ast.expr:
+        self.generic_visit(node)
+        fn = "logical_and" if isinstance(node.op, ast.And) else "logical_or"
+        expr = node.values[0]
+        for value in node.values[1:]:
+            expr = self._call(fn, expr, value)
+        return expr
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.expr:
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return self._call("logical_not", node.operand)
+        return node
+
+    def visit_Compare(self, node: ast.Compare) -> ast.expr:
+        self.generic_visit(node)
+        if len(node.ops) == 1:
+            return node
+        # a < b < c -> (a < b) & (b < c)
+        lhs, parts = node.left, []
+        for op, rhs in zip(node.ops, node.comparators):
+            parts.append(ast.Compare(left=lhs, ops=[op], comparators=[rhs]))
+            lhs = rhs
+        expr = parts[0]
+        for part in parts[1:]:
+            expr = self._call("logical_and", expr, part)
+        return expr
+
+    def visit_IfExp(self, node: ast.IfExp) -> ast.expr:
+        self.generic_visit(node)
+        return self._call("where", node.test, node.body, node.orelse)
+
+
+class Predicate:
+    """
+    Condition on messages, parsed and compiled once.
+
+    On a Chunk, the condition is evaluated over whole numpy columns into a boolean mask
+    (and falls back to row-by-row evaluation if it cannot be vectorized).
+
+    """
+
+    def __init__(self, condition: str) -> None:
+        self.condition = condition
+        self.code = compile(condition, "<condition>", "eval")
+        tree = _Vectorize().visit(ast.parse(condition, mode="eval"))
+        self.vcode = compile(ast.fix_missing_locations(tree), "<condition>", "eval")
+        self.vectorized = True
+
+    def __call__(self, msg: dict) -> bool:
+        ns = _namespace(msg)
+        ns["isnan"] = math.isnan
+        return bool(eval(self.code, ns))
+
+    def mask(self, chunk: dm.Chunk) -> np.ndarray:
+        n = len(chunk)
+        if self.vectorized:
+            try:
+                ns = _namespace(chunk.columns)
+                ns.update(isnan=np.isnan, __np__=np)
+                with np.errstate(all="ignore"):
+                    mask = np.asarray(eval(self.vcode, ns))
+                if mask.shape == (n,):
+                    return np.asarray(mask, dtype=bool)
+                if mask.ndim == 0 and not any(name in ns for name in self.code.co_names):
+                    # constant condition
+                    return np.full(n, bool(mask))
+            except Exception:
+                pass
+            self.vectorized = False
+        return np.array([self(record) for record in chunk.records()], dtype=bool)
+
+
 class ExpressionMap:
+    """
+    Map each message into a dict, by evaluating a python expression for each key.
+
+    Expressions are compiled once. On a Chunk, each expression is evaluated over whole numpy columns,
+    and falls back to row-by-row evaluation if it cannot be vectorized (e.g., when it uses `and`, `or`, or `if`).
+
+    """
+
+    # whether __call__ accepts a Chunk
+    vectorized = True
 
     def __init__(self, mapping: dict[str, str]) -> None:
         self.mapping = mapping
+        self.codes = {k: compile(expr, f"<{k}>", "eval") for k, expr in mapping.items()}
+        # keys whose expressions could not be vectorized
+        self.scalar: set[str] = set()
 
-    def __call__(self, msg: dict | Namespace):
-        if msg == dm.END_OF_STREAM:
+    def __call__(self, msg: dict | Namespace | dm.Chunk):
+        if dm.is_control(msg):
             return msg
-        target = {}
+        if type(msg) is dm.Chunk:
+            return self.call_batch(msg)
         if isinstance(msg, dict):
-            for k, expr in self.mapping.items():
-                target[k] = eval(expr, dict(**msg, **msg.get("index", {}), **msg.get("value", {})))
+            ns = _namespace(msg)
         elif isinstance(msg, Namespace):
-            for k, expr in self.mapping.items():
-                target[k] = eval(expr, dict(msg._get_kwargs()))
-        return target
-    
+            ns = dict(msg._get_kwargs())
+        else:
+            return {}
+        return {k: eval(code, ns) for k, code in self.codes.items()}
+
+    def call_batch(self, chunk: dm.Chunk) -> dm.Chunk:
+        n = len(chunk)
+        ns = _namespace(chunk.columns)
+        rows = None
+        output = {}
+        for k, code in self.codes.items():
+            if k not in self.scalar:
+                try:
+                    with np.errstate(all="ignore"):
+                        value = np.asarray(eval(code, ns))
+                    if value.shape[:1] == (n,):
+                        output[k] = value
+                        continue
+                    if value.ndim == 0 and not any(name in ns for name in code.co_names):
+                        # constant expression
+                        output[k] = np.full(n, value)
+                        continue
+                except Exception:
+                    pass
+                self.scalar.add(k)
+            if rows is None:
+                rows = [_namespace(record) for record in chunk.records()]
+            output[k] = np.array([eval(code, row) for row in rows])
+        return dm.Chunk(output)
+
+
 class Transform(dm.PipeTask):
 
+    stateless = True
+
     def __init__(self, transform=None) -> None:
         super().__init__(transform=transform)
 
@@ -225,6 +893,12 @@ class Transform(dm.PipeTask):
             msg = self.transform(msg)
         self.target.put(msg)
 
+    def step_batch(self, chunk: dm.Chunk) -> int | None:
+        if getattr(self.transform, "vectorized", False):
+            self.target.put(self.transform(chunk))  # type: ignore
+        else:
+            return super().step_batch(chunk)
+
 
 class Filter(dm.PipeTask):
     """
@@ -232,43 +906,70 @@ class Filter(dm.PipeTask):
 
     """
 
+    stateless = True
+
     def __init__(self, condition: str) -> None:
         super().__init__(transform=None)
         self.condition = condition
+        self.predicate = Predicate(condition)
 
     def close(self) -> None:
         pass
 
     def step(self, msg) -> int | None:
-        from math import isnan
-        check = eval(self.condition, dict(**msg, **msg.get("index", {}), **msg.get("value", {}), isnan=isnan))
-        if check == True:
+        if self.predicate(msg):
             if self.transform is not None:
                 msg = self.transform(msg)
             self.target.put(msg)
 
+    def step_batch(self, chunk: dm.Chunk) -> int | None:
+        mask = self.predicate.mask(chunk)
+        if not mask.any():
+            return
+        if not mask.all():
+            chunk = chunk.take(mask)
+        if self.transform is None:
+            self.target.put(chunk)
+        elif getattr(self.transform, "vectorized", False):
+            self.target.put(self.transform(chunk))
+        else:
+            for record in chunk.records():
+                self.target.put(self.transform(record))
+
 
 class Split(dm.PipeTask):
     """
     Split output based on expression
 
+    On a Chunk, conditions are evaluated over whole columns, and one output is emitted per record (as in step).
+
     """
 
     def __init__(self, *cond: tuple[str, str], agg: str, transform=None) -> None:
-        super().__init__(transform)
+        super().__init__(transform=transform)
         self.cond = cond
         self.agg = agg
         self.map = [None] * len(self.cond)
+        self.predicates = [Predicate(c) for (_, c) in self.cond]
 
     def step(self, msg) -> int | None:
 
         # evaluate condition
-        for i, (_, cond) in enumerate(self.cond):
-            from math import isnan
-            met = eval(cond, dict(**msg, **msg.get("index", {}), **msg.get("value", {}), isnan=isnan))
-            if met:
+        for i, predicate in enumerate(self.predicates):
+            if predicate(msg):
                 self.map[i] = msg
-        
+        self.emit()
+
+    def step_batch(self, chunk: dm.Chunk) -> int | None:
+        masks = [predicate.mask(chunk) for predicate in self.predicates]
+        # emit one output per record (without re-evaluating conditions)
+        for j, record in enumerate(chunk.records()):
+            for i, mask in enumerate(masks):
+                if mask[j]:
+                    self.map[i] = record
+            self.emit()
+
+    def emit(self) -> None:
         # prepare output based on given agg
         if self.agg == "list":
             msg = copy.deepcopy(self.map)
@@ -277,13 +978,13 @@ class Split(dm.PipeTask):
             for i, (name, _) in enumerate(self.cond):
                 val = self.map[i]
                 if val is not None:
-                    msg[name] = dict(**val)
+                    msg[name] = dict(**val) if isinstance(val, dict) else val
         elif self.agg == "obj":
             msg = Namespace(**{name: None for (name, _) in self.cond})
             for i, (name, _) in enumerate(self.cond):
                 val = self.map[i]
                 if val is not None:
-                    setattr(msg, name, Namespace(**val))
+                    setattr(msg, name, Namespace(**val) if isinstance(val, dict) else val)
         
         if self.transform is not None:
             msg = self.transform(msg)
@@ -1,53 +1,757 @@
 from __future__ import annotations
 
 import abc
+import collections
+import contextlib
 import logging
 import multiprocess
+import multiprocess.connection
+import multiprocess.reduction
 import multiprocess.synchronize
+import os
 import signal
 import threading
+import time
+from queue import Empty, Full
 from typing import Callable, Generic, Literal, TypeVar
 
+import numpy as np
 from pydantic import BaseModel
 
 import streaminghub_pydfds as dfds
 
 from . import util as dm
+from .checkpoint import Checkpoints
+from .metrics import (
+    K_EOS_AT,
+    K_RECORDS,
+    K_STARTED_AT,
+    K_STEPS,
+    Q_ABOVE_HWM,
+    Q_DROPPED,
+    Q_GOT,
+    Q_HWM_EVENTS,
+    Q_PUT,
+    T_GET_WAIT,
+    T_PUT_WAIT,
+    T_SERIALIZE,
+    T_STEP,
+    QueueMetrics,
+    TaskMetrics,
+)
+from .oob import Frame, ZeroCopyQueue, discard, loads
+from .profiler import Profiler
+from .shm import SharedRingBuffer, layout_from_stream
 
 END_OF_STREAM = {}  # NOTE do not change
 Q = multiprocess.Queue
 
+# max. time (in seconds) that an idle task blocks on its queue, before re-checking whether it was stopped
+IDLE_TIMEOUT = 0.1
+# polling interval (in seconds) for queue backends that cannot be waited upon (e.g., shared-memory rings)
+POLL_INTERVAL = 0.001
+# number of records per chunk in bulk replays (see IAPI.replay_collection_stream)
+BULK_CHUNK_SIZE = 65536
+
 Flag = multiprocess.synchronize.Event
 
+Policy = Literal["block", "drop_oldest", "drop_newest", "latest"]
+
+SignalKind = Literal["eos", "flush", "watermark", "pause", "resume", "checkpoint"]
+
+
+class Signal:
+    """
+    Typed control message.
+
+    * **eos**: end of stream. On the data lane, this is sent as END_OF_STREAM (for compatibility)
+    * **flush**: emit any buffered results
+    * **watermark**: no message with an event time earlier than value will follow
+    * **pause** / **resume**: suspend / resume a task (control lane only)
+    * **checkpoint**: save the state of each task, as of this point in the stream (value: id, and states of upstream streams)
+
+    Signals on the data lane (flush, watermark) stay in order with the data.
+    Signals on the control lane of a task (see ITask.signal) overtake the data.
+
+    """
+
+    __slots__ = ("kind", "value", "origin")
+
+    def __init__(self, kind: SignalKind, value: float | dict | None = None, origin: int | None = None) -> None:
+        self.kind = kind
+        self.value = value
+        # input of a fan-in queue that sent this signal (see Queue.with_producers)
+        self.origin = origin
+
+    def __getstate__(self):
+        return (self.kind, self.value, self.origin)
+
+    def __setstate__(self, state):
+        self.kind, self.value, self.origin = state
+
+    def __repr__(self) -> str:
+        return f"Signal({self.kind}, {self.value})" if self.value is not None else f"Signal({self.kind})"
+
+    @classmethod
+    def eos(cls) -> Signal:
+        return cls("eos")
+
+    @classmethod
+    def flush(cls) -> Signal:
+        return cls("flush")
+
+    @classmethod
+    def watermark(cls, value: float) -> Signal:
+        return cls("watermark", value)
+
+    @classmethod
+    def pause(cls) -> Signal:
+        return cls("pause")
+
+    @classmethod
+    def resume(cls) -> Signal:
+        return cls("resume")
+
+    @classmethod
+    def checkpoint(cls, id: int, sources: dict | None = None) -> Signal:
+        return cls("checkpoint", dict(id=id, sources=sources or {}))
+
+
+class SignalMerger:
+    """
+    Merge the signals of many inputs into one stream of signals.
+
+    * **watermark**: the earliest watermark of the inputs that have not ended, which only moves forward
+    * **checkpoint**: passed on once every input that has not ended has passed it (with the upstream states of all)
+    * others are passed on as-is
+
+    """
+
+    def __init__(self, n: int) -> None:
+        self.watermarks: list[float | None] = [None] * n
+        self.watermark: float | None = None
+        self.ended = [False] * n
+        # upstream states of each pending checkpoint, by input
+        self.barriers: dict[int, dict[int, dict]] = {}
+
+    def push(self, i: int, sig: Signal) -> list[Signal]:
+        """
+        Take a signal of input i.
+
+        Returns:
+            list[Signal]: signals to pass on
+        """
+        if sig.kind == "checkpoint":
+            self.barriers.setdefault(sig.value["id"], {})[i] = sig.value["sources"]  # type: ignore
+            return self._release()
+        if sig.kind == "watermark":
+            self.watermarks[i] = sig.value  # type: ignore
+            return self._advance()
+        return [sig]
+
+    def end(self, i: int) -> list[Signal]:
+        """
+        Take the end of input i, which no longer holds back watermarks and checkpoints.
+
+        Returns:
+            list[Signal]: signals to pass on
+        """
+        self.ended[i] = True
+        return self._release() + self._advance()
+
+    def _release(self) -> list[Signal]:
+        released = []
+        active = [j for j, ended in enumerate(self.ended) if not ended]
+        for id in list(self.barriers):
+            if all(j in self.barriers[id] for j in active):
+                sources = {k: v for states in self.barriers.pop(id).values() for k, v in states.items()}
+                released.append(Signal.checkpoint(id, sources))
+        return released
+
+    def _advance(self) -> list[Signal]:
+        active = [w for w, ended in zip(self.watermarks, self.ended) if not ended]
+        if len(active) == 0 or any(w is None for w in active):
+            return []
+        watermark = min(active)  # type: ignore
+        if self.watermark is not None and watermark <= self.watermark:
+            return []
+        self.watermark = watermark
+        return [Signal.watermark(watermark)]
+
+
+def is_eos(item) -> bool:
+    # type checks only, to avoid comparing every message against END_OF_STREAM
+    if type(item) is dict:
+        return len(item) == 0
+    return type(item) is Signal and item.kind == "eos"
+
+
+def is_control(item) -> bool:
+    return type(item) is Signal or (type(item) is dict and len(item) == 0)
+
 D = TypeVar("D")
 
 
 class Queue(Generic[D]):
+    """
+    Queue to pass messages between tasks.
+
+    A queue may be bounded to a capacity, with a policy that decides what happens when it is full.
+
+    * **block**: wait until space is available (default)
+    * **drop_oldest**: evict the oldest queued message to make space
+    * **drop_newest**: discard the incoming message
+    * **latest**: only keep the latest message(s), i.e., conflate (capacity defaults to 1)
+
+    END_OF_STREAM and other signals are never dropped, and keep their place in the queue.
+
+    With zero_copy=True, large buffers (e.g., numpy arrays) are moved out-of-band through shared memory,
+    instead of being pickled into the queue. Messages that were already serialized into a Frame
+    (e.g., by Broadcast) are deserialized on get(), regardless.
+
+    Every queue keeps metrics (items in/out, dropped messages, sampled put/get wait times),
+    which are shared by all of its handles. See stats().
+
+    """
 
-    q: Q
+    q: Q | SharedRingBuffer | ZeroCopyQueue
 
-    def __init__(self, empty: bool = False, timeout=None) -> None:
+    def __init__(
+        self,
+        empty: bool = False,
+        timeout=None,
+        capacity: int | None = None,
+        policy: Policy = "block",
+        high_watermark: float = 0.8,
+        zero_copy: bool = False,
+    ) -> None:
         super().__init__()
         self.timeout = timeout
+        self.zero_copy = zero_copy
+        self.metrics = QueueMetrics()
+        # queues that each message is copied into (see tee), and the number of writers (see with_producers)
+        self.branches: list[Queue] = []
+        self.producers = 1
+        self.ended = 0
+        # input that this handle writes into a fan-in queue as, and the merged signals of a fan-in queue to get next
+        self.origin: int | None = None
+        self.merger: SignalMerger | None = None
+        self.held: collections.deque = collections.deque()
+        self.set_policy(capacity, policy, high_watermark)
         if empty:
             self.q = None  # type: ignore
         else:
-            self.q = Q()
+            self.q = self._create(self.capacity)
+
+    def _create(self, capacity: int | None) -> Q | ZeroCopyQueue:
+        if self.zero_copy:
+            return ZeroCopyQueue(capacity or 0)
+        return Q(capacity or 0)
+
+    def set_policy(self, capacity: int | None, policy: Policy = "block", high_watermark: float = 0.8) -> None:
+        """
+        Set the capacity and policy of this queue. Call before the queue is shared with other tasks.
+
+        Args:
+            capacity (int | None): max. number of messages held in the queue. None for unbounded
+            policy (Policy): what to do when the queue is full
+            high_watermark (float): fraction of the capacity at which a high-watermark event is counted
+        """
+        assert policy in ("block", "drop_oldest", "drop_newest", "latest"), policy
+        if policy == "latest" and capacity is None:
+            capacity = 1
+        assert capacity is None or capacity > 0
+        self.capacity = capacity
+        self.policy = policy
+        self.high_watermark = high_watermark
+        # held while evicting, so that no other producer puts a message in between the requeued ones
+        self.evicting = multiprocess.Lock() if policy in ("drop_oldest", "latest") else None
+        if getattr(self, "q", None) is not None:
+            # recreate the underlying queue with the new capacity
+            if isinstance(self.q, SharedRingBuffer):
+                self.q = SharedRingBuffer(self.q.layout, capacity or self.q.capacity)
+            else:
+                self.q = self._create(capacity)
+
+    @classmethod
+    def from_stream(
+        cls,
+        stream: dfds.Stream,
+        capacity: int = 1024,
+        timeout=None,
+        policy: Policy = "block",
+    ) -> Queue:
+        """
+        Create a queue backed by a shared-memory ring, sized from the stream fields/index.
+
+        Falls back to a pickle queue if the stream is not tabular.
+
+        Args:
+            stream (dfds.Stream): stream whose records will pass through the queue
+            capacity (int): maximum number of records held in the ring
+            timeout (float | None): timeout for get()
+            policy (Policy): what to do when the queue is full
+
+        Returns:
+            Queue: a queue for records of the given stream
+        """
+        instance = cls(empty=True, timeout=timeout, capacity=capacity, policy=policy)
+        layout = layout_from_stream(stream)
+        if layout is None:
+            instance.q = Q(capacity)
+        else:
+            instance.q = SharedRingBuffer(layout, capacity)
+        return instance
 
     def assign(self, q: Queue):
         self.q = q.q
+        self.zero_copy = q.zero_copy
+        self.metrics = q.metrics
+        self.capacity = q.capacity
+        self.policy = q.policy
+        self.high_watermark = q.high_watermark
+        self.evicting = q.evicting
+        # so that wrappers (e.g., ChunkedQueue) keep the fan-out / fan-in of the queue they wrap
+        self.branches = q.branches
+        self.producers = q.producers
+        self.origin = q.origin
+
+    def tee(self, *queues: Queue):
+        """
+        Put each message into all of the given queues, instead of this one.
+
+        Args:
+            queues (Queue): queues to copy messages into
+        """
+        self.branches = list(queues)
+        return self
+
+    def with_producers(self, n: int):
+        """
+        Expect messages from n producers, i.e., only pass on END_OF_STREAM once all of them have ended.
+
+        Producers that write through a handle of this queue (see as_input) also have their signals merged,
+        i.e., the earliest watermark of all, and each checkpoint once all of them have passed it (see SignalMerger).
+
+        Args:
+            n (int): number of producers
+        """
+        assert n > 0
+        self.producers = n
+        return self
+
+    def as_input(self, i: int) -> Queue:
+        """
+        Get a handle to write into this (fan-in) queue as its i-th producer.
+
+        Args:
+            i (int): index of the producer
+
+        Returns:
+            Queue: a handle that tags the signals it puts with i
+        """
+        assert 0 <= i < self.producers
+        handle = Queue(empty=True, timeout=self.timeout)
+        handle.assign(self)
+        handle.origin = i
+        return handle
+
+    @property
+    def dropped(self) -> int:
+        return self.metrics.get(Q_DROPPED)
+
+    @property
+    def hwm_events(self) -> int:
+        return self.metrics.get(Q_HWM_EVENTS)
+
+    @property
+    def depth(self) -> int | None:
+        if self.q is None:
+            return 0
+        try:
+            return self.q.qsize()
+        except NotImplementedError:
+            return None
+
+    def stats(self) -> dict:
+        """
+        Take a snapshot of the queue metrics.
+
+        Returns:
+            dict: items in/out, dropped messages, high-watermark events, put/get wait times, and current depth
+        """
+        stats = self.metrics.snapshot()
+        stats.update(depth=self.depth, capacity=self.capacity, policy=self.policy)
+        return stats
 
     def get(self) -> D | None:
+        return self._get(True, self.timeout)
+
+    def get_nowait(self) -> D | None:
+        return self._get(False, None)
+
+    def _get(self, block: bool, timeout: float | None) -> D | None:
+        if len(self.held) > 0:
+            return self.held.popleft()
+        m = self.metrics
+        timed = m.sample(T_GET_WAIT)
+        t0 = time.perf_counter_ns() if timed else 0
         try:
-            return self.q.get(timeout=self.timeout)
+            item = self.q.get(block, timeout)
         except:
             return None
+        if type(item) is Frame:
+            item = loads(item)
+        if timed:
+            m.observe(T_GET_WAIT, time.perf_counter_ns() - t0)
+        m.incr(Q_GOT)
+        if self.producers > 1 and type(item) is Signal and item.origin is not None:
+            return self._merge(item)
+        if self.producers > 1 and is_eos(item):
+            # hold back END_OF_STREAM until the last producer has ended
+            self.ended += 1
+            if self.ended < self.producers:
+                return None
+        return item
+
+    def _merge(self, sig: Signal):
+        # merge the signals of the producers of a fan-in queue, and get the next one to pass on (if any)
+        if self.merger is None:
+            self.merger = SignalMerger(self.producers)
+        if sig.kind == "eos":
+            self.held.extend(self.merger.end(sig.origin))  # type: ignore
+            self.ended += 1
+            if self.ended == self.producers:
+                self.held.append(END_OF_STREAM)
+        else:
+            self.held.extend(self.merger.push(sig.origin, Signal(sig.kind, sig.value)))  # type: ignore
+        return self.held.popleft() if len(self.held) > 0 else None
+
+    @staticmethod
+    def wait(queues: list[Queue], timeout: float | None = None) -> list[Queue]:
+        """
+        Block until any of the given queues has items to get, or until the timeout expires.
+
+        Args:
+            queues (list[Queue]): queues to wait upon
+            timeout (float | None): max. time to wait (in seconds). None to wait indefinitely
+
+        Returns:
+            list[Queue]: queues that have items to get
+        """
+        readers: dict = {}
+        polled: list[Queue] = []
+        for queue in queues:
+            reader = getattr(queue.q, "_reader", None)
+            if reader is None:
+                polled.append(queue)
+            else:
+                readers.setdefault(reader, []).append(queue)
+        if len(polled) == 0:
+            ready = multiprocess.connection.wait(list(readers), timeout)
+            return [queue for r in ready for queue in readers[r]]
+        # some backends have no file descriptor to wait upon, so poll them instead
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            ready = [queue for queue in polled if not queue.q.empty()]
+            if len(readers) > 0:
+                ready += [queue for r in multiprocess.connection.wait(list(readers), 0) for queue in readers[r]]
+            if len(ready) > 0 or (deadline is not None and time.perf_counter() >= deadline):
+                return ready
+            time.sleep(POLL_INTERVAL)
 
     def put(self, obj: D, block: bool = True, timeout: float | None = None) -> None:
-        return self.q.put(obj, block, timeout)
+        m = self.metrics
+        if self.origin is not None and is_control(obj):
+            # tag signals with the producer, so that the fan-in queue can merge them
+            obj = Signal(obj.kind, obj.value, self.origin) if type(obj) is Signal else Signal("eos", None, self.origin)  # type: ignore
+        if len(self.branches) > 0:
+            for branch in self.branches:
+                branch.put(obj, block, timeout)
+            m.incr(Q_PUT)
+            return
+        if m.sample(T_PUT_WAIT):
+            t0 = time.perf_counter_ns()
+            self._put(obj, block, timeout)
+            m.observe(T_PUT_WAIT, time.perf_counter_ns() - t0)
+        else:
+            self._put(obj, block, timeout)
+        m.incr(Q_PUT)
+        if m.profiling and not isinstance(self.q, SharedRingBuffer) and m.sample(T_SERIALIZE):
+            # pipe-backed queues serialize on a feeder thread, so time a separate serialization instead
+            t0 = time.perf_counter_ns()
+            multiprocess.reduction.ForkingPickler.dumps(obj)
+            m.observe(T_SERIALIZE, time.perf_counter_ns() - t0)
+
+    def _put(self, obj: D, block: bool, timeout: float | None) -> None:
+        if self.capacity is None:
+            return self.q.put(obj, block, timeout)
+        if self.policy == "block" or (self.policy == "drop_newest" and is_control(obj)):
+            self.q.put(obj, block, timeout)
+        elif self.policy == "drop_newest":
+            try:
+                self.q.put(obj, False)
+            except Full:
+                self._discard(obj)
+        else:
+            assert self.evicting is not None
+            with self.evicting:
+                try:
+                    self.q.put(obj, False)
+                except Full:
+                    self._evict(obj, block, timeout)
+        self._check_watermark()
+
+    def _evict(self, obj: D, block: bool, timeout: float | None) -> None:
+        # take out the queued messages, drop the oldest data message, and requeue the rest in order.
+        # so signals are never dropped, and never moved behind the messages that followed them
+        assert self.capacity is not None
+        queued, keep = [], True
+        # without a known depth (e.g., on macOS), take until the queue is empty
+        while self.depth != 0:
+            try:
+                queued.append(self.q.get(True, IDLE_TIMEOUT))
+            except Empty:
+                break  # taken by a reader in the meantime
+        if len(queued) >= self.capacity:
+            i = next((i for i, item in enumerate(queued) if not is_control(item)), None)
+            if i is not None:
+                self._discard(queued.pop(i))
+            elif not is_control(obj):
+                # the queue only holds signals
+                self._discard(obj)
+                keep = False
+        for item in queued:
+            self.q.put(item)
+        if keep:
+            self.q.put(obj, block, timeout)
+
+    def _discard(self, obj) -> None:
+        # count a dropped message, and release its shared memory (if any)
+        if type(obj) is Frame:
+            discard(obj)
+        self.metrics.incr(Q_DROPPED)
+
+    def _check_watermark(self) -> None:
+        assert self.capacity is not None
+        depth = self.depth
+        if depth is None:
+            return
+        above = depth >= self.high_watermark * self.capacity
+        if above and not self.metrics.get(Q_ABOVE_HWM):
+            self.metrics.incr(Q_HWM_EVENTS)
+        self.metrics.set(Q_ABOVE_HWM, above)
 
     def put_nowait(self, obj: D) -> None:
-        return self.q.put(obj)
+        return self.put(obj)
+
+
+class Chunk:
+    """
+    Columnar batch of messages, with one numpy array per field.
+
+    The columns mirror the layout of a single message, e.g.,
+    dict(index=dict(t=[...]), value=dict(x=[...], y=[...])) for dict(index=dict(t=...), value=dict(x=..., y=...))
+
+    """
+
+    columns: dict[str, np.ndarray | dict[str, np.ndarray]]
+
+    def __init__(self, columns: dict[str, np.ndarray | dict[str, np.ndarray]]) -> None:
+        self.columns = columns
+
+    def __len__(self) -> int:
+        for col in self.columns.values():
+            if isinstance(col, dict):
+                for arr in col.values():
+                    return len(arr)
+            else:
+                return len(col)
+        return 0
+
+    def __repr__(self) -> str:
+        return f"Chunk(n={len(self)}, columns={self.keys()})"
+
+    def keys(self) -> list[str]:
+        keys = []
+        for k, col in self.columns.items():
+            if isinstance(col, dict):
+                keys.extend(f"{k}.{kk}" for kk in col.keys())
+            else:
+                keys.append(k)
+        return keys
+
+    @classmethod
+    def from_records(cls, records: list[dict]) -> Chunk:
+        assert len(records) > 0
+        columns = {}
+        for k, v in records[0].items():
+            if isinstance(v, dict):
+                columns[k] = {kk: np.array([r[k][kk] for r in records]) for kk in v.keys()}
+            else:
+                columns[k] = np.array([r[k] for r in records])
+        return cls(columns)
+
+    def records(self) -> list[dict]:
+        n = len(self)
+        lists = {}
+        for k, col in self.columns.items():
+            if isinstance(col, dict):
+                lists[k] = {kk: arr.tolist() for kk, arr in col.items()}
+            else:
+                lists[k] = col.tolist()
+        records = []
+        for i in range(n):
+            record = {}
+            for k, col in lists.items():
+                if isinstance(col, dict):
+                    record[k] = {kk: arr[i] for kk, arr in col.items()}
+                else:
+                    record[k] = col[i]
+            records.append(record)
+        return records
+
+    def take(self, idx: np.ndarray | slice) -> Chunk:
+        """
+        Select rows of the chunk by a slice, an index array, or a boolean mask.
+
+        """
+        columns = {}
+        for k, col in self.columns.items():
+            if isinstance(col, dict):
+                columns[k] = {kk: arr[idx] for kk, arr in col.items()}
+            else:
+                columns[k] = col[idx]
+        return Chunk(columns)
+
+    @staticmethod
+    def concat(chunks: list[Chunk]) -> Chunk:
+        assert len(chunks) > 0
+        columns = {}
+        for k, col in chunks[0].columns.items():
+            if isinstance(col, dict):
+                columns[k] = {kk: np.concatenate([c.columns[k][kk] for c in chunks]) for kk in col.keys()}  # type: ignore
+            else:
+                columns[k] = np.concatenate([c.columns[k] for c in chunks])
+        return Chunk(columns)
+
+
+class ChunkedQueue(Queue):
+    """
+    Queue wrapper that batches dict messages into Chunks before putting them into the target queue.
+
+    A chunk is sent once it holds chunk_size records, or once its first record is older than max_latency seconds.
+    With max_latency, a timer thread (one per process) sends a partial chunk once it is due, even if no more
+    records are put (e.g., when a live stream goes idle).
+    Any other message (e.g., END_OF_STREAM) flushes the pending records, and is sent as-is.
+
+    If given, transform is applied to each chunk (i.e., it must accept a Chunk), instead of each record.
+
+    """
+
+    def __init__(
+        self,
+        target: Queue,
+        chunk_size: int,
+        max_latency: float | None = None,
+        transform: Callable | None = None,
+    ) -> None:
+        super().__init__(empty=True, timeout=target.timeout)
+        self.assign(target)
+        self.chunk_size = chunk_size
+        self.max_latency = max_latency
+        self.transform = transform
+        self.pending: list[dict] = []
+        self.t0 = 0.0
+        # guards pending against the timer thread of the current process (see _start_timer)
+        self.cond: threading.Condition | None = None
+        self.timer_pid: int | None = None
+
+    def _start_timer(self) -> None:
+        self.cond = threading.Condition(threading.RLock())
+        self.timer_pid = os.getpid()
+        threading.Thread(target=self._run_timer, name="chunk_timer", daemon=True).start()
+
+    def _run_timer(self) -> None:
+        assert self.cond is not None and self.max_latency is not None
+        with self.cond:
+            while True:
+                if len(self.pending) == 0:
+                    self.cond.wait()
+                    continue
+                wait = self.t0 + self.max_latency - time.perf_counter()
+                if wait > 0:
+                    self.cond.wait(wait)
+                    continue
+                self._flush()
+
+    def _locked(self):
+        # the timer thread only runs with max_latency
+        if self.max_latency is None:
+            return contextlib.nullcontext()
+        if self.timer_pid != os.getpid():
+            self._start_timer()
+        return self.cond
+
+    def flush(self) -> None:
+        with self._locked():  # type: ignore
+            self._flush()
+
+    def _flush(self) -> None:
+        if len(self.pending) > 0:
+            chunk = Chunk.from_records(self.pending)
+            self.pending = []
+            if self.transform is not None:
+                chunk = self.transform(chunk)
+            super().put(chunk)
+
+    def put(self, obj, block: bool = True, timeout: float | None = None) -> None:
+        with self._locked():  # type: ignore
+            if type(obj) is not dict or len(obj) == 0:
+                self._flush()
+                if self.transform is not None and not is_control(obj):
+                    obj = self.transform(obj)
+                return super().put(obj, block, timeout)
+            if len(self.pending) == 0:
+                self.t0 = time.perf_counter()
+                if self.cond is not None:
+                    self.cond.notify()
+            self.pending.append(obj)
+            if len(self.pending) >= self.chunk_size:
+                self._flush()
+            elif self.max_latency is not None and (time.perf_counter() - self.t0) >= self.max_latency:
+                self._flush()
+
+    def put_nowait(self, obj) -> None:
+        return self.put(obj, block=False)
+
+
+class LocalQueue(Queue):
+    """
+    In-process queue, for stages that run back-to-back within the same task.
+
+    """
+
+    def __init__(self) -> None:
+        super().__init__(empty=True)
+        self.items: collections.deque = collections.deque()
+
+    def get(self):
+        return self.items.popleft() if len(self.items) > 0 else None
+
+    def get_nowait(self):
+        return self.get()
+
+    def put(self, obj, block: bool = True, timeout: float | None = None) -> None:
+        self.items.append(obj)
+
+    def put_nowait(self, obj) -> None:
+        self.items.append(obj)
+
+    def drain(self) -> list:
+        items = list(self.items)
+        self.items.clear()
+        return items
 
 
 def create_flag() -> Flag:
@@ -68,6 +772,11 @@ class ISource(abc.ABC):
     * on_pull(source_id, stream_id, attrs, q, transform, state, rate_limit, strict_time, use_relative_ts, **kwargs)
     * on_detach(source_id, stream_id, attrs, q, transform, state, **kwargs)
 
+    Optional Function(s):
+    * on_checkpoint(state)
+    * on_restore(state, saved)
+    * on_deadline(q, state, rate_limit, strict_time)
+
     Implemented Function(s):
     * attach(source_id, stream_id, attrs, q, transform, flag, **kwargs)
 
@@ -86,13 +795,29 @@ class ISource(abc.ABC):
         rate_limit: bool = True,
         strict_time: bool = True,
         use_relative_ts: bool = True,
+        chunk_size: int = 1,
+        max_latency: float | None = None,
+        checkpoint: dict | None = None,
         **kwargs,
     ):
         proc = multiprocess.Process(
             None,
             self._attach_coro,
             f"{source_id}_{stream_id}",
-            (source_id, stream_id, attrs, q, transform, flag, rate_limit, strict_time, use_relative_ts),
+            (
+                source_id,
+                stream_id,
+                attrs,
+                q,
+                transform,
+                flag,
+                rate_limit,
+                strict_time,
+                use_relative_ts,
+                chunk_size,
+                max_latency,
+                checkpoint,
+            ),
             kwargs,
             daemon=True,
         )
@@ -113,21 +838,34 @@ class ISource(abc.ABC):
         rate_limit: bool = True,
         strict_time: bool = True,
         use_relative_ts: bool = True,
+        chunk_size: int = 1,
+        max_latency: float | None = None,
+        checkpoint: dict | None = None,
         **kwargs,
     ):
         signal.signal(signal.SIGINT, lambda *args: self.__signal__(flag, *args))
         dm.init_logging()
-        state = self.on_attach(source_id, stream_id, attrs, q, transform, **kwargs)
-        self.logger.debug("attached to stream")
+        attachment = Attachment(
+            self,
+            source_id,
+            stream_id,
+            attrs,
+            q,
+            transform,
+            flag,
+            rate_limit,
+            strict_time,
+            use_relative_ts,
+            chunk_size,
+            max_latency,
+            checkpoint,
+            **kwargs,
+        )
+        if not attachment.open():
+            return
         while not flag.is_set():
-            retval = self.on_pull(
-                source_id, stream_id, attrs, q, transform, state, rate_limit, strict_time, use_relative_ts, **kwargs
-            )
-            if retval is not None:
-                self.logger.debug(f"[{self.__class__.__name__}] stream exited with code: {retval}")
-                flag.set()
-        self.on_detach(source_id, stream_id, attrs, q, transform, state, **kwargs)
-        self.logger.debug("detached from stream")
+            attachment.pull()
+        attachment.close()
 
     @abc.abstractmethod
     def on_attach(
@@ -154,6 +892,153 @@ class ISource(abc.ABC):
         self, source_id: str, stream_id: str, attrs: dict, q: Queue, transform: Callable, state: dict, **kwargs
     ) -> None: ...
 
+    def on_checkpoint(self, state: dict) -> dict | None:
+        """
+        Take the part of the stream state to resume from (e.g., a replay offset). None if the stream cannot resume.
+
+        """
+        return None
+
+    def on_restore(self, state: dict, saved: dict) -> None:
+        """
+        Resume the stream from a state taken by on_checkpoint().
+
+        """
+        pass
+
+    def on_deadline(self, q: Queue, state: dict, rate_limit: bool, strict_time: bool = True) -> float | None:
+        """
+        Find when the next on_pull() has data to send (as a time.perf_counter() value), so that it need not wait.
+        None if it is due now, or if on_pull() paces itself (e.g., by blocking on a device).
+
+        """
+        return None
+
+
+class Attachment:
+    """
+    A stream attached onto a queue, which is pulled one step at a time (see ISource).
+
+    Functions:
+    * open()
+    * pull()
+    * deadline()
+    * close()
+
+    A bulk attachment sends the stream unpaced, in large chunks (or in chunks of the given size).
+
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(
+        self,
+        source: ISource,
+        source_id: str,
+        stream_id: str,
+        attrs: dict,
+        q: Queue,
+        transform: Callable,
+        flag: Flag,
+        rate_limit: bool = True,
+        strict_time: bool = True,
+        use_relative_ts: bool = True,
+        chunk_size: int = 1,
+        max_latency: float | None = None,
+        checkpoint: dict | None = None,
+        bulk: bool = False,
+        **kwargs,
+    ) -> None:
+        if bulk:
+            rate_limit, max_latency = False, None
+            chunk_size = chunk_size if chunk_size > 1 else BULK_CHUNK_SIZE
+        self.source = source
+        self.source_id = source_id
+        self.stream_id = stream_id
+        self.attrs = attrs
+        self.flag = flag
+        self.rate_limit = rate_limit
+        self.strict_time = strict_time
+        self.use_relative_ts = use_relative_ts
+        # checkpoint = dict(key, interval, id, state), i.e., where and how often to checkpoint, and what to resume from
+        self.checkpoint = checkpoint
+        self.kwargs = kwargs
+        if chunk_size > 1 and getattr(transform, "vectorized", False):
+            # transform whole chunks instead of each record
+            q, transform = ChunkedQueue(q, chunk_size, max_latency, transform), dm.identity
+        elif chunk_size > 1:
+            q = ChunkedQueue(q, chunk_size, max_latency)
+        self.q = q
+        self.transform = transform
+        self.state: dict = {}
+        self.next_id = checkpoint["id"] + 1 if checkpoint is not None else 0
+        self.last = 0.0
+
+    def open(self) -> bool:
+        """
+        Attach to the stream, and restore it from the checkpoint (if any).
+        If it cannot be attached to, END_OF_STREAM is sent (so that consumers do not wait for it), and the flag is set.
+
+        Returns:
+            bool: whether the stream was attached to
+        """
+        try:
+            self.state = self.source.on_attach(
+                self.source_id, self.stream_id, self.attrs, self.q, self.transform, **self.kwargs
+            )
+        except Exception:
+            name = self.source.__class__.__name__
+            self.logger.exception(f"[{name}] cannot attach to stream: {self.source_id}/{self.stream_id}")
+            self.q.put(self.transform(END_OF_STREAM))
+            self.flag.set()
+            return False
+        self.logger.debug("attached to stream")
+        if self.checkpoint is not None and self.checkpoint.get("state") is not None:
+            self.source.on_restore(self.state, self.checkpoint["state"])
+            self.logger.debug(f"restored stream from checkpoint {self.checkpoint['id']}")
+        self.last = time.perf_counter()
+        return True
+
+    def pull(self) -> int | None:
+        """
+        Pull the stream once, and send a checkpoint if one is due. Sets the flag once the stream has ended.
+
+        Returns:
+            int | None: exit code, if the stream has ended
+        """
+        retval = self.source.on_pull(
+            self.source_id,
+            self.stream_id,
+            self.attrs,
+            self.q,
+            self.transform,
+            self.state,
+            self.rate_limit,
+            self.strict_time,
+            self.use_relative_ts,
+            **self.kwargs,
+        )
+        if retval is not None:
+            self.logger.debug(f"[{self.source.__class__.__name__}] stream exited with code: {retval}")
+            self.flag.set()
+            return retval
+        checkpoint = self.checkpoint
+        if checkpoint is not None and time.perf_counter() - self.last >= checkpoint["interval"]:
+            # send the stream state downstream, in order with the data
+            saved = self.source.on_checkpoint(self.state) or {}
+            self.q.put(Signal.checkpoint(self.next_id, {checkpoint["key"]: saved}))
+            self.next_id += 1
+            self.last = time.perf_counter()
+
+    def deadline(self) -> float | None:
+        return self.source.on_deadline(self.q, self.state, self.rate_limit, self.strict_time)
+
+    def close(self) -> None:
+        self.source.on_detach(
+            self.source_id, self.stream_id, self.attrs, self.q, self.transform, self.state, **self.kwargs
+        )
+        self.logger.debug("detached from stream")
+
 
 class IServe(abc.ABC):
     """
@@ -231,16 +1116,37 @@ class ITask(abc.ABC):
     logger = logging.getLogger(__name__)
     proc: multiprocess.Process | threading.Thread
 
+    # whether the task needs a dedicated process (i.e., it should not share a worker of an Executor)
+    pinned: bool = False
+
+    # attributes that make up the state of the task (see snapshot), and where to save it on checkpoints
+    checkpoint_attrs: tuple[str, ...] = ()
+    checkpoints: Checkpoints | None = None
+    checkpoint_key: str | None = None
+
+    # profiler to sample the stack of the task with, once started (see Pipeline.run)
+    profiler: Profiler | None = None
+
     def __init__(self, mode: Literal["process", "thread"] = "process") -> None:
         super().__init__()
         self.name = self.__class__.__name__
         self.flag = False
         self.mode = mode
+        self.metrics = TaskMetrics()
+        # control lane, and the number of signals sent / seen on it
+        self.control = Queue(timeout=IDLE_TIMEOUT)
+        self.sent = multiprocess.Value("q", 0)
+        self.seen = 0
+        self.paused = False
 
     def with_name(self, name: str):
         self.name = name
         return self
 
+    def with_pin(self):
+        self.pinned = True
+        return self
+
     def __signal__(self, *args) -> None:
         self.flag = True
         signal.default_int_handler(*args)
@@ -249,14 +1155,18 @@ class ITask(abc.ABC):
         if self.mode == "process":
             signal.signal(signal.SIGINT, self.__signal__)
         dm.init_logging()
+        self.metrics.set(K_STARTED_AT, time.time_ns())
+        sampler = self.profiler.attach(self.name) if self.profiler is not None else None
         while not self.flag:
             try:
-                retval = self(*args, **kwargs)
+                retval = self._tick(*args, **kwargs)
                 if retval is not None:
                     self.logger.debug(f"[{self.name}] task exited with code: {retval}")
                     self.flag = True
             except BaseException as e:
                 self.logger.warn(f"[{self.name}] has crashed: {e}")
+        if sampler is not None:
+            sampler.stop()
 
     def start(self, *args, **kwargs):
         if self.mode == "process":
@@ -284,6 +1194,138 @@ class ITask(abc.ABC):
         self.proc.join()
         self.logger.debug(f"Stopped {self.name}")
 
+    def signal(self, sig: Signal) -> None:
+        """
+        Send a signal to this task on its control lane, i.e., ahead of any queued data.
+
+        Args:
+            sig (Signal): the signal to send
+        """
+        self.control.put(sig)
+        # signals may be sent from several processes at once, so count them under the lock
+        with self.sent.get_lock():
+            self.sent.value += 1
+
+    def on_signal(self, sig: Signal) -> int | None:
+        """
+        Handle an eos, flush, or watermark signal. Override to react to signals
+        (e.g., to emit buffered results), and call super().on_signal(sig) to pass it on.
+
+        Args:
+            sig (Signal): the signal to handle
+
+        Returns:
+            int | None: exit code, if the task should exit
+        """
+        return 0 if sig.kind == "eos" else None
+
+    @property
+    def inputs(self) -> list[Queue] | None:
+        """
+        Queues that this task reads from, or None if the task can step without input (e.g., a source).
+
+        """
+        source = getattr(self, "source", None)
+        return [source] if isinstance(source, Queue) else None
+
+    def _tick(self, *args, **kwargs) -> int | None:
+        # run one step of the task, or handle a pending signal
+        if self.paused or self._has_signals():
+            return self._poll_control()
+        return self(*args, **kwargs)
+
+    def _has_signals(self) -> bool:
+        # reading the count needs no lock (a stale count only defers the signal to the next tick)
+        return self.sent.get_obj().value != self.seen
+
+    def _poll_control(self) -> int | None:
+        # handle the next signal on the control lane. while paused, this blocks instead of stepping
+        sig = self.control.get()
+        if sig is None:
+            return
+        self.seen += 1
+        return self._on_signal(sig)
+
+    def _on_signal(self, sig: Signal) -> int | None:
+        if sig.kind == "pause":
+            self.paused = True
+        elif sig.kind == "resume":
+            self.paused = False
+        elif sig.kind == "checkpoint":
+            return self.on_signal(self._checkpoint(sig))
+        else:
+            return self.on_signal(sig)
+
+    def parts(self) -> list[ITask]:
+        """
+        Tasks whose state makes up the state of this task (i.e., the tasks to checkpoint).
+
+        """
+        return [self]
+
+    def snapshot(self) -> dict:
+        """
+        Take the state of this task, to save on a checkpoint. By default, the checkpoint_attrs of the task.
+
+        Returns:
+            dict: the state of the task
+        """
+        return {k: getattr(self, k) for k in self.checkpoint_attrs}
+
+    def restore(self, state: dict) -> None:
+        """
+        Restore the state of this task from a checkpoint (before it is started).
+
+        Args:
+            state (dict): the state, as taken by snapshot()
+        """
+        for k, v in state.items():
+            setattr(self, k, v)
+
+    def _checkpoint(self, sig: Signal) -> Signal:
+        # save the state of this task (and of the upstream streams) under the checkpoint id, and pass on the id
+        store = self.checkpoints
+        if store is None:
+            return sig
+        id, sources = sig.value["id"], sig.value["sources"]  # type: ignore
+        for key, state in sources.items():
+            store.save(id, key, state)
+        if self.checkpoint_key is not None:
+            store.save(id, self.checkpoint_key, self.snapshot())
+        return Signal.checkpoint(id)
+
+    def stats(self) -> dict:
+        """
+        Take a snapshot of the task metrics (and of its output queue, if any).
+
+        Returns:
+            dict: steps, records, sampled step() durations, start/EOS times, and input/output queue stats
+        """
+        stats = self.metrics.snapshot()
+        started_at, eos_at = stats["started_at_ns"], stats["eos_at_ns"]
+        stats["eos_time"] = (eos_at - started_at) / 1e9 if started_at > 0 and eos_at > 0 else None
+        source = getattr(self, "source", None)
+        if isinstance(source, Queue) and source.q is not None:
+            stats["source"] = source.stats()
+        target = getattr(self, "target", None)
+        if isinstance(target, Queue):
+            stats["target"] = target.stats()
+        return stats
+
+    def _dispatch(self, item) -> int | None:
+        # pass item to step() or step_batch(), and record how long it took (sampled)
+        m = self.metrics
+        fn = self.step_batch if type(item) is Chunk else self.step  # type: ignore
+        if m.sample(T_STEP):
+            t0 = time.perf_counter_ns()
+            retval = fn(item)
+            m.observe(T_STEP, time.perf_counter_ns() - t0)
+        else:
+            retval = fn(item)
+        m.incr(K_STEPS)
+        m.incr(K_RECORDS, len(item) if type(item) is Chunk else 1)
+        return retval
+
     @abc.abstractmethod
     def __call__(self, *args, **kwargs) -> int | None: ...
 
@@ -294,22 +1336,42 @@ class ITaskWithOutput(ITask):
     def __init__(self, mode: Literal["process", "thread"] = "process") -> None:
         super().__init__(mode)
 
+    def with_shm(self, stream: dfds.Stream, capacity: int = 1024):
+        # NOTE call before wiring this task into a pipeline
+        self.target = Queue.from_stream(stream, capacity, timeout=self.target.timeout)
+        return self
+
+    def with_zero_copy(self):
+        # NOTE call before wiring this task into a pipeline
+        t = self.target
+        self.target = Queue(timeout=t.timeout, capacity=t.capacity, policy=t.policy, zero_copy=True)
+        return self
+
+    def on_signal(self, sig: Signal) -> int | None:
+        if sig.kind == "eos":
+            self.target.put(END_OF_STREAM)
+            return 0
+        self.target.put(sig)
+
 
 class SourceTask(ITaskWithOutput):
 
     def __init__(self, mode: Literal["process", "thread"] = "process", transform=None) -> None:
         super().__init__(mode)
-        self.target = Queue(timeout=0.001)
+        self.target = Queue(timeout=IDLE_TIMEOUT)
         self.transform = transform
 
 
 class PipeTask(ITaskWithOutput):
     source: Queue
 
+    # whether step() keeps no state between messages (i.e., the task can be fused with its neighbours)
+    stateless: bool = False
+
     def __init__(self, mode: Literal["process", "thread"] = "process", transform=None) -> None:
         super().__init__(mode)
-        self.source = Queue(timeout=0.001, empty=True)
-        self.target = Queue(timeout=0.001)
+        self.source = Queue(timeout=IDLE_TIMEOUT, empty=True)
+        self.target = Queue(timeout=IDLE_TIMEOUT)
         self.transform = transform
 
     @abc.abstractmethod
@@ -318,17 +1380,30 @@ class PipeTask(ITaskWithOutput):
     @abc.abstractmethod
     def close(self) -> None: ...
 
-    def __call__(self, *args, **kwargs) -> int | None:
-        item = self.source.get()
-        if item == END_OF_STREAM:
+    def step_batch(self, chunk: Chunk) -> int | None:
+        # override to process a whole chunk at once. by default, each record is stepped individually
+        for record in chunk.records():
+            retval = self.step(record)
+            if retval is not None:
+                return retval
+
+    def on_signal(self, sig: Signal) -> int | None:
+        if sig.kind == "eos":
             self.logger.debug("got EOF token")
+            self.metrics.set(K_EOS_AT, time.time_ns())
             self.close()
-            self.target.put(item)
+            self.target.put(END_OF_STREAM)
             self.logger.debug("passed EOF token")
             return 0
+        self.target.put(sig)
+
+    def __call__(self, *args, **kwargs) -> int | None:
+        item = self.source.get()
         if item is None:
             return
-        return self.step(item)
+        if is_control(item):
+            return self._on_signal(item if type(item) is Signal else Signal.eos())
+        return self._dispatch(item)
 
 
 class SinkTask(ITask):
@@ -337,7 +1412,7 @@ class SinkTask(ITask):
 
     def __init__(self, mode: Literal["process", "thread"] = "process") -> None:
         super().__init__(mode)
-        self.source = Queue(timeout=0.001, empty=True)
+        self.source = Queue(timeout=IDLE_TIMEOUT, empty=True)
         self.completed = create_flag()
 
     @abc.abstractmethod
@@ -346,16 +1421,28 @@ class SinkTask(ITask):
     def close(self) -> None:
         self.completed.set()
 
-    def __call__(self, *args, **kwargs) -> int | None:
-        item = self.source.get()
-        if item == END_OF_STREAM:
+    def step_batch(self, chunk: Chunk) -> int | None:
+        # override to process a whole chunk at once. by default, each record is stepped individually
+        for record in chunk.records():
+            retval = self.step(record)
+            if retval is not None:
+                return retval
+
+    def on_signal(self, sig: Signal) -> int | None:
+        if sig.kind == "eos":
             self.logger.debug("got EOF token")
+            self.metrics.set(K_EOS_AT, time.time_ns())
             self.close()
             self.logger.debug("passed EOF token")
             return 0
+
+    def __call__(self, *args, **kwargs) -> int | None:
+        item = self.source.get()
         if item is None:
             return
-        return self.step(item)
+        if is_control(item):
+            return self._on_signal(item if type(item) is Signal else Signal.eos())
+        return self._dispatch(item)
 
 
 class IAPI(abc.ABC):
@@ -392,6 +1479,13 @@ class IAPI(abc.ABC):
         rate_limit: bool = True,
         strict_time: bool = True,
         use_relative_ts: bool = True,
+        chunk_size: int = 1,
+        max_latency: float | None = None,
+        checkpoint: dict | None = None,
+        bulk: bool = False,
+        speed: float = 1.0,
+        start_time: float | None = None,
+        end_time: float | None = None,
     ) -> StreamAck:
         """
         Replay a collection-stream into a given queue.
@@ -403,6 +1497,13 @@ class IAPI(abc.ABC):
             sink (asyncio.Queue): destination to buffer replayed data.
             transform (Callable): optional function to apply on each measurement.
             rate_limit (bool): optional switch to turn rate limiting on/off.
+            chunk_size (int): optional number of measurements to batch into each Chunk (1 = no batching).
+            max_latency (float | None): optional upper bound (in seconds) on how long a measurement waits in a batch.
+            checkpoint (dict | None): optional checkpoint spec, i.e., dict(key, interval, id, state) (see Checkpoints).
+            bulk (bool): optional switch to send the recording as fast as possible, in large Chunks (for offline use).
+            speed (float): optional replay speed, relative to real-time (e.g., 10 for 10x).
+            start_time (float | None): optional time (in seconds from the first measurement) to start the replay at.
+            end_time (float | None): optional time (in seconds from the first measurement) to end the replay at.
 
         Returns:
             StreamAck: status and reference information.
@@ -454,6 +1555,9 @@ class IAPI(abc.ABC):
         rate_limit: bool = True,
         strict_time: bool = True,
         use_relative_ts: bool = True,
+        chunk_size: int = 1,
+        max_latency: float | None = None,
+        checkpoint: dict | None = None,
     ) -> StreamAck:
         """
         Proxy data from a live stream onto a given queue.
@@ -465,6 +1569,9 @@ class IAPI(abc.ABC):
             sink (asyncio.Queue): destination to buffer replayed data.
             transform (Callable): optional function to apply on each measurement.
             rate_limit (bool): optional switch to turn rate limiting on/off.
+            chunk_size (int): optional number of measurements to batch into each Chunk (1 = no batching).
+            max_latency (float | None): optional upper bound (in seconds) on how long a measurement waits in a batch.
+            checkpoint (dict | None): optional checkpoint spec, i.e., dict(key, interval, id, state) (see Checkpoints).
 
         Returns:
             StreamAck: status and reference information.
@@ -489,6 +1596,12 @@ class APIStreamer(SourceTask):
 
     task_id: str | None = None
 
+    # the stream runs within the API
+    pinned = True
+
+    # stream state to resume from (see restore)
+    resumed: dict | None = None
+
     def __init__(
         self,
         api: IAPI,
@@ -500,6 +1613,12 @@ class APIStreamer(SourceTask):
         rate_limit: bool,
         strict_time: bool = True,
         use_relative_ts: bool = True,
+        chunk_size: int = 1,
+        max_latency: float | None = None,
+        bulk: bool = False,
+        speed: float = 1.0,
+        start_time: float | None = None,
+        end_time: float | None = None,
     ) -> None:
         super().__init__()
         self.api = api
@@ -507,11 +1626,17 @@ class APIStreamer(SourceTask):
         self.node_id = node_id
         self.stream_id = stream_id
         self.attrs = attrs
-        self.target = Queue(timeout=0.001)
+        self.target = Queue(timeout=IDLE_TIMEOUT)
         self.transform = transform
         self.rate_limit = rate_limit
         self.strict_time = strict_time
         self.use_relative_ts = use_relative_ts
+        self.chunk_size = chunk_size
+        self.max_latency = max_latency
+        self.bulk = bulk
+        self.speed = speed
+        self.start_time = start_time
+        self.end_time = end_time
 
     def start(self, *args, **kwargs):
         if self.mode == "proxy":
@@ -524,6 +1649,9 @@ class APIStreamer(SourceTask):
                 self.rate_limit,
                 self.strict_time,
                 self.use_relative_ts,
+                self.chunk_size,
+                self.max_latency,
+                self._checkpoint_spec(),
             )
             assert ack.randseq is not None
             self.task_id = ack.randseq
@@ -537,16 +1665,48 @@ class APIStreamer(SourceTask):
                 self.rate_limit,
                 self.strict_time,
                 self.use_relative_ts,
+                self.chunk_size,
+                self.max_latency,
+                self._checkpoint_spec(),
+                bulk=self.bulk,
+                speed=self.speed,
+                start_time=self.start_time,
+                end_time=self.end_time,
             )
             assert ack.randseq is not None
             self.task_id = ack.randseq
         else:
             raise ValueError()
 
+    def restore(self, state: dict) -> None:
+        # the stream is resumed within the API (see ISource.on_restore)
+        self.resumed = state
+
+    def _checkpoint_spec(self) -> dict | None:
+        # the stream checkpoints itself, and passes its state downstream (see ISource._attach_coro)
+        if self.checkpoints is None or self.checkpoint_key is None:
+            return None
+        return dict(
+            key=self.checkpoint_key,
+            interval=self.checkpoints.interval,
+            id=self.checkpoints.restored,
+            state=self.resumed,
+        )
+
     def stop(self):
         assert self.task_id is not None
         ack = self.api.stop_task(self.task_id)
         assert ack.status == True
 
+    def signal(self, sig: Signal) -> None:
+        # the stream runs within the API, so signals are applied here instead of on a control lane
+        if sig.kind == "eos":
+            self.stop()
+            self.target.put(END_OF_STREAM)
+        elif sig.kind in ("flush", "watermark"):
+            self.target.put(sig)
+        else:
+            self.logger.warning(f"[{self.name}] cannot {sig.kind} a {self.mode} stream")
+
     def __call__(self, *args, **kwargs) -> None:
         raise ValueError("should never happen")
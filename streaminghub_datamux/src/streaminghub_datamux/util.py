@@ -24,7 +24,7 @@ def init_logging():
     import logging
     import os
 
-    if "jupyter" in os.environ['_']:
+    if "jupyter" in os.environ.get("_", ""):
         # inside jupyter notebook
         logging.basicConfig(level=logging.INFO, format="%(message)s", datefmt="[%X]")
     else:
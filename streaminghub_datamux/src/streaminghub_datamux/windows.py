@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import abc
+import collections
+from typing import Literal
+
+import numpy as np
+
+import streaminghub_datamux as dm
+from streaminghub_datamux.align import time_of
+
+Agg = Literal["count", "sum", "mean", "var", "std", "min", "max"]
+
+
+class RingBuffer:
+    """
+    Numpy ring buffer of rows (one column per field), which grows when full.
+
+    """
+
+    def __init__(self, width: int, capacity: int = 64) -> None:
+        self.data = np.empty((capacity, width), dtype=np.float64)
+        self.times = np.empty(capacity, dtype=np.float64)
+        self.head = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(self, t: float, row: np.ndarray) -> None:
+        capacity = len(self.data)
+        if self.size == capacity:
+            # unroll into a buffer of twice the size
+            order = (self.head + np.arange(self.size)) % capacity
+            data = np.empty((capacity * 2, self.data.shape[1]), dtype=np.float64)
+            times = np.empty(capacity * 2, dtype=np.float64)
+            data[: self.size], times[: self.size] = self.data[order], self.times[order]
+            self.data, self.times, self.head = data, times, 0
+            capacity *= 2
+        i = (self.head + self.size) % capacity
+        self.data[i] = row
+        self.times[i] = t
+        self.size += 1
+
+    def first(self) -> tuple[float, np.ndarray]:
+        return self.times[self.head], self.data[self.head]
+
+    def popleft(self) -> tuple[float, np.ndarray]:
+        assert self.size > 0
+        t, row = self.times[self.head], self.data[self.head].copy()
+        self.head = (self.head + 1) % len(self.data)
+        self.size -= 1
+        return t, row
+
+    def clear(self) -> None:
+        self.head = 0
+        self.size = 0
+
+
+class Aggregates:
+    """
+    Incremental aggregates over a window of rows (one column per field).
+
+    Rows are added at the end and removed from the start, each in O(1) (amortized).
+    Mean and variance are kept with Welford's algorithm, and min/max with monotonic deques.
+
+    """
+
+    def __init__(self, width: int, aggs: tuple[Agg, ...]) -> None:
+        self.width = width
+        self.aggs = aggs
+        self.track_min = "min" in aggs
+        self.track_max = "max" in aggs
+        self.reset()
+
+    def reset(self) -> None:
+        self.count = 0
+        self.sum = np.zeros(self.width)
+        self.mean = np.zeros(self.width)
+        self.m2 = np.zeros(self.width)
+        # sequence numbers of the rows added / removed so far
+        self.added = 0
+        self.removed = 0
+        self.mins = [collections.deque() for _ in range(self.width)]
+        self.maxs = [collections.deque() for _ in range(self.width)]
+
+    def add(self, row: np.ndarray) -> None:
+        self.count += 1
+        self.sum += row
+        delta = row - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (row - self.mean)
+        seq = self.added
+        self.added += 1
+        if self.track_min:
+            for dq, x in zip(self.mins, row.tolist()):
+                while len(dq) > 0 and dq[-1][1] >= x:
+                    dq.pop()
+                dq.append((seq, x))
+        if self.track_max:
+            for dq, x in zip(self.maxs, row.tolist()):
+                while len(dq) > 0 and dq[-1][1] <= x:
+                    dq.pop()
+                dq.append((seq, x))
+
+    def remove(self, row: np.ndarray) -> None:
+        # remove the oldest row (i.e., the one added first)
+        assert self.count > 0
+        seq = self.removed
+        self.removed += 1
+        self.count -= 1
+        if self.count == 0:
+            self.reset()
+            return
+        self.sum -= row
+        delta = row - self.mean
+        self.mean -= delta / self.count
+        self.m2 -= delta * (row - self.mean)
+        for dq in (*self.mins, *self.maxs):
+            if len(dq) > 0 and dq[0][0] == seq:
+                dq.popleft()
+
+    def result(self, fields: list[str]) -> dict:
+        value: dict = {"count": self.count}
+        var = np.maximum(self.m2 / self.count, 0) if self.count > 0 else np.full(self.width, np.nan)
+        for i, field in enumerate(fields):
+            for agg in self.aggs:
+                if agg == "count":
+                    continue
+                elif agg == "sum":
+                    v = self.sum[i]
+                elif agg == "mean":
+                    v = self.mean[i] if self.count > 0 else np.nan
+                elif agg == "var":
+                    v = var[i]
+                elif agg == "std":
+                    v = np.sqrt(var[i])
+                elif agg == "min":
+                    v = self.mins[i][0][1] if len(self.mins[i]) > 0 else np.nan
+                elif agg == "max":
+                    v = self.maxs[i][0][1] if len(self.maxs[i]) > 0 else np.nan
+                else:
+                    raise ValueError(agg)
+                value[f"{field}_{agg}"] = float(v)
+        return value
+
+
+class Window(dm.PipeTask):
+    """
+    Base class of window operators, which emit aggregates of the given fields per window, i.e.,
+    dict(index=dict(t=<end>, t_start=<start>), value=dict(count=..., <field>_<agg>=...)).
+
+    """
+
+    def __init__(
+        self,
+        fields: list[str],
+        aggs: tuple[Agg, ...] = ("mean",),
+        time_key: str = "t",
+        transform=None,
+    ) -> None:
+        super().__init__(transform=transform)
+        self.fields = fields
+        self.aggs = aggs
+        self.time_key = time_key
+        self.agg = Aggregates(len(fields), aggs)
+
+    def row(self, msg: dict) -> np.ndarray:
+        value = msg.get("value", msg)
+        return np.array([value[f] for f in self.fields], dtype=np.float64)
+
+    def step(self, msg: dict) -> int | None:
+        self.push(time_of(msg, self.time_key), self.row(msg))
+
+    def step_batch(self, chunk: dm.Chunk) -> int | None:
+        # read rows straight from the columns, instead of building records
+        cols = chunk.columns
+        value = cols.get("value", cols)
+        index = cols.get("index", cols)
+        times = np.asarray(index[self.time_key], dtype=np.float64)  # type: ignore
+        rows = np.stack([np.asarray(value[f], dtype=np.float64) for f in self.fields], axis=1)  # type: ignore
+        for t, row in zip(times.tolist(), rows):
+            self.push(t, row)
+
+    @abc.abstractmethod
+    def push(self, t: float, row: np.ndarray) -> None: ...
+
+    def emit(self, t_start: float, t_end: float) -> None:
+        msg = dict(index=dict(t=t_end, t_start=t_start), value=self.agg.result(self.fields))
+        if self.transform is not None:
+            msg = self.transform(msg)
+        self.target.put(msg)
+
+
+class TumblingWindow(Window):
+    """
+    Aggregate non-overlapping windows of `size` rows (by="count") or seconds (by="time").
+
+    """
+
+    checkpoint_attrs = ("agg", "t_start", "t_last")
+
+    def __init__(
+        self,
+        size: float,
+        fields: list[str],
+        aggs: tuple[Agg, ...] = ("mean",),
+        by: Literal["count", "time"] = "count",
+        time_key: str = "t",
+        transform=None,
+    ) -> None:
+        super().__init__(fields, aggs, time_key, transform)
+        self.size = size
+        self.by = by
+        self.t_start: float | None = None
+        self.t_last: float | None = None
+
+    def push(self, t: float, row: np.ndarray) -> None:
+        if self.by == "time":
+            if self.t_start is None:
+                self.t_start = t - (t % self.size)
+            self.advance(t)
+        elif self.t_start is None:
+            self.t_start = t
+        self.agg.add(row)
+        self.t_last = t
+        if self.by == "count" and self.agg.count >= self.size:
+            self.emit(self.t_start, t)
+            self.agg.reset()
+            self.t_start = None
+
+    def advance(self, t: float) -> None:
+        # close the windows that end at or before t (skipping empty ones)
+        assert self.t_start is not None
+        while t >= self.t_start + self.size:
+            if self.agg.count > 0:
+                self.emit(self.t_start, self.t_start + self.size)
+                self.agg.reset()
+            self.t_start += self.size
+
+    def on_signal(self, sig: dm.Signal) -> int | None:
+        # a watermark past the end of the current window closes it, without waiting for the next row
+        if sig.kind == "watermark" and self.by == "time" and self.t_start is not None:
+            self.advance(sig.value)  # type: ignore
+        return super().on_signal(sig)
+
+    def close(self) -> None:
+        # emit the partial window
+        if self.agg.count > 0 and self.t_start is not None and self.t_last is not None:
+            self.emit(self.t_start, self.t_last)
+            self.agg.reset()
+
+
+class SlidingWindow(Window):
+    """
+    Aggregate the last `size` rows (by="count") or seconds (by="time"), once every `step` rows.
+
+    """
+
+    checkpoint_attrs = ("agg", "buffer", "seen")
+
+    def __init__(
+        self,
+        size: float,
+        fields: list[str],
+        aggs: tuple[Agg, ...] = ("mean",),
+        step: int = 1,
+        by: Literal["count", "time"] = "count",
+        time_key: str = "t",
+        transform=None,
+    ) -> None:
+        super().__init__(fields, aggs, time_key, transform)
+        self.size = size
+        self.every = step
+        self.by = by
+        self.buffer = RingBuffer(len(fields))
+        self.seen = 0
+
+    def push(self, t: float, row: np.ndarray) -> None:
+        self.buffer.append(t, row)
+        self.agg.add(row)
+        # evict rows that fell out of the window
+        if self.by == "count":
+            while len(self.buffer) > self.size:
+                self.agg.remove(self.buffer.popleft()[1])
+        else:
+            while len(self.buffer) > 0 and self.buffer.first()[0] <= t - self.size:
+                self.agg.remove(self.buffer.popleft()[1])
+        self.seen += 1
+        full = self.by == "time" or len(self.buffer) >= self.size
+        if full and self.seen % self.every == 0:
+            self.emit(self.buffer.first()[0], t)
+
+    def close(self) -> None:
+        pass
+
+
+class SessionWindow(Window):
+    """
+    Aggregate sessions of rows, where a session ends once no row arrives within `gap` seconds.
+
+    """
+
+    checkpoint_attrs = ("agg", "t_start", "t_last")
+
+    def __init__(
+        self,
+        gap: float,
+        fields: list[str],
+        aggs: tuple[Agg, ...] = ("mean",),
+        time_key: str = "t",
+        transform=None,
+    ) -> None:
+        super().__init__(fields, aggs, time_key, transform)
+        self.gap = gap
+        self.t_start: float | None = None
+        self.t_last: float | None = None
+
+    def push(self, t: float, row: np.ndarray) -> None:
+        if self.t_last is not None and t - self.t_last > self.gap:
+            self.emit(self.t_start, self.t_last)  # type: ignore
+            self.agg.reset()
+            self.t_start = None
+        if self.t_start is None:
+            self.t_start = t
+        self.agg.add(row)
+        self.t_last = t
+
+    def on_signal(self, sig: dm.Signal) -> int | None:
+        # a watermark past the gap closes the current session, without waiting for the next row
+        if sig.kind == "watermark" and self.t_last is not None and sig.value - self.t_last > self.gap:  # type: ignore
+            self.emit(self.t_start, self.t_last)  # type: ignore
+            self.agg.reset()
+            self.t_start = self.t_last = None
+        return super().on_signal(sig)
+
+    def close(self) -> None:
+        if self.t_last is not None and self.agg.count > 0:
+            self.emit(self.t_start, self.t_last)  # type: ignore
+            self.agg.reset()
@@ -0,0 +1,131 @@
+import json
+import time
+
+import h5py
+import numpy as np
+import pandas as pd
+import pytest
+
+import streaminghub_datamux as dm
+import streaminghub_pydfds as dfds
+from streaminghub_datamux.managers import collection_manager
+
+# number of records in each recording, at FREQUENCY Hz
+N = 2000
+FREQUENCY = 100
+FORMATS = ["csv", "h5", "parquet"]
+# recordings in time order, shuffled, and in order except for a stretch well after the first block
+SUBJECTS = ["ordered", "shuffled", "late"]
+
+
+def recording(subject: str) -> pd.DataFrame:
+    t = np.arange(N) / FREQUENCY
+    data = pd.DataFrame(dict(t=t, x=np.sin(t), y=np.arange(N, dtype=np.float64)))
+    if subject == "shuffled":
+        data = data.sample(frac=1, random_state=0).reset_index(drop=True)
+    elif subject == "late":
+        stretch = data.iloc[1500:1600].sample(frac=1, random_state=0)
+        data = pd.concat([data.iloc[:1500], stretch, data.iloc[1600:]]).reset_index(drop=True)
+    return data
+
+
+def write_collection(meta_dir, data_dir, fmt: str) -> None:
+    field = lambda name: {"name": name, "description": name, "dtype": "f64"}
+    collection = {
+        "name": fmt,
+        "description": f"synthetic {fmt} recordings",
+        "keywords": [],
+        "authors": [],
+        "streams": {
+            "gaze": {
+                "name": "gaze",
+                "description": "gaze",
+                "unit": "px",
+                "frequency": FREQUENCY,
+                "fields": {"x": field("x"), "y": field("y")},
+                "index": {"t": field("t")},
+            }
+        },
+        "groups": {"subject": {"description": "subject", "values": SUBJECTS}},
+        "pattern": f"{fmt}://{{subject}}",
+    }
+    (meta_dir / f"{fmt}.collection.json").write_text(json.dumps(collection))
+    path = data_dir / fmt
+    path.mkdir()
+    for subject in SUBJECTS:
+        data = recording(subject)
+        if fmt == "csv":
+            data.to_csv(path / f"{subject}.csv", index=False)
+        elif fmt == "parquet":
+            data.to_parquet(path / f"{subject}.parquet", row_group_size=300)
+        else:
+            with h5py.File(path / "data.h5", "a") as file:
+                file.create_dataset(subject, data=data.to_records(index=False))
+
+
+@pytest.fixture
+def config(tmp_path) -> dfds.Config:
+    meta_dir, data_dir = tmp_path / "meta", tmp_path / "data"
+    meta_dir.mkdir()
+    data_dir.mkdir()
+    for fmt in FORMATS:
+        write_collection(meta_dir, data_dir, fmt)
+    return dfds.Config(meta_dir=meta_dir, data_dir=data_dir)
+
+
+@pytest.fixture
+def small_blocks(monkeypatch) -> None:
+    # read recordings in many blocks (replays are forked, so they see this too)
+    monkeypatch.setattr(collection_manager, "READ_BLOCK", 256)
+
+
+@pytest.fixture
+def api(config, monkeypatch) -> dm.API:
+    monkeypatch.setattr(dfds, "load_config", lambda: config)
+    return dm.API()
+
+
+def replay(api: dm.API, stream: dfds.Stream, **kwargs) -> tuple[np.ndarray, np.ndarray]:
+    # replay a stream to completion, and get the (relative) times and y values of its records
+    q = dm.Queue(timeout=30)
+    api.replay_collection_stream(stream.node.id, stream.attrs["id"], stream.attrs, q, **kwargs)  # type: ignore
+    records = []
+    while True:
+        item = q.get()
+        assert item is not None, "replay did not end"
+        if dm.is_eos(item):
+            break
+        records.extend(item.records() if isinstance(item, dm.Chunk) else [item])
+    t = np.array([r["index"]["t"] for r in records])
+    y = np.array([r["value"]["y"] for r in records])
+    return t, y
+
+
+def stream_of(api: dm.API, fmt: str, subject: str = "ordered") -> dfds.Stream:
+    return next(s for s in api.list_collection_streams(fmt) if s.attrs["subject"] == subject)
+
+
+class Counter(dm.SourceTask):
+    # emits n records (t = offset + i * step, x = t), then END_OF_STREAM
+    checkpoint_attrs = ("i",)
+
+    def __init__(self, n: int, step: float = 1, offset: float = 0, delay: float = 0.0) -> None:
+        super().__init__()
+        self.n = n
+        self.step = step
+        self.offset = offset
+        self.delay = delay
+        self.i = 0
+
+    def record(self, i: int) -> dict:
+        t = self.offset + i * self.step
+        return dict(index=dict(t=t), value=dict(x=t))
+
+    def __call__(self, *args, **kwargs):
+        if self.i >= self.n:
+            self.target.put(dm.END_OF_STREAM)
+            return 0
+        if self.delay > 0:
+            time.sleep(self.delay)
+        self.target.put(self.record(self.i))
+        self.i += 1
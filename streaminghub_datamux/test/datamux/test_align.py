@@ -0,0 +1,105 @@
+import json
+
+import pytest
+from conftest import Counter
+
+import streaminghub_datamux as dm
+from streaminghub_datamux.align import Aligner
+
+
+def record(t: float, x: float) -> dict:
+    return dict(index=dict(t=t), value=dict(x=x))
+
+
+def values(rows: list) -> list:
+    return [[None if r is None else (r["index"]["t"], r["value"]["x"]) for r in row] for row in rows]
+
+
+def test_asof():
+    aligner = Aligner(2, "asof")
+    for t in [0.0, 1.0, 2.0]:
+        aligner.push(0, record(t, t))
+    for t in [0.1, 0.9, 2.4]:
+        aligner.push(1, record(t, 10 * t))
+    # the driver record at 2.0 waits until the other input has passed it
+    assert values(aligner.pop()) == [[(0.0, 0.0), (0.1, 1.0)], [(1.0, 1.0), (0.9, 9.0)], [(2.0, 2.0), (2.4, 24.0)]]
+
+
+def test_asof_tolerance():
+    aligner = Aligner(2, "asof", tolerance=0.2)
+    aligner.push(0, record(0.0, 0))
+    aligner.push(0, record(1.0, 1))
+    aligner.push(1, record(0.5, 5))
+    aligner.push(1, record(1.1, 11))
+    assert values(aligner.pop()) == [[(0.0, 0), None], [(1.0, 1), (1.1, 11)]]
+
+
+def test_waits_for_progress():
+    aligner = Aligner(2, "asof")
+    aligner.push(0, record(1.0, 1))
+    aligner.push(1, record(0.5, 5))
+    assert aligner.pop() == []
+    aligner.advance(1, 1.0)
+    assert values(aligner.pop()) == [[(1.0, 1), (0.5, 5)]]
+
+
+def test_ended_inputs_do_not_hold_back():
+    aligner = Aligner(2, "asof")
+    aligner.push(0, record(1.0, 1))
+    aligner.push(1, dm.END_OF_STREAM)
+    assert values(aligner.pop()) == [[(1.0, 1), None]]
+
+
+def test_interp():
+    aligner = Aligner(2, "interp")
+    for t in [0.0, 0.5, 1.0, 1.5]:
+        aligner.push(0, record(t, t))
+    aligner.push(1, record(0.25, 0))
+    aligner.push(1, record(1.25, 10))
+    # no backwards extrapolation, and the last driver record waits for the other input
+    rows = values(aligner.pop())
+    assert rows[0] == [(0.0, 0.0), None]
+    assert rows[1] == [(0.5, 0.5), (0.5, pytest.approx(2.5))]
+    assert rows[2] == [(1.0, 1.0), (1.0, pytest.approx(7.5))]
+    assert len(rows) == 3
+
+
+def test_resample():
+    aligner = Aligner(2, "resample", rate=2.0)
+    aligner.push(0, dm.Chunk.from_records([record(t, t) for t in [0.0, 1.0, 2.0]]))
+    aligner.push(1, dm.Chunk.from_records([record(t, -t) for t in [0.2, 1.2, 2.2]]))
+    aligner.push(0, dm.END_OF_STREAM)
+    aligner.push(1, dm.END_OF_STREAM)
+    # from the first time all inputs have data, until the first input ends
+    rows = values(aligner.pop())
+    assert [row[0][0] for row in rows] == pytest.approx([0.2, 0.7, 1.2, 1.7])
+    assert [row[0][1] for row in rows] == pytest.approx([0.2, 0.7, 1.2, 1.7])
+    assert [row[1][1] for row in rows] == pytest.approx([-0.2, -0.7, -1.2, -1.7])
+
+
+class Collect(dm.SinkTask):
+
+    def __init__(self, path) -> None:
+        super().__init__()
+        self.path = path
+        self.rows = []
+
+    def step(self, msg):
+        self.rows.append(msg)
+
+    def close(self) -> None:
+        self.path.write_text(json.dumps(self.rows))
+        super().close()
+
+
+def test_merged_source(tmp_path):
+    out = tmp_path / "out.json"
+    merged = dm.MergedSource(Counter(100, 0.01), Counter(40, 0.025, 0.005), agg="list", join="interp")
+    dm.Pipeline(merged, Collect(out)).run(30)
+    rows = json.loads(out.read_text())
+    # one row per driver record, with the other input interpolated onto its time (and held after it ends)
+    assert len(rows) == 100
+    assert rows[0][1] is None
+    for a, b in rows[1:]:
+        assert b["index"]["t"] == a["index"]["t"]
+        assert b["value"]["x"] == pytest.approx(min(a["index"]["t"], 0.98))
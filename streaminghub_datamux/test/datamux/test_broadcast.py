@@ -0,0 +1,55 @@
+import os
+
+import numpy as np
+
+import streaminghub_datamux as dm
+from streaminghub_datamux import transforms
+
+
+class Sink(dm.SinkTask):
+
+    def step(self, msg):
+        pass
+
+
+def broadcast(n: int) -> transforms.Broadcast:
+    b = transforms.Broadcast(*[Sink() for _ in range(n)])
+    b.source.assign(dm.Queue())
+    return b
+
+
+def test_large_items_are_shared():
+    b = broadcast(3)
+    data = np.arange(1 << 16, dtype=np.float64)
+    b.source.put(dict(index=dict(t=0), value=dict(x=data)))
+    b()
+    # one shared-memory file, linked once per task
+    frames = os.listdir(b.frames)
+    assert len(frames) == 3
+    assert len({os.stat(os.path.join(b.frames, f)).st_ino for f in frames}) == 1
+    for task in b.tasks:
+        item = task.source.get()  # type: ignore
+        assert np.array_equal(item["value"]["x"], data)  # type: ignore
+    assert os.listdir(b.frames) == []
+
+
+def test_small_items_are_passed_inline():
+    b = broadcast(2)
+    b.source.put(dict(index=dict(t=0), value=dict(x=1)))
+    b()
+    assert os.listdir(b.frames) == []
+    for task in b.tasks:
+        assert task.source.get() == dict(index=dict(t=0), value=dict(x=1))  # type: ignore
+
+
+def test_signals_are_passed_to_all_tasks():
+    b = broadcast(2)
+    b.source.put(dm.Signal.watermark(1.0))
+    b.source.put(dm.END_OF_STREAM)
+    b()
+    assert b() == 0
+    assert b.completed.is_set()
+    for task in b.tasks:
+        sig = task.source.get()  # type: ignore
+        assert type(sig) is dm.Signal and sig.kind == "watermark" and sig.value == 1.0
+        assert dm.is_eos(task.source.get())  # type: ignore
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from conftest import FORMATS, N, SUBJECTS, replay, stream_of
+
+import streaminghub_datamux as dm
+import streaminghub_pydfds as dfds
+
+pytestmark = pytest.mark.usefixtures("small_blocks")
+
+# bytes of a cached recording (times, x, y)
+NBYTES = 3 * 8 * N
+
+
+def create_api(config, monkeypatch, cache: dm.RecordingCache) -> dm.API:
+    monkeypatch.setattr(dfds, "load_config", lambda: config)
+    return dm.API(cache=cache)
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+@pytest.mark.parametrize("subject", SUBJECTS)
+def test_hit_and_miss(tmp_path, config, monkeypatch, fmt, subject):
+    cache = dm.RecordingCache(path=tmp_path / "cache")
+    api = create_api(config, monkeypatch, cache)
+    stream = stream_of(api, fmt, subject)
+
+    # the first replay decodes the recording into the cache, and the second one replays it from there
+    for hits in [0, 1]:
+        t, y = replay(api, stream, bulk=True)
+        assert np.all(np.diff(t) > 0)
+        assert np.array_equal(y, np.arange(N))
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["inserts"]) == (hits, 1, 1)
+    assert stats["nbytes"] == NBYTES
+
+
+def test_window_of_cached_recording(tmp_path, config, monkeypatch):
+    cache = dm.RecordingCache(path=tmp_path / "cache")
+    api = create_api(config, monkeypatch, cache)
+    stream = stream_of(api, "h5", "shuffled")
+    replay(api, stream, bulk=True)
+    _, y = replay(api, stream, bulk=True, start_time=5.0, end_time=10.0)
+    assert cache.stats()["hits"] == 1
+    assert np.array_equal(y, np.arange(500, 1001))
+
+
+def test_eviction(tmp_path, config, monkeypatch):
+    # room for one recording at a time
+    cache = dm.RecordingCache(capacity=NBYTES, path=tmp_path / "cache")
+    api = create_api(config, monkeypatch, cache)
+    for fmt in FORMATS:
+        replay(api, stream_of(api, fmt), bulk=True)
+    stats = cache.stats()
+    assert (stats["inserts"], stats["evictions"], stats["recordings"]) == (3, 2, 1)
+    assert stats["evicted_bytes"] == 2 * NBYTES
+
+    # the evicted recordings are decoded again
+    replay(api, stream_of(api, FORMATS[0]), bulk=True)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (0, 4)
+
+
+def test_too_large_to_cache(tmp_path, config, monkeypatch):
+    cache = dm.RecordingCache(capacity=NBYTES - 1, path=tmp_path / "cache")
+    api = create_api(config, monkeypatch, cache)
+    t, _ = replay(api, stream_of(api, "parquet"), bulk=True)
+    assert len(t) == N
+    stats = cache.stats()
+    assert (stats["inserts"], stats["recordings"]) == (0, 0)
+    assert not any(cache.path.glob(".staging-*"))
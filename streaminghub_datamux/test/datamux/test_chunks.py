@@ -0,0 +1,49 @@
+import time
+
+import numpy as np
+
+import streaminghub_datamux as dm
+
+
+def record(i: int) -> dict:
+    return dict(index=dict(t=float(i)), value=dict(x=i))
+
+
+def test_full_chunks():
+    q = dm.Queue(timeout=1)
+    chunked = dm.ChunkedQueue(q, 4)
+    for i in range(10):
+        chunked.put(record(i))
+    chunked.put(dm.END_OF_STREAM)
+    sizes = []
+    while not dm.is_eos(item := q.get()):
+        sizes.append(len(item))  # type: ignore
+    assert sizes == [4, 4, 2]
+
+
+def test_partial_chunk_of_idle_stream():
+    q = dm.Queue(timeout=1)
+    chunked = dm.ChunkedQueue(q, 100, max_latency=0.05)
+    for i in range(3):
+        chunked.put(record(i))
+    # no more records are put, yet the partial chunk is sent once due
+    t0 = time.perf_counter()
+    chunk = q.get()
+    assert isinstance(chunk, dm.Chunk)
+    assert np.array_equal(chunk.columns["value"]["x"], [0, 1, 2])  # type: ignore
+    assert time.perf_counter() - t0 < 0.5
+
+    # and again, for records put after the stream resumes
+    chunked.put(record(3))
+    chunk = q.get()
+    assert isinstance(chunk, dm.Chunk) and len(chunk) == 1
+    chunked.put(dm.END_OF_STREAM)
+    assert dm.is_eos(q.get())
+
+
+def test_no_timer_without_latency():
+    q = dm.Queue(timeout=0.2)
+    chunked = dm.ChunkedQueue(q, 100)
+    chunked.put(record(0))
+    assert q.get() is None
+    assert chunked.cond is None
@@ -0,0 +1,55 @@
+import json
+
+from conftest import Counter
+
+import streaminghub_datamux as dm
+
+
+def increment(msg: dict) -> dict:
+    return dict(index=msg["index"], value=dict(x=msg["value"]["x"] + 1))
+
+
+class Sum(dm.SinkTask):
+
+    def __init__(self, path) -> None:
+        super().__init__()
+        self.path = path
+        self.n = 0
+        self.total = 0
+
+    def step(self, msg):
+        self.n += 1
+        self.total += msg["value"]["x"]
+
+    def close(self) -> None:
+        self.path.write_text(json.dumps(dict(n=self.n, total=self.total)))
+        super().close()
+
+
+def test_submit():
+    source, sink = Counter(1), Sum(None).with_pin()
+    stages = [dm.Transform(increment) for _ in range(3)]
+    executor = dm.Executor(workers=2).submit(dm.Pipeline(source, *stages, sink))
+    # composite tasks are unpacked, and pinned tasks are kept apart
+    assert executor.pooled == [source, *stages]
+    assert executor.pinned == [sink]
+
+
+def test_pipeline_on_executor(tmp_path):
+    out = tmp_path / "out.json"
+    executor = dm.Executor(workers=2)
+    pipeline = dm.Pipeline(Counter(300), *[dm.Transform(increment) for _ in range(6)], Sum(out), executor=executor)
+    pipeline.run(30)
+    assert json.loads(out.read_text()) == dict(n=300, total=sum(range(300)) + 6 * 300)
+
+
+def test_pinned_task_on_executor(tmp_path):
+    out = tmp_path / "out.json"
+    sink = Sum(out).with_pin()
+    pipeline = dm.Pipeline(Counter(100), dm.Transform(increment), sink, executor=dm.Executor(workers=1))
+    pipeline.start()
+    # one worker for the pooled tasks, and a process of its own for the pinned one
+    assert len(pipeline.executor.procs) == 1  # type: ignore
+    assert sink.proc is not None and sink.proc not in pipeline.executor.procs  # type: ignore
+    pipeline.block_and_complete(30)
+    assert json.loads(out.read_text()) == dict(n=100, total=sum(range(100)) + 100)
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+import streaminghub_datamux as dm
+
+
+def chunk(n: int = 8) -> dm.Chunk:
+    t = np.arange(n, dtype=np.float64)
+    return dm.Chunk(dict(index=dict(t=t), value=dict(x=np.sin(t), y=t * 2)))
+
+
+@pytest.mark.parametrize(
+    "mapping",
+    [
+        dict(s="x + y", t="t * 1000"),
+        dict(r="(x ** 2 + y ** 2) ** 0.5"),
+        dict(c="1.5"),
+        # not vectorizable as-is, so evaluated row by row
+        dict(b="x > 0 and y > 4"),
+        dict(v="x if y > 4 else -x"),
+    ],
+)
+def test_chunk_matches_records(mapping):
+    em = dm.ExpressionMap(mapping)
+    data = chunk()
+    out = em(data)
+    assert isinstance(out, dm.Chunk) and len(out) == len(data)
+    for i, record in enumerate(data.records()):
+        expected = em(record)
+        for k, v in expected.items():
+            assert out.columns[k][i] == pytest.approx(v)
+
+
+def test_vectorized_once():
+    em = dm.ExpressionMap(dict(s="x + y", b="x > 0 and y > 4"))
+    em(chunk())
+    # only the expression that cannot be vectorized falls back, and stays that way
+    assert em.scalar == {"b"}
+
+
+def test_signals_pass_through():
+    em = dm.ExpressionMap(dict(s="x + y"))
+    assert dm.is_eos(em(dm.END_OF_STREAM))
+    sig = dm.Signal.watermark(1.0)
+    assert em(sig) is sig
@@ -0,0 +1,95 @@
+import json
+
+from conftest import Counter
+
+import streaminghub_datamux as dm
+from streaminghub_datamux import transforms
+
+
+def record(i: int) -> dict:
+    return dict(index=dict(t=i), value=dict(x=i))
+
+
+def double(msg: dict) -> dict:
+    return dict(index=msg["index"], value=dict(x=2 * msg["value"]["x"]))
+
+
+class Sum(dm.SinkTask):
+
+    def __init__(self, path) -> None:
+        super().__init__()
+        self.path = path
+        self.n = 0
+        self.total = 0
+
+    def step(self, msg):
+        self.n += 1
+        self.total += msg["value"]["x"]
+
+    def close(self) -> None:
+        self.path.write_text(json.dumps(dict(n=self.n, total=self.total)))
+        super().close()
+
+
+class Last(dm.PipeTask):
+    # a stateful stage, which holds back its last item until closed
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.last = None
+
+    def step(self, msg):
+        if self.last is not None:
+            self.target.put(self.last)
+        self.last = msg
+
+    def close(self) -> None:
+        if self.last is not None:
+            self.target.put(self.last)
+
+
+def test_only_adjacent_stateless_stages_are_fused():
+    a, b, c, d = dm.Transform(double), dm.Filter("t > 1"), Last(), dm.Transform(double)
+    tasks = dm.Pipeline._fuse((a, b, c, d))
+    assert len(tasks) == 3
+    assert isinstance(tasks[0], transforms.Fused) and tasks[0].stages == (a, b)
+    assert tasks[1] is c and tasks[2] is d
+
+
+def test_items_and_signals_stay_in_order():
+    fused = transforms.Fused(dm.Filter("t % 2 == 0"), dm.Transform(double))
+    fused.target = dm.LocalQueue()
+    for i in range(3):
+        fused.step(record(i))
+    fused._on_signal(dm.Signal.watermark(2.0))
+    fused.step_batch(dm.Chunk.from_records([record(i) for i in range(3, 6)]))
+    items = fused.target.drain()  # type: ignore
+    assert items[:2] == [double(record(0)), double(record(2))]
+    assert type(items[2]) is dm.Signal and items[2].kind == "watermark"
+    # a chunk is filtered as a batch, and then transformed record by record
+    assert items[3:] == [double(record(4))]
+
+
+def test_close_releases_held_items_downstream():
+    fused = transforms.Fused(Last(), dm.Transform(double))
+    fused.target = dm.LocalQueue()
+    fused.step(record(0))
+    fused.step(record(1))
+    assert fused.target.drain() == [double(record(0))]  # type: ignore
+    fused.close()
+    assert fused.target.drain() == [double(record(1))]  # type: ignore
+
+
+def test_fused_pipeline(tmp_path):
+    out = tmp_path / "out.json"
+    pipeline = dm.Pipeline(
+        Counter(200),
+        dm.Filter("t % 2 == 0"),
+        dm.Transform(double),
+        dm.Transform(double),
+        Sum(out),
+        fuse=True,
+    )
+    assert len(pipeline.tasks) == 3
+    pipeline.run(30)
+    assert json.loads(out.read_text()) == dict(n=100, total=4 * sum(range(0, 200, 2)))
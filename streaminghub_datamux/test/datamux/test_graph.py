@@ -0,0 +1,151 @@
+import json
+import time
+
+from conftest import Counter, N, stream_of
+
+import streaminghub_datamux as dm
+
+
+class Chunker(Counter):
+    # batches its output after the graph is wired, like a replay does on its own process
+    chunked = False
+
+    def __call__(self, *args, **kwargs):
+        if not self.chunked:
+            self.target = dm.ChunkedQueue(self.target, 16)
+            self.chunked = True
+        return super().__call__(*args, **kwargs)
+
+
+class Ticker(Counter):
+    # sends a watermark after every few records
+
+    def __init__(self, n: int, every: int) -> None:
+        super().__init__(n)
+        self.every = every
+
+    def __call__(self, *args, **kwargs):
+        retval = super().__call__(*args, **kwargs)
+        if retval is None and self.i % self.every == 0:
+            self.target.put(dm.Signal.watermark(float(self.i - 1)))
+        return retval
+
+
+class Count(dm.SinkTask):
+
+    def __init__(self, path) -> None:
+        super().__init__()
+        self.path = path
+        self.n = 0
+        self.watermarks = []
+
+    def step(self, msg):
+        self.n += 1
+
+    def on_signal(self, sig: dm.Signal):
+        if sig.kind == "watermark":
+            self.watermarks.append(sig.value)
+        return super().on_signal(sig)
+
+    def step_batch(self, chunk: dm.Chunk):
+        self.n += len(chunk)
+
+    def close(self) -> None:
+        self.path.write_text(json.dumps(self.n if len(self.watermarks) == 0 else dict(n=self.n, watermarks=self.watermarks)))
+        super().close()
+
+
+def _run_fan_out(tmp_path, source: dm.SourceTask, n: int) -> None:
+    a, b = tmp_path / "a.json", tmp_path / "b.json"
+    graph = dm.Graph(
+        nodes=dict(src=source, a=Count(a), b=Count(b)),
+        edges=[("src", "a"), ("src", "b")],
+    )
+    graph.run(30)
+    assert graph.completed.is_set()
+    assert json.loads(a.read_text()) == n
+    assert json.loads(b.read_text()) == n
+
+
+def test_fan_out(tmp_path):
+    _run_fan_out(tmp_path, Counter(100), 100)
+
+
+def test_fan_out_of_chunked_source(tmp_path):
+    _run_fan_out(tmp_path, Chunker(100), 100)
+
+
+def test_fan_out_of_bulk_replay(tmp_path, api):
+    _run_fan_out(tmp_path, api.attach(stream_of(api, "csv"), bulk=True), N)
+
+
+def test_fan_in(tmp_path):
+    out = tmp_path / "out.json"
+    graph = dm.Graph(
+        nodes=dict(a=Counter(50), b=Counter(70), sink=Count(out)),
+        edges=[("a", "sink"), ("b", "sink")],
+    )
+    graph.run(30)
+    assert json.loads(out.read_text()) == 120
+
+
+def fan_in(n: int) -> tuple[dm.Queue, list[dm.Queue]]:
+    q = dm.Queue(timeout=1).with_producers(n)
+    return q, [q.as_input(i) for i in range(n)]
+
+
+def drain(q: dm.Queue) -> list:
+    # get items until END_OF_STREAM (get() gives None for signals that are held back, too)
+    items, deadline = [], time.perf_counter() + 10
+    while time.perf_counter() < deadline:
+        item = q.get()
+        if item is not None:
+            items.append(item)
+            if dm.is_eos(item):
+                break
+    return items
+
+
+def test_fan_in_merges_watermarks():
+    q, (a, b) = fan_in(2)
+    a.put(dm.Signal.watermark(5.0))
+    b.put(dm.Signal.watermark(3.0))
+    b.put(dm.Signal.watermark(4.0))
+    a.put(dm.Signal.watermark(6.0))
+    b.put(dm.END_OF_STREAM)
+    a.put(dm.END_OF_STREAM)
+    # the earliest of both inputs, until an input ends
+    out = drain(q)
+    assert [x.value for x in out[:-1]] == [3.0, 4.0, 6.0]
+    assert dm.is_eos(out[-1])
+
+
+def test_fan_in_holds_checkpoints_until_all_inputs_pass_them():
+    q, (a, b, c) = fan_in(3)
+    a.put(dm.Signal.checkpoint(1, {"a": 1}))
+    a.put(dict(x=1))
+    b.put(dm.Signal.checkpoint(1, {"b": 2}))
+    c.put(dm.END_OF_STREAM)
+    a.put(dm.Signal.checkpoint(2, {"a": 3}))
+    a.put(dm.END_OF_STREAM)
+    b.put(dm.END_OF_STREAM)
+    out = drain(q)
+    # passed on once, with the states of all inputs (ended inputs do not hold it back)
+    checkpoints = [x.value for x in out if type(x) is dm.Signal]
+    assert checkpoints == [dict(id=1, sources={"a": 1, "b": 2}), dict(id=2, sources={"a": 3})]
+    assert dict(x=1) in out
+
+
+def test_fan_in_of_watermarks(tmp_path):
+    out = tmp_path / "out.json"
+    graph = dm.Graph(
+        nodes=dict(a=Ticker(100, 10), b=Ticker(100, 25), sink=Count(out)),
+        edges=[("a", "sink"), ("b", "sink")],
+    )
+    graph.run(30)
+    result = json.loads(out.read_text())
+    assert result["n"] == 200
+    watermarks = result["watermarks"]
+    # only moving forward, although the inputs interleave
+    assert len(watermarks) > 0
+    assert watermarks == sorted(set(watermarks))
@@ -0,0 +1,57 @@
+import pytest
+from conftest import Counter
+
+import streaminghub_datamux as dm
+from streaminghub_datamux.metrics import NUM_BUCKETS, TaskMetrics, hist_quantile
+
+
+class Sink(dm.SinkTask):
+
+    def step(self, msg):
+        pass
+
+
+def test_timer_histogram():
+    m = TaskMetrics()
+    for ns in [500, 1_500, 3_000, 3_000]:
+        m.observe(0, ns)
+    step = m.snapshot()["step"]
+    assert step["samples"] == 4
+    assert step["mean"] == pytest.approx(2e-6)
+    assert len(step["hist"]) == NUM_BUCKETS
+    assert step["hist"][:3] == [1, 1, 2]
+    assert hist_quantile(step["hist"], 0.5) == pytest.approx(2e-6)
+    assert hist_quantile(step["hist"], 1.0) == pytest.approx(4e-6)
+    assert hist_quantile([0] * NUM_BUCKETS, 0.5) is None
+
+
+def test_sampling():
+    m = TaskMetrics()
+    assert sum(m.sample(0) for _ in range(160)) == 160 // m.every
+    m.profile()
+    assert all(m.sample(0) for _ in range(10))
+
+
+def test_queue_stats():
+    q = dm.Queue(timeout=1, capacity=4, policy="drop_newest", high_watermark=0.5)
+    for i in range(6):
+        q.put(i)
+    for _ in range(4):
+        assert q.get() is not None
+    q.put(6)
+    stats = q.stats()
+    # puts are counted whether or not the message was dropped
+    assert (stats["put"], stats["got"], stats["dropped"]) == (7, 4, 2)
+    assert stats["hwm_events"] == 1
+    assert (stats["depth"], stats["capacity"], stats["policy"]) == (1, 4, "drop_newest")
+
+
+def test_pipeline_stats():
+    pipeline = dm.Pipeline(Counter(100), Sink())
+    pipeline.run(30)
+    stats = pipeline.stats()["tasks"]
+    source, sink = stats.values()
+    assert source["target"]["put"] == 101
+    assert sink["steps"] == sink["records"] == 100
+    assert sink["source"]["got"] == 101
+    assert sink["eos_time"] is not None and sink["eos_time"] > 0
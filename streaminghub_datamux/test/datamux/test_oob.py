@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+import streaminghub_datamux as dm
+from streaminghub_datamux import oob
+
+
+def frames_in(path) -> list[str]:
+    return os.listdir(path) if os.path.isdir(path) else []
+
+
+def test_round_trip():
+    q = dm.Queue(zero_copy=True)
+    data = np.arange(1 << 16, dtype=np.float64)
+    q.put(dict(value=data))
+    assert len(frames_in(q.q.dir)) == 1
+    assert np.array_equal(q.get()["value"], data)  # type: ignore
+    assert frames_in(q.q.dir) == []
+
+
+def test_pending_frames_are_released_on_close():
+    q = oob.ZeroCopyQueue()
+    for _ in range(3):
+        q.put(np.zeros(1 << 16))
+    assert len(frames_in(q.dir)) == 3
+    q.close()
+    assert not os.path.exists(q.dir)
+
+
+def test_pending_frames_are_released_on_exit():
+    # frames are left unread, as when readers are terminated
+    code = """
+import os
+
+import numpy as np
+import streaminghub_datamux as dm
+from streaminghub_datamux import transforms
+
+class Sink(dm.SinkTask):
+    def step(self, msg):
+        pass
+
+
+q = dm.Queue(zero_copy=True)
+q.put(np.zeros(1 << 16))
+b = transforms.Broadcast(Sink(), Sink())
+b.source.assign(dm.Queue())
+b.source.put(np.zeros(1 << 16))
+b()
+print(q.q.dir)
+print(b.frames, len(os.listdir(b.frames)))
+"""
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    queue_dir, broadcast_dir, n = out.split()
+    assert n == "2"
+    assert not os.path.exists(queue_dir)
+    assert not os.path.exists(broadcast_dir)
+
+
+def test_forked_readers_keep_frames():
+    # a forked process drops its copy of the queue without removing the frames of its parent
+    q = oob.ZeroCopyQueue()
+    q.put(np.ones(1 << 16))
+    pid = os.fork()
+    if pid == 0:
+        del q
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert np.array_equal(q.get(), np.ones(1 << 16))
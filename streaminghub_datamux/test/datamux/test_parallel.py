@@ -0,0 +1,169 @@
+import json
+import os
+import subprocess
+import sys
+
+from conftest import Counter
+
+import streaminghub_datamux as dm
+
+
+class Keyed(Counter):
+
+    def record(self, i: int) -> dict:
+        return dict(index=dict(t=i), value=dict(x=i, key=i % 3))
+
+
+class Double(dm.PipeTask):
+
+    def step(self, msg):
+        self.target.put(dict(index=msg["index"], value=dict(x=2 * msg["value"]["x"], key=msg["value"]["key"])))
+
+    def close(self) -> None:
+        pass
+
+
+class Tag(dm.PipeTask):
+    # tag each item with the copy (i.e., process) that handled it
+
+    def step(self, msg):
+        self.target.put(dict(index=msg["index"], value=dict(**msg["value"], pid=os.getpid())))
+
+    def close(self) -> None:
+        pass
+
+
+class Collect(dm.SinkTask):
+
+    def __init__(self, path) -> None:
+        super().__init__()
+        self.path = path
+        self.items = []
+
+    def step(self, msg):
+        self.items.append(dict(t=msg["index"]["t"], **msg["value"]))
+
+    def step_batch(self, chunk: dm.Chunk):
+        for record in chunk.records():
+            self.step(record)
+
+    def close(self) -> None:
+        self.path.write_text(json.dumps(self.items))
+        super().close()
+
+
+class Chunker(Counter):
+    # emits its records in chunks
+
+    def __call__(self, *args, **kwargs):
+        if self.i >= self.n:
+            self.target.put(dm.END_OF_STREAM)
+            return 0
+        records = [dict(index=dict(t=i), value=dict(x=i, key=i % 3)) for i in range(self.i, min(self.n, self.i + 25))]
+        self.target.put(dm.Chunk.from_records(records))
+        self.i += len(records)
+
+
+class Sum(dm.SinkTask):
+    checkpoint_attrs = ("n", "total")
+
+    def __init__(self, path) -> None:
+        super().__init__()
+        self.path = path
+        self.n = 0
+        self.total = 0
+
+    def step(self, msg):
+        self.n += 1
+        self.total += msg["value"]["x"]
+
+    def close(self) -> None:
+        self.path.write_text(json.dumps(dict(n=self.n, total=self.total)))
+        super().close()
+
+
+def test_parallel(tmp_path):
+    out = tmp_path / "out.json"
+    pipeline = dm.Pipeline(Keyed(500), dm.Pipeline.parallel(Double(), 3, key="key", ordered=True), Sum(out))
+    pipeline.run(30)
+    assert json.loads(out.read_text()) == dict(n=500, total=2 * sum(range(500)))
+
+
+def test_parallel_with_checkpoints(tmp_path):
+    out = tmp_path / "out.json"
+
+    def create():
+        checkpoints = dm.Checkpoints(tmp_path / "checkpoints", interval=0.1)
+        stage = dm.Pipeline.parallel(Double(), 2, key="key")
+        return checkpoints, dm.Pipeline(Keyed(300, delay=0.005), stage, Sum(out), checkpoints=checkpoints)
+
+    # stop midway, once a checkpoint is complete
+    checkpoints, pipeline = create()
+    assert len(checkpoints.keys) == 4
+    pipeline.run(1.0)
+    assert not out.exists()
+    assert checkpoints.latest() is not None
+
+    # resume from it, and run to completion
+    checkpoints, pipeline = create()
+    pipeline.run(30)
+    assert checkpoints.restored > 0
+    assert json.loads(out.read_text()) == dict(n=300, total=2 * sum(range(300)))
+
+
+def _run_partitioned(tmp_path, source: dm.SourceTask, ordered: bool) -> list[dict]:
+    out = tmp_path / "out.json"
+    pipeline = dm.Pipeline(source, dm.Pipeline.parallel(Tag(), 3, key="key", ordered=ordered), Collect(out))
+    pipeline.run(30)
+    items = json.loads(out.read_text())
+    assert sorted(item["t"] for item in items) == list(range(300))
+    # each key is handled by a single copy
+    pids = {}
+    for item in items:
+        assert pids.setdefault(item["key"], item["pid"]) == item["pid"]
+    return items
+
+
+def test_partitioned_by_key(tmp_path):
+    _run_partitioned(tmp_path, Keyed(300), ordered=False)
+
+
+def test_partitioned_in_order(tmp_path):
+    items = _run_partitioned(tmp_path, Keyed(300), ordered=True)
+    assert [item["t"] for item in items] == list(range(300))
+
+
+def test_partitioned_chunks_in_order(tmp_path):
+    # chunks are split by key, and the outputs of each chunk are emitted in the order of the chunks
+    items = _run_partitioned(tmp_path, Chunker(300), ordered=True)
+    chunks = [item["t"] // 25 for item in items]
+    assert chunks == sorted(chunks)
+
+
+def test_shards_are_stable_across_runs():
+    # str keys are hashed the same way regardless of PYTHONHASHSEED, so restored state stays on its copy
+    code = "from streaminghub_datamux import transforms; print([transforms._shard_of(f'p{i}', 4) for i in range(32)])"
+    runs = [
+        subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True, env={**os.environ, "PYTHONHASHSEED": seed}).stdout
+        for seed in ["1", "2"]
+    ]
+    assert runs[0] == runs[1]
+    assert len(set(eval(runs[0]))) == 4
+
+
+def test_chunks_and_records_are_sharded_alike():
+    stage = dm.Pipeline.parallel(Double(), 4, key="key")
+    records = [dict(index=dict(t=i), value=dict(x=i, key=f"p{i % 5}")) for i in range(20)]
+    stage.dispatch(dm.Chunk.from_records(records))
+    for record in records:
+        stage.dispatch(record)
+    for task in stage.tasks:
+        task.source.timeout = 0.2  # type: ignore
+        batched, single = set(), set()
+        while (item := task.source.get()) is not None:  # type: ignore
+            _, part = item
+            if isinstance(part, dm.Chunk):
+                batched.update(r["value"]["key"] for r in part.records())
+            else:
+                single.add(part["value"]["key"])
+        assert batched == single
@@ -0,0 +1,66 @@
+import json
+import time
+
+from conftest import Counter
+
+import streaminghub_datamux as dm
+from streaminghub_datamux.profiler import breakdown
+
+
+class Slow(dm.SinkTask):
+
+    def step(self, msg):
+        # longer than the switch interval, so that the sampler gets to run in between
+        busy(0.01)
+
+
+def busy(duration: float) -> None:
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < duration:
+        pass
+
+
+def test_sampler(tmp_path):
+    profiler = dm.Profiler(tmp_path, interval=0.001)
+    sampler = profiler.attach("main")
+    sampler.tag = "work"
+    busy(0.2)
+    sampler.stop()
+    stacks = dict(line.rsplit(" ", 1) for line in sampler.fp.read_text().splitlines())
+    # stacks are rooted at the name and tag, from the caller of attach() down
+    assert all(stack.startswith("main;work;test_sampler") for stack in stacks)
+    assert any("busy" in stack for stack in stacks)
+
+
+def test_breakdown():
+    timer = lambda samples, mean: dict(samples=samples, mean=mean, hist=[])
+    stats = dict(
+        pipeline=dict(
+            tasks=dict(
+                sink=dict(
+                    steps=10,
+                    step=timer(10, 0.1),
+                    source=dict(get_wait=timer(11, 0.5)),
+                    target=dict(put_wait=timer(0, None), serialize=timer(0, None)),
+                )
+            )
+        )
+    )
+    stages = breakdown(stats)
+    assert list(stages) == ["pipeline/sink"]
+    assert stages["pipeline/sink"]["steps"] == 10
+    assert abs(stages["pipeline/sink"]["step"] - 1.0) < 1e-9
+    assert abs(stages["pipeline/sink"]["get_wait"] - 5.5) < 1e-9
+    assert stages["pipeline/sink"]["put_wait"] == 0.0
+
+
+def test_profiled_pipeline(tmp_path):
+    pipeline = dm.Pipeline(Counter(30), Slow())
+    pipeline.run(30, profile=dm.Profiler(tmp_path, interval=0.001))
+    # every step is timed, and the stacks of each task are merged
+    stages = json.loads((tmp_path / "stages.json").read_text())
+    sink = next(v for k, v in stages.items() if k.endswith("Slow"))
+    assert sink["steps"] == 30
+    assert sink["step"] >= 0.3
+    stacks = (tmp_path / "profile.folded").read_text()
+    assert "busy" in stacks
@@ -0,0 +1,129 @@
+import time
+
+import multiprocess
+import pytest
+from conftest import stream_of
+
+import streaminghub_datamux as dm
+from streaminghub_datamux.shm import SharedRingBuffer
+
+
+def label(item):
+    # data messages by their value, and signals by their kind and value
+    if type(item) is dm.Signal:
+        return (item.kind, item.value)
+    if dm.is_eos(item):
+        return "eos"
+    return item["value"]
+
+
+def run(q: dm.Queue, items: list) -> list:
+    for item in items:
+        q.put(item)
+    out = []
+    while (item := q.get()) is not None:
+        out.append(label(item))
+        if dm.is_eos(item):
+            break
+    return out
+
+
+def data(i: int) -> dict:
+    return dict(index=dict(t=float(i)), value=i)
+
+
+@pytest.fixture(params=[False, True], ids=["pickle", "zero_copy"])
+def zero_copy(request) -> bool:
+    return request.param
+
+
+def test_block(zero_copy):
+    q = dm.Queue(timeout=1, capacity=8, policy="block", zero_copy=zero_copy)
+    items = [data(0), dm.Signal.watermark(0.5), data(1), dm.Signal.flush(), data(2), dm.END_OF_STREAM]
+    assert run(q, items) == [0, ("watermark", 0.5), 1, ("flush", None), 2, "eos"]
+
+
+def test_drop_newest(zero_copy):
+    q = dm.Queue(timeout=1, capacity=3, policy="drop_newest", zero_copy=zero_copy)
+    items = [data(0), dm.Signal.watermark(0.5), data(1), data(2), data(3)]
+    assert run(q, items) == [0, ("watermark", 0.5), 1]
+    assert q.dropped == 2
+
+
+def test_drop_oldest(zero_copy):
+    q = dm.Queue(timeout=1, capacity=3, policy="drop_oldest", zero_copy=zero_copy)
+    items = [dm.Signal.watermark(0.5), data(1), data(2), data(3)]
+    # signals are kept in their place (i.e., ahead of newer data), while the oldest data is evicted
+    assert run(q, items) == [("watermark", 0.5), 2, 3]
+    assert q.dropped == 1
+
+
+def test_drop_oldest_interleaved(zero_copy):
+    q = dm.Queue(timeout=1, capacity=3, policy="drop_oldest", zero_copy=zero_copy)
+    items = [data(0), dm.Signal.watermark(0.5), data(1), data(2), dm.Signal.watermark(1.5), data(3)]
+    assert run(q, items) == [("watermark", 0.5), ("watermark", 1.5), 3]
+    assert q.dropped == 3
+
+
+def test_drop_oldest_without_qsize(zero_copy, monkeypatch):
+    # qsize() is not implemented on some platforms (e.g., macOS)
+    q = dm.Queue(timeout=1, capacity=3, policy="drop_oldest", zero_copy=zero_copy)
+
+    def qsize(self):
+        raise NotImplementedError()
+
+    monkeypatch.setattr(type(q.q), "qsize", qsize)
+    items = [dm.Signal.watermark(0.5), data(1), data(2), data(3), dm.END_OF_STREAM]
+    assert run(q, items) == [("watermark", 0.5), 3, "eos"]
+    assert q.dropped == 2
+    assert q.depth is None and q.hwm_events == 0
+
+
+def test_latest(zero_copy):
+    q = dm.Queue(timeout=1, capacity=2, policy="latest", zero_copy=zero_copy)
+    items = [data(0), dm.Signal.watermark(0.5), data(1), data(2), dm.END_OF_STREAM]
+    assert run(q, items) == [("watermark", 0.5), "eos"]
+    assert q.dropped == 3
+
+
+def test_only_signals(zero_copy):
+    q = dm.Queue(timeout=1, capacity=2, policy="drop_oldest", zero_copy=zero_copy)
+    items = [dm.Signal.watermark(0.5), dm.Signal.watermark(1.5), data(0)]
+    assert run(q, items) == [("watermark", 0.5), ("watermark", 1.5)]
+    assert q.dropped == 1
+
+
+def record(i: int) -> dict:
+    return dict(index=dict(t=float(i)), value=dict(x=0.0, y=float(i)))
+
+
+def test_wait_on_ring(api):
+    q = dm.Queue.from_stream(stream_of(api, "csv"), capacity=4, timeout=1)
+    assert isinstance(q.q, SharedRingBuffer)
+    # readers wait on a file descriptor, instead of polling the ring
+    assert q.q._reader.fileno() >= 0
+    assert dm.Queue.wait([q], 0.05) == []
+
+    # woken up by a put from another process
+    def put():
+        time.sleep(0.1)
+        q.put(record(0))
+        q.put(dm.END_OF_STREAM)
+
+    proc = multiprocess.Process(target=put, daemon=True)
+    proc.start()
+    assert dm.Queue.wait([q], 10) == [q]
+    assert q.get() == record(0)
+    assert dm.is_eos(q.get())
+    proc.join()
+    assert dm.Queue.wait([q], 0.05) == []
+
+
+def test_ring_policies(api):
+    q = dm.Queue.from_stream(stream_of(api, "csv"), capacity=3, timeout=1, policy="drop_oldest")
+    for item in [dm.Signal.watermark(0.5), record(1), record(2), record(3)]:
+        q.put(item)
+    out = [q.get() for _ in range(3)]
+    assert label(out[0]) == ("watermark", 0.5)
+    assert out[1:] == [record(2), record(3)]
+    assert dm.Queue.wait([q], 0.05) == []
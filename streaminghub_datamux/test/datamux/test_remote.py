@@ -0,0 +1,77 @@
+import asyncio
+import base64
+import pickle
+
+import numpy as np
+import pytest
+from conftest import stream_of
+
+import streaminghub_datamux as dm
+from streaminghub_datamux.remote import api as remote_api
+from streaminghub_datamux.remote import server as remote_server
+from streaminghub_datamux.remote.topics import TOPIC_REPLAY_COLLECTION_STREAM
+
+
+@pytest.fixture
+def server(api, monkeypatch) -> remote_server.DataMuxServer:
+    # requests are handed to the server directly, instead of over a connection
+    monkeypatch.setattr(remote_server, "create_rpc_server", lambda **kwargs: None)
+    monkeypatch.setattr(remote_server, "API", lambda: api)
+    server = remote_server.DataMuxServer("websocket")
+    server.active.set()
+    return server
+
+
+def request(server: remote_server.DataMuxServer, topic: bytes, content: dict):
+    async def run():
+        task = asyncio.create_task(server.handle_requests())
+        await server.api_in.put((topic, content, b"uid"))
+        reply = await asyncio.wait_for(server.api_out.get(), 30)
+        server.active.clear()
+        task.cancel()
+        return reply
+
+    return asyncio.run(run())
+
+
+def test_replay_options_are_applied(server, api):
+    stream = stream_of(api, "parquet", "shuffled")
+    content = dict(
+        collection_id=stream.node.id,  # type: ignore
+        stream_id=stream.attrs["id"],
+        attrs=stream.attrs,
+        transform=base64.b64encode(pickle.dumps(dm.identity)),
+        rate_limit=True,
+        strict_time=True,
+        use_relative_ts=True,
+        bulk=True,
+        speed=1.0,
+        start_time=5.0,
+        end_time=10.0,
+    )
+    topic, ack, uid = request(server, TOPIC_REPLAY_COLLECTION_STREAM, content)
+    assert ack["status"]
+
+    # the window is replayed unpaced (i.e., in bulk), as one envelope per record
+    y = []
+    while True:
+        prefix, msg, suffix = server.data_q.get()
+        assert suffix == uid
+        if dm.is_eos(msg):
+            break
+        y.append(msg["value"]["y"])
+    assert np.array_equal(y, np.arange(500, 1001))
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [dict(chunk_size=16), dict(max_latency=0.1), dict(checkpoint=dict(key="src", interval=1.0, id=0, state=None))],
+)
+def test_local_only_options_are_rejected(api, monkeypatch, kwargs):
+    monkeypatch.setattr(remote_api, "create_rpc_client", lambda **kwargs: None)
+    remote = remote_api.RemoteAPI("websocket", "json")
+    stream = stream_of(api, "csv")
+    with pytest.raises(ValueError):
+        remote.replay_collection_stream(stream.node.id, stream.attrs["id"], stream.attrs, dm.Queue(), **kwargs)  # type: ignore
+    with pytest.raises(ValueError):
+        remote.proxy_live_stream("node", "stream", {}, dm.Queue(), **kwargs)
@@ -0,0 +1,83 @@
+import time
+
+import numpy as np
+import pytest
+from conftest import FORMATS, N, SUBJECTS, replay, stream_of
+
+import streaminghub_datamux as dm
+from streaminghub_pydfds import readers
+
+pytestmark = pytest.mark.usefixtures("small_blocks")
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+@pytest.mark.parametrize("subject", SUBJECTS)
+def test_replay_in_time_order(api, fmt, subject):
+    t, y = replay(api, stream_of(api, fmt, subject), bulk=True)
+    assert len(t) == N
+    assert np.all(np.diff(t) > 0)
+    assert np.array_equal(y, np.arange(N))
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+@pytest.mark.parametrize("subject", SUBJECTS)
+def test_replay_record_by_record(api, fmt, subject):
+    t, y = replay(api, stream_of(api, fmt, subject), rate_limit=False)
+    assert len(t) == N
+    assert np.array_equal(y, np.arange(N))
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+@pytest.mark.parametrize("subject", SUBJECTS)
+def test_replay_window(api, fmt, subject):
+    t, y = replay(api, stream_of(api, fmt, subject), bulk=True, start_time=5.0, end_time=10.0)
+    assert np.array_equal(y, np.arange(500, 1001))
+    assert t[0] == pytest.approx(5.0) and t[-1] == pytest.approx(10.0)
+
+
+@pytest.mark.parametrize("subject", SUBJECTS)
+def test_replay_speed(api, subject):
+    # one second of records, paced at 4x
+    t0 = time.perf_counter()
+    _, y = replay(api, stream_of(api, "h5", subject), speed=4.0, start_time=2.0, end_time=3.0)
+    elapsed = time.perf_counter() - t0
+    assert np.array_equal(y, np.arange(200, 301))
+    assert 0.2 <= elapsed < 0.75
+
+
+def test_bulk_attach(api):
+    # the reader handles bulk on its own (i.e., without the API)
+    stream = stream_of(api, "csv")
+    q = dm.Queue(timeout=30)
+    api.reader_c.attach(stream.node.id, stream.attrs["id"], stream.attrs, q, dm.identity, dm.create_flag(), bulk=True)  # type: ignore
+    chunk = q.get()
+    assert isinstance(chunk, dm.Chunk) and len(chunk) == N
+    assert dm.is_eos(q.get())
+
+
+@pytest.mark.parametrize("scheduler", [False, True])
+def test_failed_attach_ends_stream(api, scheduler):
+    if scheduler:
+        api.scheduler = dm.ReplayScheduler()
+    stream = stream_of(api, "csv")
+    q = dm.Queue(timeout=30)
+    api.replay_collection_stream(stream.node.id, stream.attrs["id"], stream.attrs, q, speed=0.0)  # type: ignore
+    if scheduler:
+        api.scheduler.start()
+    assert dm.is_eos(q.get())
+    if scheduler:
+        api.scheduler.stop()
+
+
+@pytest.mark.parametrize("fmt", ["h5", "parquet"])
+@pytest.mark.parametrize("subject", SUBJECTS)
+def test_attach_reads_blocks_only(api, monkeypatch, fmt, subject):
+    # recordings read in blocks are never read as a whole column, unless found out of order
+    def column(self, column):
+        raise AssertionError("read a whole column")
+
+    monkeypatch.setattr(readers.RowReader, "column", column)
+    monkeypatch.setattr(readers.HDF5Rows, "column", column)
+    monkeypatch.setattr(readers.ParquetRows, "column", column)
+    t, y = replay(api, stream_of(api, fmt, subject), start_time=5.0, end_time=10.0, rate_limit=False)
+    assert np.array_equal(y, np.arange(500, 1001))
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+import streaminghub_datamux as dm
+
+SOURCE_HZ = 100
+N = 1000
+
+
+def signal() -> tuple[np.ndarray, np.ndarray]:
+    # a slow sine (well below every target rate), and a fast one (above the target rates, i.e., to be filtered out)
+    t = np.arange(N) / SOURCE_HZ
+    return t, np.sin(2 * np.pi * 1.0 * t) + 0.5 * np.sin(2 * np.pi * 45.0 * t)
+
+
+def run(task: dm.Resample, chunk_size: int | None) -> tuple[np.ndarray, np.ndarray]:
+    task.target = dm.LocalQueue()
+    t, x = signal()
+    if chunk_size is None:
+        for ti, xi in zip(t.tolist(), x.tolist()):
+            task.step(dict(index=dict(t=ti), value=dict(x=xi)))
+    else:
+        for i in range(0, N, chunk_size):
+            task.step_batch(dm.Chunk(dict(index=dict(t=t[i : i + chunk_size]), value=dict(x=x[i : i + chunk_size]))))
+    task.close()
+    out = task.target.drain()
+    records = [r for item in out for r in (item.records() if isinstance(item, dm.Chunk) else [item])]
+    return np.array([r["index"]["t"] for r in records]), np.array([r["value"]["x"] for r in records])
+
+
+@pytest.mark.parametrize("chunk_size", [None, 7, 100])
+def test_linear(chunk_size):
+    t_out, x_out = run(dm.Resample(30, "linear"), chunk_size)
+    t, x = signal()
+    assert np.allclose(np.diff(t_out), 1 / 30)
+    assert t_out[-1] <= t[-1]
+    assert np.allclose(x_out, np.interp(t_out, t, x))
+
+
+@pytest.mark.parametrize("method,target_hz", [("decimate", 25), ("polyphase", 60)])
+@pytest.mark.parametrize("chunk_size", [None, 7, 100])
+def test_filtered(method, target_hz, chunk_size):
+    t_out, x_out = run(dm.Resample(target_hz, method, source_hz=SOURCE_HZ), chunk_size)
+    assert len(t_out) == pytest.approx(N * target_hz / SOURCE_HZ, abs=1)
+    assert np.allclose(np.diff(t_out), 1 / target_hz)
+    # the fast sine is filtered out (i.e., no aliasing), leaving the slow one. edges are left out
+    inner = slice(target_hz, -target_hz)
+    assert np.abs(x_out[inner] - np.sin(2 * np.pi * t_out[inner])).max() < 0.05
+
+
+@pytest.mark.parametrize("method,target_hz", [("linear", 30), ("decimate", 25), ("polyphase", 60)])
+def test_independent_of_chunking(method, target_hz):
+    create = lambda: dm.Resample(target_hz, method, source_hz=SOURCE_HZ)
+    t_ref, x_ref = run(create(), None)
+    for chunk_size in [3, 64, N]:
+        t_out, x_out = run(create(), chunk_size)
+        assert np.allclose(t_out, t_ref)
+        assert np.allclose(x_out, x_ref)
@@ -0,0 +1,67 @@
+import json
+
+from conftest import N, stream_of
+
+import streaminghub_datamux as dm
+
+
+class Count(dm.SinkTask):
+
+    def __init__(self, path) -> None:
+        super().__init__()
+        self.path = path
+        self.n = 0
+
+    def step(self, msg):
+        self.n += 1
+
+    def step_batch(self, chunk: dm.Chunk):
+        self.n += len(chunk)
+
+    def close(self) -> None:
+        self.path.write_text(json.dumps(self.n))
+        super().close()
+
+
+def test_replays_on_scheduler(api):
+    api.scheduler = dm.ReplayScheduler(workers=2)
+    q = dm.Queue(timeout=30)
+    streams = [stream_of(api, fmt, "shuffled") for fmt in ["csv", "h5", "parquet"]]
+    for stream in streams:
+        api.replay_collection_stream(stream.node.id, stream.attrs["id"], stream.attrs, q, bulk=True)  # type: ignore
+    assert len(api.scheduler.pending) == 3
+    api.scheduler.start()
+    ended, n = 0, 0
+    while ended < 3:
+        item = q.get()
+        assert item is not None
+        if dm.is_eos(item):
+            ended += 1
+        else:
+            n += len(item)  # type: ignore
+    assert n == 3 * N
+    api.scheduler.stop()
+
+
+def test_pipeline_starts_its_own_scheduler(tmp_path, api):
+    # another API, with replays pending on a scheduler of its own
+    other = dm.API(scheduler=dm.ReplayScheduler())
+    stream = stream_of(other, "csv")
+    q = dm.Queue(timeout=30)
+    other.replay_collection_stream(stream.node.id, stream.attrs["id"], stream.attrs, q, bulk=True)  # type: ignore
+
+    api.scheduler = dm.ReplayScheduler()
+    out = tmp_path / "out.json"
+    pipeline = dm.Pipeline(api.attach(stream_of(api, "h5"), bulk=True), Count(out))
+    pipeline.run(30)
+    assert json.loads(out.read_text()) == N
+    assert len(api.scheduler.pending) == 0
+
+    # the pipeline left the other scheduler alone
+    assert len(other.scheduler.pending) == 1 and len(other.scheduler.procs) == 0
+    other.scheduler.start()
+    assert len(q.get()) == N  # type: ignore
+    assert dm.is_eos(q.get())
+    other.scheduler.stop()
+    api.scheduler.stop()
+
@@ -0,0 +1,95 @@
+import os
+import queue
+
+import multiprocess
+import numpy as np
+import pytest
+from conftest import stream_of
+
+import streaminghub_datamux as dm
+from streaminghub_datamux.shm import SharedRingBuffer, layout_from_stream
+
+LAYOUT = dict(index=dict(t=np.dtype("f8")), value=dict(x=np.dtype("f8"), n=np.dtype("i4")))
+
+
+def record(i: int) -> dict:
+    return dict(index=dict(t=float(i)), value=dict(x=i / 2, n=i))
+
+
+def test_layout_from_stream(api):
+    layout = layout_from_stream(stream_of(api, "csv"))
+    assert layout == dict(index=dict(t=np.dtype("f8")), value=dict(x=np.dtype("f8"), y=np.dtype("f8")))
+
+
+def test_round_trip():
+    ring = SharedRingBuffer(LAYOUT, capacity=4)
+    ring.put(record(1))
+    assert ring.tags[0] == 0
+    assert ring.get() == record(1)
+
+
+def test_other_messages_keep_their_place():
+    ring = SharedRingBuffer(LAYOUT, capacity=8)
+    items = [record(0), dm.Signal.watermark(0.0), dict(index=dict(t=1.0), value=dict(x=1.0)), record(2), dm.END_OF_STREAM]
+    for item in items:
+        ring.put(item)
+    # only the records that match the layout are written into the ring
+    assert list(ring.tags[:5]) == [0, 1, 1, 0, 1]
+    out = [ring.get() for _ in items]
+    assert out[0] == record(0) and out[3] == record(2)
+    assert type(out[1]) is dm.Signal and out[1].value == 0.0
+    assert out[2] == items[2]
+    assert dm.is_eos(out[4])
+
+
+@pytest.mark.parametrize("n", [None, float("nan"), 2**40, 1.5])
+def test_values_that_do_not_fit_keep_their_slot(n):
+    ring = SharedRingBuffer(LAYOUT, capacity=2)
+    bad = dict(index=dict(t=0.0), value=dict(x=0.0, n=n))
+    # sent through the fallback instead, as many times as the ring has slots
+    for _ in range(3):
+        ring.put(bad)
+        ring.put(record(1))
+        assert ring.tags[(ring.ptr[0] - 2) % 2] == 1
+        assert repr(ring.get()) == repr(bad)
+        assert ring.get() == record(1)
+    assert ring.qsize() == 0
+
+
+def test_full_and_empty():
+    ring = SharedRingBuffer(LAYOUT, capacity=2)
+    ring.put(record(0))
+    ring.put(record(1))
+    with pytest.raises(queue.Full):
+        ring.put(record(2), timeout=0.01)
+    assert ring.get() == record(0)
+    ring.put(record(2))
+    assert [ring.get(), ring.get()] == [record(1), record(2)]
+    with pytest.raises(queue.Empty):
+        ring.get(timeout=0.01)
+
+
+def test_across_processes():
+    # the producer wraps around the ring many times
+    ring = SharedRingBuffer(LAYOUT, capacity=16)
+
+    def produce():
+        for i in range(1000):
+            ring.put(record(i))
+        ring.put(dm.END_OF_STREAM)
+
+    proc = multiprocess.Process(target=produce, daemon=True)
+    proc.start()
+    out = []
+    while not dm.is_eos(item := ring.get(timeout=10)):
+        out.append(item)
+    proc.join()
+    assert out == [record(i) for i in range(1000)]
+
+
+def test_released_by_owner():
+    ring = SharedRingBuffer(LAYOUT, capacity=4)
+    path = f"/dev/shm/{ring.shm.name}"
+    assert os.path.exists(path)
+    del ring
+    assert not os.path.exists(path)
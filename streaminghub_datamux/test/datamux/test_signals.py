@@ -0,0 +1,77 @@
+import time
+
+import multiprocess
+
+import streaminghub_datamux as dm
+
+
+class Idle(dm.SinkTask):
+
+    def step(self, msg):
+        pass
+
+
+class Echo(dm.PipeTask):
+
+    def step(self, msg):
+        self.target.put(msg)
+
+    def close(self) -> None:
+        pass
+
+
+def echo() -> Echo:
+    task = Echo()
+    task.source.assign(dm.Queue(timeout=1))
+    task.target = dm.LocalQueue()
+    return task
+
+
+def test_signals_overtake_queued_data():
+    task = echo()
+    task.source.put(1)
+    task.signal(dm.Signal.watermark(5.0))
+    task._tick()
+    task._tick()
+    out = task.target.drain()  # type: ignore
+    assert type(out[0]) is dm.Signal and out[0].kind == "watermark"
+    assert out[1:] == [1]
+
+
+def test_pause_and_resume():
+    task = echo()
+    task.source.put(1)
+    task.signal(dm.Signal.pause())
+    task._tick()
+    assert task.paused
+    # while paused, the task waits on its control lane instead of stepping
+    task._tick()
+    assert task.target.drain() == []  # type: ignore
+    task.signal(dm.Signal.resume())
+    task._tick()
+    task._tick()
+    assert not task.paused
+    assert task.target.drain() == [1]  # type: ignore
+
+
+def test_signals_from_many_processes():
+    task = Idle()
+    n, per_proc = 8, 10000
+
+    def send():
+        for _ in range(per_proc):
+            task.signal(dm.Signal.flush())
+
+    procs = [multiprocess.Process(target=send, daemon=True) for _ in range(n)]
+    for proc in procs:
+        proc.start()
+    # drain the control lane, so that senders can exit
+    received, deadline = 0, time.perf_counter() + 60
+    while received < n * per_proc and time.perf_counter() < deadline:
+        if task.control.get() is not None:
+            received += 1
+    assert received == n * per_proc
+    for proc in procs:
+        proc.join()
+    assert task.sent.value == n * per_proc
+    assert task._has_signals()
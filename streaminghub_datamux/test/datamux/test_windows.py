@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+
+import streaminghub_datamux as dm
+from streaminghub_datamux.windows import Window
+
+N = 53
+AGGS = ("count", "sum", "mean", "std", "min", "max")
+
+
+def rows() -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(0)
+    t = np.cumsum(rng.uniform(0.05, 0.15, N))
+    x = rng.normal(size=N)
+    return t, x
+
+
+def expected(x: np.ndarray) -> dict:
+    return dict(count=len(x), x_sum=x.sum(), x_mean=x.mean(), x_std=x.std(), x_min=x.min(), x_max=x.max())
+
+
+def run(task: dm.PipeTask, chunked: bool) -> list[dict]:
+    task.target = dm.LocalQueue()
+    t, x = rows()
+    if chunked:
+        for i in range(0, N, 10):
+            task.step_batch(dm.Chunk(dict(index=dict(t=t[i : i + 10]), value=dict(x=x[i : i + 10]))))
+    else:
+        for ti, xi in zip(t.tolist(), x.tolist()):
+            task.step(dict(index=dict(t=ti), value=dict(x=xi)))
+    task.close()
+    return task.target.drain()
+
+
+def check(out: list[dict], windows: list[np.ndarray]) -> None:
+    assert len(out) == len(windows)
+    t, x = rows()
+    for msg, idx in zip(out, windows):
+        assert msg["index"]["t_start"] == pytest.approx(t[idx][0])
+        for k, v in expected(x[idx]).items():
+            assert msg["value"][k] == pytest.approx(v), k
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_tumbling_by_count(chunked):
+    out = run(dm.TumblingWindow(10, ["x"], AGGS), chunked)
+    check(out, [np.arange(i, min(i + 10, N)) for i in range(0, N, 10)])
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_tumbling_by_time(chunked):
+    out = run(dm.TumblingWindow(1.0, ["x"], AGGS, by="time"), chunked)
+    t, x = rows()
+    bins = np.floor(t).astype(int)
+    windows = [np.flatnonzero(bins == b) for b in np.unique(bins)]
+    assert len(out) == len(windows)
+    for msg, idx in zip(out, windows):
+        assert msg["index"]["t_start"] == np.floor(t[idx[0]])
+        for k, v in expected(x[idx]).items():
+            assert msg["value"][k] == pytest.approx(v), k
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_sliding_by_count(chunked):
+    out = run(dm.SlidingWindow(8, ["x"], AGGS, step=3), chunked)
+    # emitted at every 3rd row, once the window is full
+    ends = [i for i in range(N) if i + 1 >= 8 and (i + 1) % 3 == 0]
+    check(out, [np.arange(i - 7, i + 1) for i in ends])
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_sliding_by_time(chunked):
+    out = run(dm.SlidingWindow(0.5, ["x"], AGGS, by="time"), chunked)
+    t, _ = rows()
+    check(out, [np.flatnonzero((t > t[i] - 0.5) & (t <= t[i])) for i in range(N)])
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_session(chunked):
+    out = run(dm.SessionWindow(0.13, ["x"], AGGS), chunked)
+    t, _ = rows()
+    breaks = np.flatnonzero(np.diff(t) > 0.13) + 1
+    check(out, np.split(np.arange(N), breaks))
+
+
+def test_session_closed_by_watermark():
+    task = dm.SessionWindow(1.0, ["x"], ("mean",))
+    task.target = dm.LocalQueue()
+    task.step(dict(index=dict(t=0.0), value=dict(x=1.0)))
+    task.step(dict(index=dict(t=0.5), value=dict(x=3.0)))
+    assert task.target.drain() == []
+    # no more rows arrive, but the watermark shows that the gap has passed
+    task.on_signal(dm.Signal.watermark(2.0))
+    out = [msg for msg in task.target.drain() if type(msg) is dict]
+    assert len(out) == 1 and out[0]["value"]["x_mean"] == 2.0
+
+
+def test_tumbling_closed_by_watermark():
+    task = dm.TumblingWindow(1.0, ["x"], ("mean",), by="time")
+    task.target = dm.LocalQueue()
+    task.step(dict(index=dict(t=0.2), value=dict(x=1.0)))
+    task.step(dict(index=dict(t=0.7), value=dict(x=3.0)))
+    task.on_signal(dm.Signal.watermark(0.9))
+    assert [msg for msg in task.target.drain() if type(msg) is dict] == []
+    # no more rows arrive, but the watermark shows that [0, 1) is complete
+    task.on_signal(dm.Signal.watermark(1.5))
+    out = [msg for msg in task.target.drain() if type(msg) is dict]
+    assert len(out) == 1 and out[0]["index"]["t_start"] == 0.0 and out[0]["value"]["x_mean"] == 2.0
+    # later rows fall into the window that the watermark moved to
+    task.step(dict(index=dict(t=1.8), value=dict(x=5.0)))
+    task.close()
+    out = [msg for msg in task.target.drain() if type(msg) is dict]
+    assert len(out) == 1 and out[0]["index"]["t_start"] == 1.0 and out[0]["value"]["x_mean"] == 5.0
+
+
+def test_window_push_is_abstract():
+    class Incomplete(Window):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete(["x"], ("mean",))  # type: ignore
@@ -8,6 +8,186 @@ import pandas as pd
 from .const import dtype_map_inv
 
 
+class RowReader(abc.ABC):
+    """
+    Reads the rows of a single unit on demand, instead of all at once.
+
+    """
+
+    columns: list
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        """
+        Returns:
+            int: number of rows
+        """
+
+    @abc.abstractmethod
+    def read(self, start: int, stop: int) -> pd.DataFrame:
+        """
+        Read a range of rows.
+
+        Args:
+            start (int): index of the first row
+            stop (int): index after the last row
+
+        Returns:
+            pd.DataFrame: rows [start, stop)
+        """
+
+    def column(self, column) -> np.ndarray:
+        """
+        Read a whole column (e.g., to check whether an index is in order), without the other columns.
+
+        Args:
+            column: column to read
+
+        Returns:
+            np.ndarray: values of the column
+        """
+        return self.read(0, len(self))[column].to_numpy()
+
+    def value_at(self, column, i: int):
+        """
+        Read a single value.
+
+        Args:
+            column: column to read
+            i (int): index of the row
+
+        Returns:
+            the value at row i
+        """
+        return self.read(i, i + 1)[column].iloc[0]
+
+    def searchsorted(self, column, value, side: str = "left") -> int:
+        """
+        Find where a value belongs in a sorted column, by binary search (i.e., O(log n) point reads).
+
+        Args:
+            column: sorted column to search
+            value: value to search for
+            side (str): "left" for the first row >= value, or "right" for the first row > value
+
+        Returns:
+            int: index of the row
+        """
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            v = self.value_at(column, mid)
+            if v < value or (side == "right" and v == value):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def close(self) -> None:
+        pass
+
+
+class DataFrameRows(RowReader):
+    """
+    Rows of a unit that was read into memory (e.g., from formats that cannot be read in parts).
+
+    """
+
+    def __init__(self, data: pd.DataFrame) -> None:
+        self.data = data
+        self.columns = list(data.columns)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def read(self, start: int, stop: int) -> pd.DataFrame:
+        return self.data.iloc[start:stop]
+
+    def column(self, column) -> np.ndarray:
+        return self.data[column].to_numpy()
+
+    def value_at(self, column, i: int):
+        return self.data[column].iat[i]
+
+    def searchsorted(self, column, value, side: str = "left") -> int:
+        return int(np.searchsorted(self.data[column].to_numpy(), value, side=side))  # type: ignore
+
+
+class HDF5Rows(RowReader):
+    """
+    Rows of an HDF5 dataset, read as slices. The file is kept open until close().
+
+    """
+
+    def __init__(self, fp: Path, rec_path: str) -> None:
+        self.file = h5py.File(fp, "r")
+        data = self.file.get(rec_path, default=None)  # type: ignore
+        assert isinstance(data, h5py.Dataset)
+        self.dataset = data
+        names = data.dtype.names
+        self.columns = list(names) if names is not None else list(range(data.shape[1]))
+
+    def __len__(self) -> int:
+        return self.dataset.shape[0]
+
+    def read(self, start: int, stop: int) -> pd.DataFrame:
+        return pd.DataFrame(self.dataset[start:stop])
+
+    def column(self, column) -> np.ndarray:
+        if self.dataset.dtype.names is None:
+            return self.dataset[:, column]
+        return self.dataset.fields(column)[:]
+
+    def value_at(self, column, i: int):
+        return self.dataset[i][column]
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class ParquetRows(RowReader):
+    """
+    Rows of a Parquet file, read a row group at a time. The last row group read is kept, since reads are sequential.
+
+    """
+
+    def __init__(self, fp: Path) -> None:
+        import pyarrow.parquet as pq
+
+        self.file = pq.ParquetFile(fp)
+        meta = self.file.metadata
+        self.columns = list(self.file.schema_arrow.names)
+        sizes = [meta.row_group(i).num_rows for i in range(meta.num_row_groups)]
+        # index of the first row of each row group (and the number of rows, at the end)
+        self.offsets = np.concatenate([[0], np.cumsum(sizes, dtype=np.int64)])
+        self.cache: tuple[tuple, pd.DataFrame] | None = None
+
+    def __len__(self) -> int:
+        return int(self.offsets[-1])
+
+    def _group_of(self, i: int) -> int:
+        return int(np.searchsorted(self.offsets, i, side="right")) - 1
+
+    def read(self, start: int, stop: int) -> pd.DataFrame:
+        stop = min(stop, len(self))
+        if start >= stop:
+            return self.file.schema_arrow.empty_table().to_pandas()
+        groups = tuple(range(self._group_of(start), self._group_of(stop - 1) + 1))
+        if self.cache is None or self.cache[0] != groups:
+            self.cache = groups, self.file.read_row_groups(groups, use_pandas_metadata=True).to_pandas()
+        base = int(self.offsets[groups[0]])
+        return self.cache[1].iloc[start - base : stop - base]
+
+    def column(self, column) -> np.ndarray:
+        return self.file.read(columns=[column]).column(0).to_numpy()
+
+    def value_at(self, column, i: int):
+        # read a single column of the row group, instead of all of it
+        g = self._group_of(i)
+        values = self.file.read_row_group(g, columns=[column]).column(0)
+        return values[i - int(self.offsets[g])].as_py()
+
+
 class FileReader(abc.ABC):
 
     @abc.abstractmethod
@@ -39,6 +219,17 @@ class FileReader(abc.ABC):
             tuple[dict, pd.DataFrame]: (meta, data) tuple
         """
 
+    def open(self, rec_path: str) -> tuple[dict, RowReader]:
+        """
+        Read metadata of a single unit, and open its rows for reading on demand.
+        By default, the unit is read into memory at once.
+
+        Returns:
+            tuple[dict, RowReader]: (meta, rows) tuple
+        """
+        meta, data = self.read(rec_path)
+        return meta, DataFrameRows(data)
+
 
 class HDF5Reader(FileReader):
 
@@ -73,6 +264,11 @@ class HDF5Reader(FileReader):
             data = pd.DataFrame(np.array(data))
         return meta, data
 
+    def open(self, rec_path: str) -> tuple[dict, RowReader]:
+        rows = HDF5Rows(self.fp, rec_path)
+        meta = dict(rows.dataset.attrs.items())
+        return meta, rows
+
 
 class CSVReader(FileReader):
 
@@ -117,6 +313,11 @@ class ParquetReader(FileReader):
         meta: dict[str, str] = {}  # TODO get extra metadata from elsewhere
         return meta, data
 
+    def open(self, rec_path: str) -> tuple[dict, RowReader]:
+        # ignore rec_path
+        meta: dict[str, str] = {}  # TODO get extra metadata from elsewhere
+        return meta, ParquetRows(self.fp)
+
 
 def create_reader(fp: Path) -> FileReader:
     assert fp.suffix in [".h5", ".hdf5", ".parquet", ".csv"]
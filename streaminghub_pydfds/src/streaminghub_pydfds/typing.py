@@ -9,7 +9,7 @@ import parse
 import pydantic as p
 
 from .const import dtype_map_fwd, dtype_map_inv
-from .readers import create_reader
+from .readers import DataFrameRows, RowReader, create_reader
 
 
 class Config(p.BaseModel):
@@ -178,6 +178,59 @@ class DataLoader:
         Returns:
             Tuple[dict, pd.DataFrame]: (attributes, data) of the requested record
         """
+        fp, rec_path, parser_attrs = self.__locate(attributes)
+
+        # load meta and data from file path
+        meta, data = create_reader(fp).read(rec_path)
+
+        # patch metadata with collection / path information
+        meta.update({"collection": self.__collection.name, **parser_attrs})
+
+        return meta, data
+
+    def open(
+        self,
+        attributes: dict,
+    ) -> Tuple[dict, RowReader]:
+        """
+        Given the attributes of a record, open its data for reading on demand
+        (i.e., slices of HDF5 datasets, and row groups of Parquet files), instead of reading it all at once
+
+        Args:
+            attributes (dict): attributes of the requested record
+
+        Returns:
+            Tuple[dict, RowReader]: (attributes, rows) of the requested record. Close the rows once done
+        """
+        fp, rec_path, parser_attrs = self.__locate(attributes)
+
+        # load meta from file path, and open data
+        meta, rows = create_reader(fp).open(rec_path)
+
+        # patch metadata with collection / path information
+        meta.update({"collection": self.__collection.name, **parser_attrs})
+
+        return meta, rows
+
+    def path(
+        self,
+        attributes: dict,
+    ) -> Path:
+        """
+        Given the attributes of a record, return the path of the file that holds it
+
+        Args:
+            attributes (dict): attributes of the requested record
+
+        Returns:
+            Path: path of the file (which may hold other records, e.g., for h5)
+        """
+        return self.__locate(attributes)[0]
+
+    def __locate(
+        self,
+        attributes: dict,
+    ) -> Tuple[Path, str, dict]:
         # compute the path from attributes
         parser_keys: List[str] = self.__parser.named_fields
         parser_attrs = {k: v for k, v in attributes.items() if k in parser_keys}
@@ -193,11 +246,5 @@ class DataLoader:
         else:
             raise ValueError(f"Unsupported protocol: {self.__protocol}")
 
-        # load meta and data from file path
         assert fp.exists() and fp.is_file(), f"{fp} not found"
-        meta, data = create_reader(fp).read(rec_path)
-
-        # patch metadata with collection / path information
-        meta.update({"collection": self.__collection.name, **parser_attrs})
-
-        return meta, data
+        return fp, rec_path, parser_attrs
@@ -0,0 +1,59 @@
+import logging
+
+import h5py
+import numpy as np
+import pandas as pd
+
+from streaminghub_pydfds.readers import create_reader
+
+logging.basicConfig(level=logging.INFO)
+
+
+def _data(n: int) -> pd.DataFrame:
+    t = np.arange(n) / 100
+    return pd.DataFrame(dict(t=t, x=np.sin(t)))
+
+
+def _check_rows(fp, rec_path: str, data: pd.DataFrame):
+    meta, rows = create_reader(fp).open(rec_path)
+    try:
+        assert len(rows) == len(data)
+        assert set(rows.columns) == set(data.columns)
+
+        # reading in blocks gives the same rows as reading at once
+        blocks = [rows.read(i, i + 300) for i in range(0, len(rows), 300)]
+        out = pd.concat(blocks, ignore_index=True)
+        assert np.allclose(out["t"].to_numpy(), data["t"].to_numpy())
+        assert np.allclose(out["x"].to_numpy(), data["x"].to_numpy())
+
+        # a column is read on its own
+        assert np.allclose(rows.column("t"), data["t"].to_numpy())
+
+        # binary search agrees with numpy
+        for t in [-1.0, 0.0, 3.333, 5.0, 19.99, 100.0]:
+            for side in ["left", "right"]:
+                assert rows.searchsorted("t", t, side) == np.searchsorted(data["t"].to_numpy(), t, side)
+    finally:
+        rows.close()
+
+
+def test_hdf5_rows(tmp_path):
+    data = _data(2000)
+    fp = tmp_path / "data.h5"
+    with h5py.File(fp, "w") as file:
+        file.create_dataset("a", data=data.to_records(index=False))
+    _check_rows(fp, "a", data)
+
+
+def test_parquet_rows(tmp_path):
+    data = _data(2000)
+    fp = tmp_path / "a.parquet"
+    data.to_parquet(fp, row_group_size=250)
+    _check_rows(fp, "a", data)
+
+
+def test_csv_rows(tmp_path):
+    data = _data(2000)
+    fp = tmp_path / "a.csv"
+    data.to_csv(fp, index=False)
+    _check_rows(fp, "a", data)